@@ -0,0 +1,226 @@
+"""
+Scaling benchmarks for the offline pipeline stages.
+
+    python -m benchmarks.run_benchmarks --sizes 10000 100000 1000000
+    python -m benchmarks.run_benchmarks --sizes 10000 --compare benchmarks/results.json
+    python -m benchmarks.run_benchmarks --sizes 1000000 --clean-workers 1 2 4 8
+
+Each stage runs against synthetic data (src.synthetic) and the local lexicon
+classifier in place of Groq, so no network access or credentials are needed.
+Results (seconds and peak traced memory per stage and size) are appended to a
+JSON results file; --compare flags stages that got slower than a previous run.
+--clean-workers times clean_data at each process count and checks the output
+matches the serial run.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from unittest.mock import patch
+
+import pandas as pd
+
+from src.analysis import calculate_sentiment_breakdown, create_visualizations, generate_insights_report
+from src.etl import clean_data, process_reviews_with_llm
+from src.synthetic import generate_reviews, zipf_class_weights
+from src.utils import local_sentiment
+
+DEFAULT_SIZES = [10_000, 100_000]
+RESULTS_FILE = os.path.join('benchmarks', 'results.json')
+
+# Row-by-row LLM stage is benchmarked only up to this size by default
+LLM_MAX_ROWS = 50_000
+
+
+def _measure(func, track_memory):
+    """  Runs func with stdout silenced. Returns (result, seconds, peak_mb).  """
+    if track_memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = func()
+        seconds = time.perf_counter() - start
+        peak_mb = None
+        if track_memory:
+            peak_mb = tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+        return result, seconds, peak_mb
+    finally:
+        if track_memory:
+            tracemalloc.stop()
+
+
+def benchmark_size(n_rows, n_classes=None, mean_words=60, llm_max_rows=LLM_MAX_ROWS,
+                   track_memory=True, seed=0):
+    """  Runs every stage once at n_rows and returns {stage: {'seconds', 'peak_mb'}}.  """
+    class_weights = zipf_class_weights(n_classes) if n_classes else None
+    raw = generate_reviews(n_rows, class_weights=class_weights, mean_words=mean_words, seed=seed)
+    labeled = generate_reviews(n_rows, class_weights=class_weights, mean_words=mean_words,
+                               with_labels=True, as_strings=False, seed=seed)
+
+    results = {}
+
+    def record(stage, func):
+        value, seconds, peak_mb = _measure(func, track_memory)
+        results[stage] = {
+            'seconds': round(seconds, 4),
+            'peak_mb': round(peak_mb, 2) if peak_mb is not None else None
+        }
+        return value
+
+    record('clean_data', lambda: clean_data(raw))
+
+    if n_rows <= llm_max_rows:
+        with patch('src.utils.call_groq_llm', side_effect=local_sentiment), patch('time.sleep'):
+            record('process_reviews_with_llm', lambda: process_reviews_with_llm(labeled))
+
+    breakdown, breakdown_pct = record('calculate_sentiment_breakdown',
+                                      lambda: calculate_sentiment_breakdown(labeled))
+
+    # Report and charts write into the working directory - keep them out of the repo
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as workdir:
+        os.chdir(workdir)
+        try:
+            record('generate_insights_report',
+                   lambda: generate_insights_report(labeled, breakdown, breakdown_pct, {}))
+            record('create_visualizations',
+                   lambda: create_visualizations(labeled, breakdown, breakdown_pct))
+        finally:
+            os.chdir(cwd)
+
+    return results
+
+
+def benchmark_clean_scaling(n_rows, worker_counts, mean_words=60, seed=0):
+    """  Times clean_data(workers=N) for each N. Returns {N: {'seconds', 'speedup', 'matches_serial'}}.  """
+    raw = generate_reviews(n_rows, mean_words=mean_words, seed=seed)
+    serial, serial_seconds, _ = _measure(lambda: clean_data(raw), track_memory=False)
+
+    results = {}
+    # Shard even small benchmark sizes so the pool is what gets measured
+    with patch('src.etl.MIN_SHARD_ROWS', 1):
+        for workers in worker_counts:
+            if workers <= 1:
+                cleaned, seconds = serial, serial_seconds
+            else:
+                cleaned, seconds, _ = _measure(lambda: clean_data(raw, workers=workers), track_memory=False)
+            results[str(workers)] = {
+                'seconds': round(seconds, 4),
+                'speedup': round(serial_seconds / seconds, 2) if seconds else None,
+                'matches_serial': bool(cleaned.equals(serial))
+            }
+    return results
+
+
+def _git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except Exception:
+        return None
+
+
+def load_results(path):
+    if not os.path.exists(path):
+        return []
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def append_results(path, run):
+    runs = load_results(path)
+    runs.append(run)
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(runs, f, indent=2)
+
+
+def compare_runs(baseline, current, tolerance=0.2, min_seconds=0.05):
+    """
+    Returns a list of regression messages: stages at least `tolerance` slower
+    (relative) and `min_seconds` slower (absolute) than the baseline run.
+    """
+    regressions = []
+    for size, stages in current['sizes'].items():
+        base_stages = baseline['sizes'].get(size, {})
+        for stage, result in stages.items():
+            base = base_stages.get(stage)
+            if not base:
+                continue
+            slower = result['seconds'] - base['seconds']
+            if slower > min_seconds and result['seconds'] > base['seconds'] * (1 + tolerance):
+                regressions.append(
+                    f"{stage} @ {size} rows: {base['seconds']:.3f}s -> {result['seconds']:.3f}s "
+                    f"(+{slower / base['seconds'] * 100:.0f}%)"
+                )
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark pipeline stages on synthetic reviews')
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES)
+    parser.add_argument('--classes', type=int, default=None,
+                        help='Use N long-tailed synthetic classes instead of the real class mix')
+    parser.add_argument('--mean-words', type=int, default=60)
+    parser.add_argument('--llm-max-rows', type=int, default=LLM_MAX_ROWS)
+    parser.add_argument('--no-memory', action='store_true', help='Skip tracemalloc (faster, no peak_mb)')
+    parser.add_argument('--output', default=RESULTS_FILE)
+    parser.add_argument('--compare', default=None, help='Results file whose last run is the baseline')
+    parser.add_argument('--tolerance', type=float, default=0.2)
+    parser.add_argument('--clean-workers', type=int, nargs='+', default=None,
+                        help='Also time parallel clean_data at these process counts (e.g. 1 2 4 8)')
+    args = parser.parse_args(argv)
+
+    run = {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'git_commit': _git_commit(),
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'classes': args.classes,
+        'mean_words': args.mean_words,
+        'sizes': {}
+    }
+
+    for size in args.sizes:
+        print(f"⏱  Benchmarking {size:,} rows...")
+        stages = benchmark_size(size, n_classes=args.classes, mean_words=args.mean_words,
+                                llm_max_rows=args.llm_max_rows, track_memory=not args.no_memory)
+        run['sizes'][str(size)] = stages
+        for stage, result in stages.items():
+            peak = f"{result['peak_mb']:.1f} MiB" if result['peak_mb'] is not None else '-'
+            print(f"   {stage:<30} {result['seconds']:>9.3f}s  {peak:>12}")
+
+        if args.clean_workers:
+            scaling = benchmark_clean_scaling(size, args.clean_workers, mean_words=args.mean_words)
+            run.setdefault('clean_scaling', {})[str(size)] = scaling
+            for workers, result in scaling.items():
+                match = 'same output' if result['matches_serial'] else 'OUTPUT DIFFERS'
+                print(f"   clean_data workers={workers:<17} {result['seconds']:>9.3f}s  "
+                      f"{result['speedup']:>5.2f}x  {match}")
+
+    baseline_runs = load_results(args.compare) if args.compare else []
+    append_results(args.output, run)
+    print(f"\n Results appended to {args.output}")
+
+    if baseline_runs:
+        regressions = compare_runs(baseline_runs[-1], run, tolerance=args.tolerance)
+        if regressions:
+            print("\n⚠️  Regressions against baseline:")
+            for message in regressions:
+                print(f"   • {message}")
+            return 1
+        print("\n✅ No regressions against baseline")
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,8 +1,7 @@
-import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
 import os
 
+from src import metrics
+
 
 def calculate_sentiment_breakdown(df, class_column='Class Name'):
     try:
@@ -73,15 +72,64 @@ def identify_top_classes(df, breakdown_pct, class_column='Class Name'):
         return {}
 
 
-def create_visualizations(df, breakdown, breakdown_pct, class_column='Class Name'):
+def limit_classes(breakdown, top_n=10, other_label='Other'):
+    """  Keeps the top_n classes by review volume and folds the rest into one 'Other' row.  """
+    counts = breakdown.drop(columns=['Total'], errors='ignore')
+    
+    volume = counts.sum(axis=1)
+    top_index = volume.nlargest(top_n).index
+    limited = counts.loc[top_index].copy()
+    
+    rest = counts.drop(index=top_index)
+    if len(rest) > 0:
+        if other_label in limited.index:
+            # A top class literally named like the bucket absorbs the tail instead of being overwritten
+            limited.loc[other_label] = limited.loc[other_label] + rest.sum()
+        else:
+            limited.loc[other_label] = rest.sum()
+    
+    row_totals = limited.sum(axis=1).replace(0, 1)
+    limited_pct = limited.div(row_totals, axis=0) * 100
+    
+    return limited, limited_pct
+
+
+def save_breakdown(breakdown, breakdown_pct, path='charts/sentiment_breakdown.csv'):
+    """  Saves the full (un-bucketed) class breakdown as CSV for machine consumers.  """
     try:
-        os.makedirs('charts', exist_ok=True)
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        
+        full = breakdown.join(breakdown_pct.add_suffix(' %'))
+        full.to_csv(path)
+        
+        print(f"   ✅ Saved full breakdown: {path} ({len(full)} classes)")
+        return path
+    
+    except Exception as e:
+        print(f"Error saving breakdown: {e}")
+        return None
+
+
+def create_visualizations(df, breakdown, breakdown_pct, class_column='Class Name', top_n=10,
+                          charts_dir='charts'):
+    try:
+        # Plotting libraries are only needed for this step
+        import matplotlib.pyplot as plt
+        import seaborn as sns
+        
+        os.makedirs(charts_dir, exist_ok=True)
         
         sns.set_style("whitegrid")
         plt.rcParams['figure.figsize'] = (12, 6)
         
         saved_charts = []
         
+        # Cap the per-class charts so render cost does not grow with cardinality
+        chart_breakdown, chart_breakdown_pct = breakdown, breakdown_pct
+        if top_n and len(breakdown) > top_n:
+            print(f"   {len(breakdown)} classes found - plotting top {top_n} + 'Other'")
+            chart_breakdown, chart_breakdown_pct = limit_classes(breakdown, top_n)
+        
         print("\n Creating Chart 1: Overall Sentiment Distribution...")
         fig, ax = plt.subplots(figsize=(8, 8))
         
@@ -97,7 +145,7 @@ def create_visualizations(df, breakdown, breakdown_pct, class_column='Class Name
                textprops={'fontsize': 12, 'weight': 'bold'})
         ax.set_title('Overall Sentiment Distribution', fontsize=16, weight='bold', pad=20)
         
-        chart1_path = 'charts/overall_sentiment_pie.png'
+        chart1_path = os.path.join(charts_dir, 'overall_sentiment_pie.png')
         plt.tight_layout()
         plt.savefig(chart1_path, dpi=300, bbox_inches='tight')
         plt.close()
@@ -107,7 +155,7 @@ def create_visualizations(df, breakdown, breakdown_pct, class_column='Class Name
         print("\n Creating Chart 2: Sentiment by Clothing Class...")
         fig, ax = plt.subplots(figsize=(14, 8))
         
-        breakdown_pct_plot = breakdown_pct[['Positive', 'Negative', 'Neutral']].copy()
+        breakdown_pct_plot = chart_breakdown_pct[['Positive', 'Negative', 'Neutral']].copy()
         breakdown_pct_plot.plot(kind='bar', 
                                 stacked=True, 
                                 ax=ax,
@@ -121,7 +169,7 @@ def create_visualizations(df, breakdown, breakdown_pct, class_column='Class Name
         ax.legend(title='Sentiment', title_fontsize=12, fontsize=10)
         ax.grid(axis='y', alpha=0.3)
         
-        chart2_path = 'charts/sentiment_by_class_stacked.png'
+        chart2_path = os.path.join(charts_dir, 'sentiment_by_class_stacked.png')
         plt.tight_layout()
         plt.savefig(chart2_path, dpi=300, bbox_inches='tight')
         plt.close()
@@ -131,7 +179,7 @@ def create_visualizations(df, breakdown, breakdown_pct, class_column='Class Name
         print("\n Creating Chart 3: Sentiment Counts by Class...")
         fig, ax = plt.subplots(figsize=(14, 8))
         
-        breakdown_plot = breakdown[['Positive', 'Negative', 'Neutral']].copy()
+        breakdown_plot = chart_breakdown[['Positive', 'Negative', 'Neutral']].copy()
         
         breakdown_plot.plot(kind='bar', 
                            ax=ax,
@@ -145,7 +193,7 @@ def create_visualizations(df, breakdown, breakdown_pct, class_column='Class Name
         ax.legend(title='Sentiment', title_fontsize=12, fontsize=10)
         ax.grid(axis='y', alpha=0.3)
         
-        chart3_path = 'charts/sentiment_by_class_grouped.png'
+        chart3_path = os.path.join(charts_dir, 'sentiment_by_class_grouped.png')
         plt.tight_layout()
         plt.savefig(chart3_path, dpi=300, bbox_inches='tight')
         plt.close()
@@ -172,16 +220,18 @@ def create_visualizations(df, breakdown, breakdown_pct, class_column='Class Name
                 for i, v in enumerate(top_5.values):
                     axes[idx].text(v + 1, i, f'{v:.1f}%', va='center', fontsize=9)
         
-        chart4_path = 'charts/top_classes_comparison.png'
+        chart4_path = os.path.join(charts_dir, 'top_classes_comparison.png')
         plt.tight_layout()
         plt.savefig(chart4_path, dpi=300, bbox_inches='tight')
         plt.close()
         saved_charts.append(chart4_path)
         print(f"   ✅ Saved: {chart4_path}")
         
+        metrics.increment('charts_rendered_total', len(saved_charts))
+        
         print(f"\n All visualizations created successfully!")
         print(f"   Total charts: {len(saved_charts)}")
-        print(f"   Location: ./charts/")
+        print(f"   Location: {charts_dir}/")
         
         return saved_charts
     
@@ -190,7 +240,8 @@ def create_visualizations(df, breakdown, breakdown_pct, class_column='Class Name
         return []
 
 
-def generate_insights_report(df, breakdown, breakdown_pct, top_classes, class_column='Class Name'):    
+def generate_insights_report(df, breakdown, breakdown_pct, top_classes, class_column='Class Name',
+                             report_path='insights_report.txt'):
     report = []
     report.append("=" * 70)
     report.append("AUTOMATED REVIEW ANALYSIS - INSIGHTS REPORT")
@@ -260,9 +311,9 @@ def generate_insights_report(df, breakdown, breakdown_pct, top_classes, class_co
     print(report_text)
     
     # Save to file
-    with open('insights_report.txt', 'w', encoding='utf-8') as f:
+    with open(report_path, 'w', encoding='utf-8') as f:
         f.write(report_text)
     
-    print("\n Report saved to: insights_report.txt")
+    print(f"\n Report saved to: {report_path}")
     
     return report_text
\ No newline at end of file
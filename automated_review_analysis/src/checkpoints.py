@@ -0,0 +1,82 @@
+import hashlib
+import json
+import os
+
+CACHE_DIR = '.pipeline_cache'
+
+
+def fingerprint(*parts):
+    """  Builds a short, stable fingerprint from strings (stage names, upstream keys, versions).  """
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(str(part).encode('utf-8'))
+        digest.update(b'\0')
+    return digest.hexdigest()[:16]
+
+
+def frame_fingerprint(df):
+    """  Fingerprints a DataFrame's columns and contents (row order included).  """
+    import pandas as pd
+
+    digest = hashlib.sha256()
+    digest.update(json.dumps([str(col) for col in df.columns]).encode('utf-8'))
+    digest.update(pd.util.hash_pandas_object(df, index=True).values.tobytes())
+    return digest.hexdigest()[:16]
+
+
+def _stage_file(stage, key, cache_dir):
+    return os.path.join(cache_dir, f"{stage}-{key}.parquet")
+
+
+def _latest_file(stage, cache_dir):
+    return os.path.join(cache_dir, f"{stage}.latest.json")
+
+
+def save_stage(stage, key, df, cache_dir=CACHE_DIR):
+    """  Saves a stage's output as Parquet and marks it as that stage's latest result.  """
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+
+        path = _stage_file(stage, key, cache_dir)
+        df.to_parquet(path, index=False)
+
+        with open(_latest_file(stage, cache_dir), 'w', encoding='utf-8') as f:
+            json.dump({'stage': stage, 'key': key, 'rows': len(df)}, f)
+
+        print(f"   💾 Saved {stage} output ({len(df)} rows) to {path}")
+        return path
+
+    except Exception as e:
+        # A failed checkpoint only costs a future re-run, never the current one
+        print(f"⚠️  Could not save {stage} checkpoint: {e}")
+        return None
+
+
+def load_stage(stage, key, cache_dir=CACHE_DIR):
+    """  Loads a stage's saved output for the given input key, or None if it was never saved.  """
+    path = _stage_file(stage, key, cache_dir)
+    if not os.path.exists(path):
+        return None
+
+    try:
+        import pandas as pd
+
+        return pd.read_parquet(path)
+
+    except Exception as e:
+        print(f"⚠️  Could not read {stage} checkpoint: {e}")
+        return None
+
+
+def load_latest(stage, cache_dir=CACHE_DIR):
+    """  Loads the most recently saved output of a stage. Returns (df, key) or (None, None).  """
+    try:
+        with open(_latest_file(stage, cache_dir), encoding='utf-8') as f:
+            key = json.load(f)['key']
+    except (OSError, ValueError, KeyError):
+        return None, None
+
+    df = load_stage(stage, key, cache_dir)
+    if df is None:
+        return None, None
+    return df, key
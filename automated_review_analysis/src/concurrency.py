@@ -0,0 +1,138 @@
+import threading
+import time
+from collections import deque
+
+from src import metrics
+
+# Outcomes that mean Groq is overloaded and the limit must come down
+BACKOFF_OUTCOMES = ('throttled', 'timeout')
+
+
+def call_outcome(result=None, error=None):
+    """  'success', or the kind of failure, for a call that returned result or raised error.  """
+    from src.utils import error_kind
+
+    if error is not None:
+        return error_kind(error)
+    return result.get('error', 'success') if isinstance(result, dict) else 'success'
+
+
+class ConcurrencyController:
+    """
+    Adaptive limit on in-flight LLM calls (AIMD). While latency stays near its
+    recent floor and the limit is actually in use, the limit grows by one per
+    round of `limit` successful calls. A 429, a timeout, or smoothed latency
+    above `tolerance` times the floor multiplies it by `backoff`. Calls that
+    started before a cut no longer move the limit, so one burst of slow
+    answers counts as a single congestion signal.
+
+    The limit is published as the groq_concurrency_limit gauge (its history is
+    in the run summary) and every change is counted in
+    groq_concurrency_changes_total{direction, reason}.
+    """
+
+    def __init__(self, initial_limit=4, min_limit=1, max_limit=16, backoff=0.5, tolerance=2.0,
+                 window=200, min_samples=10, smoothing=0.2):
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.backoff = backoff
+        self.tolerance = tolerance
+        self.min_samples = min_samples
+        self.smoothing = smoothing
+        self.window = window
+        self.limit = min(max(initial_limit, min_limit), max_limit)
+        self._latencies = deque(maxlen=window)
+        self._smoothed = None
+        self._inflight = 0
+        self._peak = 0
+        self._acks = 0
+        self._issued = 0
+        self._cut_at = 0
+        self._cond = threading.Condition()
+        self._started = time.monotonic()
+        self.history = [(0.0, self.limit)]
+        metrics.set_gauge('groq_concurrency_limit', self.limit)
+
+    def split(self, parts):
+        """  A controller with 1/parts of the limits, for one of `parts` processes.  """
+        return ConcurrencyController(initial_limit=max(self.limit // parts, 1),
+                                     min_limit=max(self.min_limit // parts, 1),
+                                     max_limit=max(self.max_limit // parts, 1), backoff=self.backoff,
+                                     tolerance=self.tolerance, window=self.window,
+                                     min_samples=self.min_samples, smoothing=self.smoothing)
+
+    def acquire(self):
+        """  Blocks until a call fits under the current limit; returns the call's ticket for release().  """
+        with self._cond:
+            while self._inflight >= self.limit:
+                self._cond.wait()
+            self._inflight += 1
+            self._peak = max(self._peak, self._inflight)
+            self._issued += 1
+            return self._issued
+
+    def release(self, ticket, latency, outcome='success'):
+        """
+        Ends a call and adjusts the limit from its latency and outcome. An
+        'abandoned' call (a hedge's loser, still running) only frees its slot.
+        """
+        with self._cond:
+            self._inflight -= 1
+            if outcome == 'success':
+                self._latencies.append(latency)
+                self._smoothed = latency if self._smoothed is None else (
+                    self.smoothing * latency + (1 - self.smoothing) * self._smoothed)
+
+            # Calls issued before the last cut describe the load that caused it
+            if ticket > self._cut_at:
+                if outcome in BACKOFF_OUTCOMES:
+                    self._decrease(outcome)
+                elif outcome == 'success':
+                    if (len(self._latencies) >= self.min_samples
+                            and self._smoothed > min(self._latencies) * self.tolerance):
+                        self._decrease('latency')
+                    elif self._peak >= self.limit:
+                        self._acks += 1
+                        if self._acks >= self.limit:
+                            self._set_limit(min(self.max_limit, self.limit + 1), 'up', 'latency')
+
+            self._cond.notify_all()
+
+    def _decrease(self, reason):
+        self._cut_at = self._issued
+        self._smoothed = None
+        self._set_limit(max(self.min_limit, int(self.limit * self.backoff)), 'down', reason)
+
+    def _set_limit(self, limit, direction, reason):
+        self._acks = 0
+        self._peak = self._inflight
+        if limit == self.limit:
+            return
+        self.limit = limit
+        self.history.append((round(time.monotonic() - self._started, 4), limit))
+        metrics.set_gauge('groq_concurrency_limit', limit)
+        metrics.increment('groq_concurrency_changes_total', direction=direction, reason=reason)
+
+    def call(self, func, *args, **kwargs):
+        """  func(*args, **kwargs) inside a concurrency slot; error results and exceptions count as outcomes.  """
+        ticket = self.acquire()
+        started = time.perf_counter()
+        try:
+            result = func(*args, **kwargs)
+        except Exception as e:
+            self.release(ticket, time.perf_counter() - started, call_outcome(error=e))
+            raise
+        self.release(ticket, time.perf_counter() - started, call_outcome(result))
+        return result
+
+    def wrap(self, func):
+        """  A drop-in replacement for func whose calls are concurrency limited.  """
+        def limited(*args, **kwargs):
+            return self.call(func, *args, **kwargs)
+        return limited
+
+    def print_stats(self):
+        limits = [limit for _, limit in self.history]
+        ups = sum(later > earlier for earlier, later in zip(limits, limits[1:]))
+        print(f"\n🎚️  Adaptive concurrency: limit {self.limit} (range {min(limits)}-{max(limits)}, "
+              f"max {self.max_limit}), {ups} increases, {len(limits) - 1 - ups} decreases")
@@ -0,0 +1,86 @@
+import time
+
+from src import metrics
+
+DEGRADED_COLUMN = 'AI Degraded'
+
+
+class RunDeadline:
+    """
+    A wall-clock budget for the whole run. The LLM stage gets whatever is left
+    minus reserve_seconds, which is kept back so loading and analysis still
+    finish before the deadline.
+    """
+
+    def __init__(self, seconds, reserve_seconds=60.0, min_samples=5):
+        self.seconds = seconds
+        self.reserve_seconds = reserve_seconds
+        self.min_samples = min_samples
+        self.ends_at = time.monotonic() + seconds
+
+    def restarted(self):
+        """  A new deadline with the same budget, starting now (one per run or batch).  """
+        return RunDeadline(self.seconds, reserve_seconds=self.reserve_seconds, min_samples=self.min_samples)
+
+    def llm_time_left(self):
+        return self.ends_at - self.reserve_seconds - time.monotonic()
+
+    def at_risk(self, done, remaining, elapsed):
+        """  True once the projected time for the remaining rows exceeds the LLM budget.  """
+        time_left = self.llm_time_left()
+        if time_left <= 0:
+            return True
+        if done < self.min_samples or remaining == 0:
+            return False
+        projected = elapsed / done * remaining
+        return projected > time_left
+
+
+def degraded_outputs(review_text):
+    """  Local-classifier outputs for a review the LLM had no time for, marked as degraded.  """
+    from src.relabel import LABEL_SOURCE_COLUMN
+    from src.utils import local_sentiment
+
+    result = local_sentiment(review_text)
+    return {
+        'AI Sentiment': result['sentiment'],
+        'AI Summary': result['summary'],
+        'Action Needed?': 'Yes' if result['sentiment'] == 'Negative' else 'No',
+        LABEL_SOURCE_COLUMN: 'local',
+        DEGRADED_COLUMN: 'Yes'
+    }, 'degraded'
+
+
+def iter_with_deadline(results, df, review_column, deadline):
+    """
+    Passes (index, outputs, status) through from results until the deadline is at
+    risk, then stops the LLM work and labels every remaining row locally.
+    """
+    started = time.perf_counter()
+    pending = set(df.index)
+    total = len(pending)
+
+    try:
+        for idx, outputs, status in results:
+            pending.discard(idx)
+            yield idx, dict(outputs, **{DEGRADED_COLUMN: 'No'}), status
+            if idx not in df.index:
+                # Rejected by the quality gate - nothing to project from
+                continue
+
+            done = total - len(pending)
+            if pending and deadline.at_risk(done, len(pending), time.perf_counter() - started):
+                print(f"\n⏰ Deadline at risk: labelling the remaining {len(pending)} reviews locally "
+                      f"(marked '{DEGRADED_COLUMN}' = Yes)")
+                break
+    finally:
+        # Stops the sequential loop / key pool workers
+        results.close()
+
+    texts = df[review_column] if review_column in df.columns else None
+    for idx in df.index:
+        if idx not in pending:
+            continue
+        outputs, status = degraded_outputs(texts[idx] if texts is not None else '')
+        metrics.increment('reviews_total', status=status)
+        yield idx, outputs, status
@@ -1,21 +1,83 @@
+import numpy as np
 import pandas as pd
 import gspread
+from functools import partial
 
+from src import metrics
+from src.prompts import MAX_REVIEW_TOKENS
+from src.relabel import LABEL_SOURCE_COLUMN, LABEL_VERSION_COLUMN
 
-def extract_raw_data(spreadsheet):
-    """ Extracts data from raw_data worksheet."""
+
+def _cell_text(value):
+    """  A typed cell rendered the way get_all_values() would show it.  """
+    if isinstance(value, bool):
+        return 'TRUE' if value else 'FALSE'
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+def _typed_column(values, n_rows):
+    """  One column of unformatted values: int64/float64 when every cell is a number, strings otherwise.  """
+    values = list(values) + [''] * (n_rows - len(values))
+    if values and all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in values):
+        return np.array(values)
+    # Blank or mixed cells keep the string form so staging writes and parquet checkpoints behave as before
+    return np.array([_cell_text(v) for v in values], dtype=object)
+
+
+def _typed_frame(columns):
+    """  DataFrame straight from a column-major Sheets response (header first in each column).  """
+    if not columns:
+        raise ValueError("worksheet is empty")
+
+    n_rows = max(len(column) for column in columns) - 1
+    headers = [_cell_text(column[0]) if column else '' for column in columns]
+    # Positional keys keep duplicate headers apart, like pd.DataFrame(rows, columns=headers)
+    df = pd.DataFrame({i: _typed_column(column[1:], n_rows) for i, column in enumerate(columns)})
+    df.columns = headers
+    return df
+
+
+def sheets_call(method, sheets_limiter=None):
+    """  Counts one Sheets API call, first waiting for a slot in sheets_limiter when one is given.  """
+    if sheets_limiter is not None:
+        sheets_limiter.acquire()
+    metrics.increment('sheets_calls_total', method=method)
+
+
+def extract_raw_data(spreadsheet, worksheet_name='raw_data', typed=False, sheets_limiter=None):
+    """
+    Extracts data from raw_data worksheet (or another worksheet by name).
+
+    typed=True asks the Sheets API for unformatted values, column by column, and
+    builds int/float columns directly from the response instead of parsing
+    formatted strings in clean_data. sheets_limiter (anything with acquire())
+    paces the Sheets calls against a shared quota.
+    """
 
     try:
-        print("EXTRACTING DATA FROM raw_data")
+        print(f"EXTRACTING DATA FROM {worksheet_name}")
         
-        raw_worksheet = spreadsheet.worksheet('raw_data')
-        raw_data = raw_worksheet.get_all_values()
-        
-        # Convert to DataFrame
-        headers = raw_data[0]
-        data_rows = raw_data[1:]
-        
-        df = pd.DataFrame(data_rows, columns=headers)
+        raw_worksheet = spreadsheet.worksheet(worksheet_name)
+
+        if typed:
+            from gspread.utils import DateTimeOption, Dimension, ValueRenderOption
+
+            sheets_call('get', sheets_limiter)
+            columns = raw_worksheet.get(major_dimension=Dimension.cols,
+                                        value_render_option=ValueRenderOption.unformatted,
+                                        date_time_render_option=DateTimeOption.formatted_string)
+            df = _typed_frame(columns)
+        else:
+            sheets_call('get_all_values', sheets_limiter)
+            raw_data = raw_worksheet.get_all_values()
+
+            # Convert to DataFrame
+            headers = raw_data[0]
+            data_rows = raw_data[1:]
+
+            df = pd.DataFrame(data_rows, columns=headers)
         
         print(f"✅ Extracted {len(df)} rows and {len(df.columns)} columns")
         print(f"   Columns: {', '.join(df.columns[:5])}...")
@@ -23,8 +85,8 @@ def extract_raw_data(spreadsheet):
         return df
     
     except gspread.exceptions.WorksheetNotFound:
-        print("Error: 'raw_data' worksheet not found!")
-        print("Make sure you have a worksheet named exactly 'raw_data'")
+        print(f"Error: '{worksheet_name}' worksheet not found!")
+        print(f"Make sure you have a worksheet named exactly '{worksheet_name}'")
         return None
     
     except Exception as e:
@@ -33,8 +95,78 @@ def extract_raw_data(spreadsheet):
 
 
 
-def clean_data(df):
-    """ Cleans and standardizes review data.  """
+# Rows per worker below which clean_data(workers=N) stays serial (pool start-up dominates)
+MIN_SHARD_ROWS = 50_000
+
+# Frame inherited by forked cleaning workers, so shards are not pickled to them
+_SHARD_SOURCE = None
+
+
+def _normalize_text(df, review_col, text_cols):
+    """  Review sentinels and whitespace for a frame or a row shard of it. Returns ({column: Series}, empty reviews).  """
+    cleaned = {}
+    missing_reviews = 0
+
+    if review_col:
+        reviews = df[review_col].replace(['', 'nan', 'NaN', 'None'], pd.NA)
+        missing_reviews = int(reviews.isna().sum())
+        cleaned[review_col] = reviews
+
+    for col in text_cols:
+        values = cleaned[col] if col in cleaned else df[col]
+        # Missing cells become '' here, before str() turns them into '<NA>' / 'nan'
+        text = values.astype(str).str.strip().where(values.notna().to_numpy(), '')
+        cleaned[col] = text.replace('nan', '')
+
+    return cleaned, missing_reviews
+
+
+def _normalize_shard(bounds, review_col, text_cols, shard=None):
+    if shard is None:
+        start, stop = bounds
+        shard = _SHARD_SOURCE.iloc[start:stop]
+    return _normalize_text(shard, review_col, text_cols)
+
+
+def _normalize_text_parallel(df, review_col, text_cols, workers):
+    """
+    _normalize_text over row-range shards in a process pool, reassembled in
+    order. With the fork start method the workers read their shard from the
+    inherited frame and only the cleaned columns are sent back.
+    """
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+
+    global _SHARD_SOURCE
+
+    step = -(-len(df) // workers)
+    bounds = [(start, min(start + step, len(df))) for start in range(0, len(df), step)]
+    forked = 'fork' in multiprocessing.get_all_start_methods()
+    context = multiprocessing.get_context('fork' if forked else None)
+
+    _SHARD_SOURCE = df if forked else None
+    try:
+        with ProcessPoolExecutor(max_workers=len(bounds), mp_context=context) as executor:
+            futures = [
+                executor.submit(_normalize_shard, (start, stop), review_col, text_cols,
+                                None if forked else df.iloc[start:stop])
+                for start, stop in bounds
+            ]
+            shards = [future.result() for future in futures]
+    finally:
+        _SHARD_SOURCE = None
+
+    columns = {col: pd.concat([cleaned[col] for cleaned, _ in shards]) for col in shards[0][0]}
+    return columns, sum(missing for _, missing in shards)
+
+
+def clean_data(df, workers=None):
+    """
+    Cleans and standardizes review data.
+
+    workers > 1 normalises the text columns in that many processes for very
+    large frames; the result is identical to the serial run.
+    """
     try:
         df_clean = df.copy()
         
@@ -44,7 +176,9 @@ def clean_data(df):
         for col in df_clean.columns:
             # Convert to numeric
             try:
-                df_clean[col] = pd.to_numeric(df_clean[col], errors='ignore')
+                # Typed extraction already delivers int/float columns
+                if df_clean[col].dtype == object:
+                    df_clean[col] = pd.to_numeric(df_clean[col], errors='ignore')
                 if df_clean[col].dtype in ['int64', 'float64']:
                     numeric_cols.append(col)
             except:
@@ -59,17 +193,19 @@ def clean_data(df):
                 review_col = col
                 break
         
+        #Standardize text
+        text_cols = list(df_clean.select_dtypes(include=['object']).columns)
+        if workers and workers > 1 and len(df_clean) >= workers * MIN_SHARD_ROWS:
+            print(f"   Normalizing text in {workers} processes...")
+            cleaned, missing_reviews = _normalize_text_parallel(df_clean, review_col, text_cols, workers)
+        else:
+            cleaned, missing_reviews = _normalize_text(df_clean, review_col, text_cols)
+
+        for col, values in cleaned.items():
+            df_clean[col] = values
+
         if review_col:
-            df_clean[review_col] = df_clean[review_col].replace(['', 'nan', 'NaN', 'None'], pd.NA)
-            
-            missing_reviews = df_clean[review_col].isna().sum()
             print(f"   Found {missing_reviews} empty reviews")
-
-         #Standardize text
-        text_cols = df_clean.select_dtypes(include=['object']).columns
-        for col in text_cols:
-            df_clean[col] = df_clean[col].astype(str).str.strip()
-            df_clean[col] = df_clean[col].replace('nan', '')
         
         # Remove completely empty rows 
         initial_rows = len(df_clean)
@@ -92,14 +228,16 @@ def clean_data(df):
         return df
 
 
-def load_to_staging(spreadsheet, df):
+def load_to_staging(spreadsheet, df, sheets_limiter=None):
     """ Loads cleaned data to staging worksheet (idempotent).  """
     try:
         staging_worksheet = spreadsheet.worksheet('staging')
+        sheets_call('get_all_values', sheets_limiter)
         existing_data = staging_worksheet.get_all_values()
         
         if len(existing_data) > 1:  
             print("   Clearing existing data for idempotent re-run...")
+            sheets_call('clear', sheets_limiter)
             staging_worksheet.clear()
         
         # Prepare data for upload by Converting DataFrame to list of lists (Google Sheets format)
@@ -108,6 +246,7 @@ def load_to_staging(spreadsheet, df):
         print(f"📝 Writing {len(df)} rows to staging worksheet...")
         
         # Update the worksheet
+        sheets_call('update', sheets_limiter)
         staging_worksheet.update(
             range_name='A1',  # Start at cell A1
             values=data_to_upload
@@ -128,61 +267,247 @@ def load_to_staging(spreadsheet, df):
     
 
 
-def process_reviews_with_llm(df, review_column='Review Text'):
-    """  Processes reviews through Groq LLM to get sentiment and summary.  """
+LLM_COLUMNS = ['AI Sentiment', 'AI Summary', 'Action Needed?', LABEL_VERSION_COLUMN, LABEL_SOURCE_COLUMN]
+
+
+def llm_columns(deadline=None):
+    """  Output columns of the LLM stage; a deadline adds the degraded marker column.  """
+    if deadline is None:
+        return list(LLM_COLUMNS)
+    from src.deadline import DEGRADED_COLUMN
+
+    return LLM_COLUMNS + [DEGRADED_COLUMN]
+
+
+def iter_review_results(df, review_column='Review Text', key_pool=None, router=None,
+                        prioritize=False, on_action_needed=None, deadline=None, cache=None,
+                        rate_limiter=None, hedger=None, stream_completions=False, concurrency=None,
+                        max_review_tokens=MAX_REVIEW_TOKENS):
+    """  Yields (index, outputs, status) for each review as soon as it has been processed.
+
+    outputs maps the LLM_COLUMNS to their values; status is 'processed', 'skipped'
+    (empty review) or 'error'. With a KeyPool, reviews are spread over its keys
+    concurrently and results arrive in completion order rather than row order.
+    With a ModelRouter, each review is sent to the model the router picks for it.
+    prioritize=True processes the most urgent reviews (see src.priority) first, and
+    on_action_needed(index, row, outputs) is called for every 'Action Needed? = Yes'
+    result the moment it is known. With a RunDeadline, rows the LLM has no time
+    for are labelled locally with status 'degraded' (see src.deadline). A shared
+    ResultCache serves repeated reviews without an API call, and a shared
+    rate_limiter (acquire() before each call) replaces the fixed pause between calls.
+    A RequestHedger (src.hedging) re-issues requests that run past its latency
+    percentile. stream_completions=True stops reading each completion as soon as
+    its SENTIMENT and SUMMARY lines are in. A ConcurrencyController
+    (src.concurrency) runs calls in parallel under its adaptive in-flight limit.
+    Reviews longer than max_review_tokens (estimated) are trimmed before prompting.
+    Empty and junk reviews are filtered out first by the vectorised quality gate
+    (src.quality) and get their outputs straight away, with status 'skipped'
+    (empty) or 'rejected'.
+    """
+    from src.quality import quality_gate
+
+    df, gate = quality_gate(df, review_column)
+    models = router.route(df, review_column) if router is not None else None
+
+    if prioritize:
+        from src.priority import priority_order
+
+        df = df.loc[priority_order(df, review_column)]
+
+    results = _gated_results(gate, _iter_review_results(df, review_column, key_pool, models, cache,
+                                                        rate_limiter, hedger, stream_completions,
+                                                        concurrency, max_review_tokens))
+    if deadline is not None:
+        from src.deadline import iter_with_deadline
+
+        results = iter_with_deadline(results, df, review_column, deadline)
+
+    for idx, outputs, status in results:
+        if on_action_needed is not None and outputs['Action Needed?'] == 'Yes':
+            on_action_needed(idx, df.loc[idx], outputs)
+        yield idx, outputs, status
+
+
+def _gated_results(gate, results):
+    """  Yields the quality gate's rejected rows first, then the LLM results.  """
+    from src.quality import rejected_outputs
+
+    for idx, reason in gate.loc[~gate['valid'], 'reason'].items():
+        status = 'skipped' if reason == 'empty' else 'rejected'
+        metrics.increment('reviews_total', status=status)
+        yield idx, rejected_outputs(reason), status
+
     try:
-        from src.utils import call_groq_llm
-        import time
+        yield from results
+    finally:
+        results.close()
+
 
+def _iter_review_results(df, review_column, key_pool, models, cache, rate_limiter, hedger=None,
+                         stream_completions=False, concurrency=None, max_review_tokens=MAX_REVIEW_TOKENS):
+    from src.utils import call_groq_llm
+    import time
+
+    if key_pool is not None:
+        yield from key_pool.iter_results(df, review_column, models=models, cache=cache, hedger=hedger,
+                                         stream_completions=stream_completions, concurrency=concurrency,
+                                         max_review_tokens=max_review_tokens)
+        return
+
+    if max_review_tokens != MAX_REVIEW_TOKENS:
+        call_groq_llm = partial(call_groq_llm, max_review_tokens=max_review_tokens)
+    if stream_completions:
+        call_groq_llm = partial(call_groq_llm, stream=True)
+    if hedger is not None:
+        # A hedge is a request of its own, so it takes a rate-limiter slot (and a concurrency slot) too
+        before_hedge = (lambda *args, **kwargs: rate_limiter.acquire()) if rate_limiter is not None else None
+        call_groq_llm = hedger.wrap(call_groq_llm, before_hedge=before_hedge, concurrency=concurrency)
+    elif concurrency is not None:
+        call_groq_llm = concurrency.wrap(call_groq_llm)
+
+    if concurrency is not None:
+        yield from _iter_concurrent_results(df, review_column, models, concurrency.max_limit,
+                                            partial(_label_review, call_groq_llm=call_groq_llm, cache=cache,
+                                                    rate_limiter=rate_limiter))
+        return
+
+    for idx, row in df.iterrows():
+        review_text = row.get(review_column, '')
+        model = models.get(idx) if models is not None else None
+        labeler = partial(_label_review, call_groq_llm=call_groq_llm, model=model, cache=cache,
+                          rate_limiter=rate_limiter)
+        outputs, status = _review_outputs(review_text, labeler)
+        metrics.increment('reviews_total', status=status)
+        yield idx, outputs, status
+        
+        if status == 'processed' and rate_limiter is None:
+            time.sleep(0.5)
+
+
+def _iter_concurrent_results(df, review_column, models, workers, labeler):
+    """  Labels reviews on a thread pool and yields (index, outputs, status) in completion order.  """
+    from concurrent.futures import ThreadPoolExecutor, as_completed
+
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='groq')
+    try:
+        futures = {}
+        for idx, row in df.iterrows():
+            model = models.get(idx) if models is not None else None
+            future = executor.submit(_review_outputs, row.get(review_column, ''), partial(labeler, model=model))
+            futures[future] = idx
+
+        for future in as_completed(futures):
+            outputs, status = future.result()
+            metrics.increment('reviews_total', status=status)
+            yield futures[future], outputs, status
+    finally:
+        # A deadline or early close drops the reviews that have not started yet
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+def _label_review(review_text, call_groq_llm, model=None, cache=None, rate_limiter=None):
+    """  One LLM result for a review, from the shared cache when possible.  """
+    if cache is not None:
+        cached = cache.get(review_text, model)
+        if cached is not None:
+            return cached
+    
+    if rate_limiter is not None:
+        rate_limiter.acquire()
+    
+    result = call_groq_llm(review_text, model=model) if model else call_groq_llm(review_text)
+    
+    if cache is not None and result and result['summary'] != 'Error processing review':
+        cache.put(review_text, model, result)
+    return result
+
+
+def _review_outputs(review_text, call_groq_llm):
+    """  Returns (outputs, status) for a single review the quality gate let through.  """
+    result = call_groq_llm(str(review_text))
+    
+    if result:
+        outputs = {
+            'AI Sentiment': result['sentiment'],
+            'AI Summary': result['summary'],
+            'Action Needed?': 'Yes' if result['sentiment'] == 'Negative' else 'No',
+            LABEL_VERSION_COLUMN: result.get('version', ''),
+            LABEL_SOURCE_COLUMN: result.get('source', 'llm')
+        }
+        return outputs, 'processed'
+    
+    outputs = {
+        'AI Sentiment': 'Neutral',
+        'AI Summary': 'Error processing review',
+        'Action Needed?': 'No',
+        LABEL_SOURCE_COLUMN: 'error'
+    }
+    return outputs, 'error'
+
+
+def process_reviews_with_llm(df, review_column='Review Text', key_pool=None, router=None,
+                             prioritize=False, on_action_needed=None, deadline=None, cache=None,
+                             rate_limiter=None, hedger=None, stream_completions=False, concurrency=None,
+                             max_review_tokens=MAX_REVIEW_TOKENS):
+    """  Processes reviews through Groq LLM to get sentiment and summary.  """
+    try:
         df_processed = df.copy()
         
         # Initialize new columns
-        df_processed['AI Sentiment'] = ''
-        df_processed['AI Summary'] = ''
-        df_processed['Action Needed?'] = ''
+        for col in llm_columns(deadline):
+            df_processed[col] = ''
         
         total_reviews = len(df_processed)
         processed_count = 0
         skipped_count = 0
+        degraded_count = 0
+        rejected_count = 0
         
         print(f"\n Total reviews to process: {total_reviews}")
         print("⏳ This may take a few minutes...\n")
         
+        progress = metrics.ProgressReporter(total_reviews)
+        
         # Process each review
-        for idx, row in df_processed.iterrows():
-            review_text = row.get(review_column, '')
+        for idx, outputs, status in iter_review_results(df_processed, review_column,
+                                                         key_pool=key_pool, router=router,
+                                                         prioritize=prioritize,
+                                                         on_action_needed=on_action_needed,
+                                                         deadline=deadline, cache=cache,
+                                                         rate_limiter=rate_limiter, hedger=hedger,
+                                                         stream_completions=stream_completions,
+                                                         concurrency=concurrency,
+                                                         max_review_tokens=max_review_tokens):
+            for col, value in outputs.items():
+                df_processed.at[idx, col] = value
             
-            if pd.isna(review_text) or str(review_text).strip() == '' or str(review_text).lower() == 'nan':
-                df_processed.at[idx, 'AI Sentiment'] = 'Neutral'
-                df_processed.at[idx, 'AI Summary'] = 'No review text provided'
-                df_processed.at[idx, 'Action Needed?'] = 'No'
+            if status == 'processed':
+                processed_count += 1
+            elif status == 'skipped':
                 skipped_count += 1
-            else:
-                result = call_groq_llm(str(review_text))
-                
-                if result:
-                    df_processed.at[idx, 'AI Sentiment'] = result['sentiment']
-                    df_processed.at[idx, 'AI Summary'] = result['summary']
-                    
-                    if result['sentiment'] == 'Negative':
-                        df_processed.at[idx, 'Action Needed?'] = 'Yes'
-                    else:
-                        df_processed.at[idx, 'Action Needed?'] = 'No'
-                    
-                    processed_count += 1
-
-                    time.sleep(0.5)
-                else:
-                    df_processed.at[idx, 'AI Sentiment'] = 'Neutral'
-                    df_processed.at[idx, 'AI Summary'] = 'Error processing review'
-                    df_processed.at[idx, 'Action Needed?'] = 'No'
+            elif status == 'degraded':
+                degraded_count += 1
+            elif status == 'rejected':
+                rejected_count += 1
             
-            if (idx + 1) % 10 == 0:
-                print(f"   Processed {idx + 1}/{total_reviews} reviews...")
+            progress.update()
         
         print(f"\n✅ LLM Processing complete!")
         print(f"   ✓ Processed with LLM: {processed_count}")
         print(f"   ⊘ Skipped (empty): {skipped_count}")
+        if rejected_count:
+            print(f"   ✗ Rejected by quality gate (no LLM call): {rejected_count}")
+        if degraded_count:
+            print(f"   ⏰ Degraded (local classifier, re-process later): {degraded_count}")
+        
+        if key_pool is not None:
+            key_pool.print_stats()
+        if router is not None:
+            router.print_stats()
+        if hedger is not None:
+            hedger.print_stats()
+        if concurrency is not None:
+            concurrency.print_stats()
         
         sentiment_counts = df_processed['AI Sentiment'].value_counts()
         print(f"\n Sentiment Distribution:")
@@ -196,15 +521,17 @@ def process_reviews_with_llm(df, review_column='Review Text'):
         print(f"❌ Error processing reviews with LLM: {e}")
         return df
     
-def load_to_processed(spreadsheet, df):
+def load_to_processed(spreadsheet, df, sheets_limiter=None):
     """  Loads processed data (with LLM results) to processed worksheet (idempotent).  """
     try:
         processed_worksheet = spreadsheet.worksheet('processed')        
+        sheets_call('get_all_values', sheets_limiter)
         existing_data = processed_worksheet.get_all_values()
         
         if len(existing_data) > 1: 
             print("⚠️  Processed worksheet already contains data")
             print("   Clearing existing data for idempotent re-run...")
+            sheets_call('clear', sheets_limiter)
             processed_worksheet.clear()
         
         data_to_upload = [df.columns.tolist()] + df.values.tolist()
@@ -212,6 +539,7 @@ def load_to_processed(spreadsheet, df):
         print(f"📝 Writing {len(df)} rows to processed worksheet...")
         print(f"   Columns include: {', '.join(df.columns[-3:])}...")
         
+        sheets_call('update', sheets_limiter)
         processed_worksheet.update(
             range_name='A1',
             values=data_to_upload
@@ -0,0 +1,164 @@
+import queue
+import threading
+import time
+from collections import deque
+
+from src import metrics
+
+
+class RequestHedger:
+    """
+    Hedges slow LLM requests. If a call has not returned after the given
+    percentile of recent call latencies, the same call is issued once more and
+    whichever finishes first (successfully) wins; the other's result is
+    discarded. An attempt that raises or returns an error result (a dict with
+    an 'error' key, as call_groq_llm does on failure) has not succeeded, so a
+    fast 429 never beats a slower answer. Hedges are capped at max_extra_rate
+    of all calls, and are charged to the caller's rate budget (see wrap). Only
+    successful calls feed the latency percentile, so fast 429s during throttling
+    do not trigger more hedges.
+
+    Outcomes are counted in hedged_requests_total{outcome}: 'issued', 'capped'
+    (a hedge was due but over the cap), 'hedge_won', 'primary_won' and
+    'abandoned' (the loser was still running when the winner returned; it keeps
+    spending quota until it ends).
+    """
+
+    def __init__(self, percentile=95, max_extra_rate=0.05, min_samples=20, window=200,
+                 min_delay=0.05):
+        self.percentile = percentile
+        self.max_extra_rate = max_extra_rate
+        self.min_samples = min_samples
+        self.min_delay = min_delay
+        self._latencies = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.hedges = 0
+
+    def delay(self):
+        """  Seconds to wait before hedging, or None while there are too few samples.  """
+        with self._lock:
+            if len(self._latencies) < self.min_samples:
+                return None
+            ordered = sorted(self._latencies)
+        position = min(len(ordered) - 1, int(len(ordered) * self.percentile / 100))
+        return max(ordered[position], self.min_delay)
+
+    def _record(self, latency):
+        with self._lock:
+            self._latencies.append(latency)
+
+    def _may_hedge(self):
+        with self._lock:
+            if self.hedges + 1 > self.calls * self.max_extra_rate:
+                return False
+            self.hedges += 1
+            return True
+
+    def _start(self, func, args, kwargs, attempt, done, concurrency=None):
+        """  Runs one attempt on a thread; returns its slot for _free (None without a concurrency controller).  """
+        slot = {'ticket': concurrency.acquire(), 'freed': False, 'lock': threading.Lock()} if concurrency else None
+
+        def run():
+            from src.concurrency import call_outcome
+
+            started = time.perf_counter()
+            try:
+                result, error = func(*args, **kwargs), None
+            except Exception as e:
+                result, error = None, e
+            latency = time.perf_counter() - started
+            outcome = call_outcome(result, error)
+            if outcome == 'success':
+                self._record(latency)
+            self._free(concurrency, slot, latency, outcome)
+            done.put((attempt, result, error))
+
+        # Daemon threads: a losing request that never returns cannot hold up exit
+        threading.Thread(target=run, name=f'groq-{attempt}', daemon=True).start()
+        return slot
+
+    @staticmethod
+    def _free(concurrency, slot, latency, outcome):
+        """  Releases an attempt's concurrency slot once, whether it ended or was abandoned first.  """
+        if slot is None:
+            return
+        with slot['lock']:
+            if slot['freed']:
+                return
+            slot['freed'] = True
+        concurrency.release(slot['ticket'], latency, outcome)
+
+    def call(self, func, *args, **kwargs):
+        """  func(*args, **kwargs), hedged once if it is slow. Re-raises only if every attempt raised.  """
+        return self._call(func, args, kwargs)
+
+    def _call(self, func, args, kwargs, before_hedge=None, concurrency=None):
+        with self._lock:
+            self.calls += 1
+
+        done = queue.Queue()
+        slots = {'primary': self._start(func, args, kwargs, 'primary', done, concurrency)}
+        outstanding = 1
+        hedged = False
+
+        delay = self.delay()
+        if delay is not None:
+            try:
+                # Peek: a fast primary goes straight back for the loop below
+                done.put(done.get(timeout=delay))
+            except queue.Empty:
+                if self._may_hedge():
+                    if before_hedge is not None:
+                        before_hedge(*args, **kwargs)
+                    metrics.increment('hedged_requests_total', outcome='issued')
+                    metrics.observe('hedge_delay_seconds', delay)
+                    slots['hedge'] = self._start(func, args, kwargs, 'hedge', done, concurrency)
+                    outstanding += 1
+                    hedged = True
+                else:
+                    metrics.increment('hedged_requests_total', outcome='capped')
+
+        error = error_result = None
+        while outstanding:
+            attempt, result, exc = done.get()
+            outstanding -= 1
+            slots.pop(attempt)
+            if exc is None and not (isinstance(result, dict) and 'error' in result):
+                if hedged:
+                    metrics.increment('hedged_requests_total', outcome=f'{attempt}_won')
+                if outstanding:
+                    # The loser runs on detached; it stops holding a concurrency slot now
+                    metrics.increment('hedged_requests_total', outstanding, outcome='abandoned')
+                    for slot in slots.values():
+                        self._free(concurrency, slot, 0.0, 'abandoned')
+                return result
+            if exc is None:
+                error_result = error_result or result
+            else:
+                error = error or exc
+        if error_result is not None:
+            return error_result
+        raise error
+
+    def wrap(self, func, before_hedge=None, concurrency=None):
+        """
+        A drop-in replacement for func whose calls are hedged. before_hedge(*args,
+        **kwargs) runs before each hedge is sent, e.g. to take a rate-limiter slot
+        or key budget for it, so hedges cannot push the run into 429s. With a
+        ConcurrencyController every attempt takes a slot of its own, and the
+        loser's slot is freed as soon as the winner returns.
+        """
+        def hedged(*args, **kwargs):
+            return self._call(func, args, kwargs, before_hedge, concurrency)
+        return hedged
+
+    def print_stats(self):
+        issued = metrics.get_counter('hedged_requests_total', outcome='issued')
+        won = metrics.get_counter('hedged_requests_total', outcome='hedge_won')
+        capped = metrics.get_counter('hedged_requests_total', outcome='capped')
+        rate = issued / self.calls * 100 if self.calls else 0.0
+        delay = self.delay()
+        delay_text = f"{delay:.2f}s" if delay is not None else '-'
+        print(f"\n🪁 Hedged requests: {issued} of {self.calls} calls ({rate:.1f}%), {won} won by the hedge, "
+              f"{capped} capped; current hedge delay {delay_text} (p{self.percentile})")
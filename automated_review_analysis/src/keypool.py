@@ -0,0 +1,250 @@
+import os
+import queue
+import threading
+import time
+from functools import partial
+
+from src import metrics
+from src.prompts import MAX_REVIEW_TOKENS
+
+
+class KeyState:
+    """
+    One API key with its own request budget and usage counters.
+    """
+
+    def __init__(self, api_key, requests_per_minute, tokens_per_minute=None):
+        self.api_key = api_key
+        # Never log the key itself
+        self.label = f"...{api_key[-4:]}" if len(api_key) > 4 else 'key'
+        self.interval = 60.0 / requests_per_minute
+        self.seconds_per_token = 60.0 / tokens_per_minute if tokens_per_minute else 0.0
+        self.next_allowed = 0.0
+        self.cooldown_until = 0.0
+        self.lock = threading.Lock()
+
+        self.requests = 0
+        self.successes = 0
+        self.throttled = 0
+        self.errors = 0
+        self.latency_total = 0.0
+
+    def reserve(self, tokens=0):
+        """  Reserves the next request slot for this key; returns seconds to wait before using it.
+
+        A request estimated at `tokens` holds the key for at least its share of the
+        tokens-per-minute budget, so long reviews space requests further apart.
+        """
+        with self.lock:
+            now = time.monotonic()
+            start = max(now, self.next_allowed, self.cooldown_until)
+            self.next_allowed = start + max(self.interval, tokens * self.seconds_per_token)
+            return start - now
+
+    def cooldown_remaining(self):
+        with self.lock:
+            return max(0.0, self.cooldown_until - time.monotonic())
+
+    def cool_down(self, seconds):
+        with self.lock:
+            self.cooldown_until = max(self.cooldown_until, time.monotonic() + seconds)
+
+    def record(self, outcome, latency=None):
+        with self.lock:
+            self.requests += 1
+            if outcome == 'success':
+                self.successes += 1
+                self.latency_total += latency
+            elif outcome == 'throttled':
+                self.throttled += 1
+            else:
+                self.errors += 1
+        metrics.increment('groq_key_requests_total', key=self.label, outcome=outcome)
+
+
+def _error_outputs():
+    from src.relabel import LABEL_SOURCE_COLUMN
+
+    return {
+        'AI Sentiment': 'Neutral',
+        'AI Summary': 'Error processing review',
+        'Action Needed?': 'No',
+        LABEL_SOURCE_COLUMN: 'error'
+    }
+
+
+class KeyPool:
+    """
+    A pool of Groq API keys, each with its own requests-per-minute budget.
+
+    iter_results() runs workers_per_key threads per key over a shared work queue,
+    so a key that is throttled (429) or failing simply stops taking work while it
+    cools down and the other keys pick its reviews up.
+    """
+
+    def __init__(self, api_keys, requests_per_minute=30, workers_per_key=2,
+                 cooldown_seconds=20.0, max_attempts=3, tokens_per_minute=None):
+        if not api_keys:
+            raise ValueError("KeyPool needs at least one API key")
+        self.keys = [KeyState(key, requests_per_minute, tokens_per_minute) for key in api_keys]
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.workers_per_key = workers_per_key
+        self.cooldown_seconds = cooldown_seconds
+        self.max_attempts = max_attempts
+
+    def split(self, parts):
+        """  A pool over the same keys with 1/parts of each key's budget, for one of `parts` processes.  """
+        return KeyPool([key.api_key for key in self.keys], requests_per_minute=self.requests_per_minute / parts,
+                       workers_per_key=self.workers_per_key, cooldown_seconds=self.cooldown_seconds,
+                       max_attempts=self.max_attempts,
+                       tokens_per_minute=self.tokens_per_minute / parts if self.tokens_per_minute else None)
+
+    @classmethod
+    def from_env(cls, **kwargs):
+        """  Builds a pool from GROQ_API_KEYS (comma separated), falling back to GROQ_API_KEY.  """
+        from src.utils import load_env
+
+        load_env()
+        raw = os.getenv('GROQ_API_KEYS') or os.getenv('GROQ_API_KEY') or ''
+        keys = [key.strip() for key in raw.split(',') if key.strip()]
+        return cls(keys, **kwargs)
+
+    def _worker(self, key, work, results, stop, cache, hedger=None, stream_completions=False, concurrency=None,
+                max_review_tokens=MAX_REVIEW_TOKENS):
+        from src.etl import _review_outputs
+        from src.prompts import request_tokens
+        from src.utils import call_groq_llm, is_rate_limited
+
+        if max_review_tokens != MAX_REVIEW_TOKENS:
+            call_groq_llm = partial(call_groq_llm, max_review_tokens=max_review_tokens)
+        if stream_completions:
+            call_groq_llm = partial(call_groq_llm, stream=True)
+        if hedger is not None:
+            # Each hedge waits for its own slot in this key's request / token budget
+            call_groq_llm = hedger.wrap(
+                call_groq_llm,
+                before_hedge=lambda text, **kwargs: stop.wait(key.reserve(request_tokens(text, max_review_tokens))),
+                concurrency=concurrency)
+        elif concurrency is not None:
+            call_groq_llm = concurrency.wrap(call_groq_llm)
+
+        def labeler(text, model=None):
+            result = call_groq_llm(text, api_key=key.api_key, raise_errors=True, model=model)
+            if cache is not None:
+                cache.put(text, model, result)
+            return result
+
+        while not stop.is_set():
+            # A cooling-down key takes no work, so its share flows to the other keys
+            cooldown = key.cooldown_remaining()
+            if cooldown > 0:
+                stop.wait(min(cooldown, 0.5))
+                continue
+
+            try:
+                idx, review_text, attempt, model = work.get(timeout=0.1)
+            except queue.Empty:
+                continue
+
+            try:
+                cached = cache.get(review_text, model) if cache is not None else None
+                if cached is not None:
+                    results.put((idx, *_review_outputs(review_text, lambda text: cached)))
+                    continue
+
+                # A deadline or close must not wait out this key's cooldown
+                if stop.wait(key.reserve(request_tokens(review_text, max_review_tokens))):
+                    return
+            except Exception as e:
+                # Every dequeued review must produce a result, or iter_results waits forever
+                print(f"⚠️  Error preparing review {idx} for key {key.label}: {e}")
+                results.put((idx, _error_outputs(), 'error'))
+                continue
+
+            started = time.perf_counter()
+            try:
+                outputs, status = _review_outputs(review_text, partial(labeler, model=model))
+            except Exception as e:
+                if is_rate_limited(e):
+                    key.cool_down(self.cooldown_seconds)
+                    key.record('throttled')
+                else:
+                    key.cool_down(key.interval)
+                    key.record('error')
+
+                if attempt + 1 < self.max_attempts:
+                    # Hand the review back so another (healthy) key can take it
+                    metrics.increment('groq_retries_total')
+                    work.put((idx, review_text, attempt + 1, model))
+                else:
+                    results.put((idx, _error_outputs(), 'error'))
+                continue
+
+            key.record('success', time.perf_counter() - started)
+            results.put((idx, outputs, status))
+
+    def iter_results(self, df, review_column='Review Text', models=None, cache=None, hedger=None,
+                     stream_completions=False, concurrency=None, max_review_tokens=MAX_REVIEW_TOKENS):
+        """  Yields (index, outputs, status) per review, in completion order.
+
+        models optionally maps row index -> Groq model (see ModelRouter.route); a
+        ResultCache answers repeated reviews without spending any key's budget. A
+        RequestHedger's duplicate requests go to the same key as the original. A
+        ConcurrencyController caps the pool's in-flight calls, and the pool starts
+        enough threads for its limit to grow up to max_limit. max_review_tokens
+        overrides the per-review prompt budget (and what each request reserves).
+        """
+        work = queue.Queue()
+        # A missing review column behaves like the sequential path: every row is empty
+        texts = df[review_column] if review_column in df.columns else [''] * len(df)
+        for idx, review_text in zip(df.index, texts):
+            model = models.get(idx) if models is not None else None
+            work.put((idx, review_text, 0, model))
+        total = len(df)
+
+        results = queue.Queue()
+        stop = threading.Event()
+        workers_per_key = self.workers_per_key
+        if concurrency is not None:
+            workers_per_key = max(workers_per_key, -(-concurrency.max_limit // len(self.keys)))
+        threads = [
+            threading.Thread(target=self._worker,
+                             args=(key, work, results, stop, cache, hedger, stream_completions, concurrency,
+                                   max_review_tokens),
+                             name=f'groq-{key.label}-{n}', daemon=True)
+            for key in self.keys for n in range(workers_per_key)
+        ]
+        for thread in threads:
+            thread.start()
+
+        try:
+            for _ in range(total):
+                idx, outputs, status = results.get()
+                metrics.increment('reviews_total', status=status)
+                yield idx, outputs, status
+        finally:
+            stop.set()
+            for thread in threads:
+                thread.join()
+
+    def stats(self):
+        """  Per-key usage: requests, successes, throttled, errors and mean latency.  """
+        return [
+            {
+                'key': key.label,
+                'requests': key.requests,
+                'successes': key.successes,
+                'throttled': key.throttled,
+                'errors': key.errors,
+                'mean_latency': round(key.latency_total / key.successes, 3) if key.successes else None
+            }
+            for key in self.keys
+        ]
+
+    def print_stats(self):
+        print(f"\n🔑 Per-key usage ({len(self.keys)} keys):")
+        for row in self.stats():
+            latency = f"{row['mean_latency']:.2f}s" if row['mean_latency'] is not None else '-'
+            print(f"   {row['key']}: {row['successes']} ok, {row['throttled']} throttled, "
+                  f"{row['errors']} errors, mean latency {latency}")
@@ -0,0 +1,47 @@
+import threading
+from collections import OrderedDict
+
+from src import metrics
+from src.checkpoints import fingerprint
+
+
+class ResultCache:
+    """
+    Thread-safe, size-bounded (LRU) cache of LLM results keyed by model, prompt
+    template and normalised review text. One instance can be shared by every
+    sheet in a multi-sheet run, so a review seen by one brand is never paid for
+    twice.
+    """
+
+    def __init__(self, max_entries=100_000):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(review_text, model):
+        from src.prompts import PROMPT_TEMPLATE
+        from src.utils import DEFAULT_MODEL
+
+        return fingerprint(model or DEFAULT_MODEL, PROMPT_TEMPLATE, ' '.join(str(review_text).split()).lower())
+
+    def get(self, review_text, model=None):
+        key = self._key(review_text, model)
+        with self._lock:
+            result = self._entries.get(key)
+            if result is not None:
+                self._entries.move_to_end(key)
+        metrics.increment('llm_cache_total', result='hit' if result is not None else 'miss')
+        return dict(result) if result is not None else None
+
+    def put(self, review_text, model, result):
+        key = self._key(review_text, model)
+        with self._lock:
+            self._entries[key] = dict(result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
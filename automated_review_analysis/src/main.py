@@ -1,84 +1,137 @@
-from src.utils import (connect_to_google_sheets, call_groq_llm)
-from src.etl import (
-    extract_raw_data, 
-    clean_data, 
-    load_to_staging,
-    process_reviews_with_llm,
-    load_to_processed
-)
-from src.analysis import (
-    calculate_sentiment_breakdown,
-    identify_top_classes,
-    create_visualizations,
-    generate_insights_report
-)
-def run_etl_pipeline(spreadsheet):
+import argparse
+import os
+import sys
+import time
+
+from src import metrics, profiling
+
+# Stage modules (and with them pandas, gspread, groq, matplotlib...) are imported
+# inside the functions below so each CLI subcommand only pays for what it runs.
+STAGES = ['extract', 'clean', 'llm', 'analyze']
+
+
+def run_etl_pipeline(spreadsheet, raw_df=None, clean_workers=None):
     """  Runs the complete ETL pipeline: Extract → Clean → Load to Staging.  """
-    raw_df = extract_raw_data(spreadsheet)
+    from src.etl import extract_raw_data, clean_data, load_to_staging
+
+    if raw_df is None:
+        raw_df = extract_raw_data(spreadsheet, typed=True)
     if raw_df is None:
         print("ETL Pipeline failed at extraction step")
         return None
-    
-    clean_df = clean_data(raw_df)
+
+    with profiling.track_memory('clean_data'):
+        clean_df = clean_data(raw_df, workers=clean_workers)
     if clean_df is None:
         print("ETL Pipeline failed at cleaning step")
         return None
-    
+
     success = load_to_staging(spreadsheet, clean_df)
     if not success:
         print("ETL Pipeline failed at loading step")
         return None
-   
+
     return clean_df
 
-    
-def run_llm_pipeline(spreadsheet, cleaned_data):
-    """  Runs the LLM processing pipeline  """
-    processed_df = process_reviews_with_llm(cleaned_data)
-    if processed_df is None:
-        print("LLM Pipeline failed at processing step")
-        return None
-    
-    success = load_to_processed(spreadsheet, processed_df)
-    if not success:
-        print("LLM Pipeline failed at loading step")
-        return None
-    
+
+def run_llm_pipeline(spreadsheet, cleaned_data, overlap=False, running=None, llm_options=None,
+                     results_db=None):
+    """  Runs the LLM processing pipeline
+
+    With overlap=True, LLM results stream to the processed worksheet from a
+    background writer while later reviews are still being classified, and the
+    optional RunningBreakdown is updated as each result arrives. llm_options are
+    passed through to the LLM stage (e.g. key_pool). With results_db, the processed
+    rows are also saved to that local, indexed ResultsStore.
+    """
+    llm_options = llm_options or {}
+    from src.etl import process_reviews_with_llm, load_to_processed
+
+    if overlap:
+        from src.streaming import stream_reviews_to_processed
+
+        with profiling.track_memory('process_reviews_with_llm'):
+            processed_df = stream_reviews_to_processed(spreadsheet, cleaned_data, running=running,
+                                                       **llm_options)
+        if processed_df is None:
+            print("LLM Pipeline failed at processing/loading step")
+            return None
+    else:
+        with profiling.track_memory('process_reviews_with_llm'):
+            processed_df = process_reviews_with_llm(cleaned_data, **llm_options)
+        if processed_df is None:
+            print("LLM Pipeline failed at processing step")
+            return None
+
+        success = load_to_processed(spreadsheet, processed_df)
+        if not success:
+            print("LLM Pipeline failed at loading step")
+            return None
+
+    if results_db:
+        from src.results_store import ResultsStore
+
+        ResultsStore(results_db).replace(processed_df)
+
     print("LLM PROCESSING PIPELINE COMPLETED SUCCESSFULLY!")
-    
+
     print(f"\n Processed {len(cleaned_data)} reviews")
 
     return processed_df
 
-def run_analysis_pipeline(processed_data):
+def find_class_column(df):
+    """  Returns the first column whose name mentions 'class', or None.  """
+    for col in df.columns:
+        if isinstance(col, str) and 'class' in col.lower():
+            return col
+    return None
+
+
+def run_analysis_pipeline(processed_data, running=None, output_dir=None):
     """
     Runs the analysis pipeline: Calculate metrics → Visualize → Generate report.
+    A RunningBreakdown already covering every row is used instead of recomputing.
+    output_dir puts charts/ and insights_report.txt somewhere other than the working directory.
     """
+    from src.analysis import (
+        calculate_sentiment_breakdown,
+        identify_top_classes,
+        create_visualizations,
+        generate_insights_report,
+        save_breakdown
+    )
 
-    class_column = None
-    for col in processed_data.columns:
-        if isinstance(col, str) and 'class' in col.lower():
-            class_column = col
-            break
+    class_column = find_class_column(processed_data)
 
     if not class_column:
         print(" Could not find clothing class column || Skipping class-based analysis")
         return False
-    
+
     print(f"📋 Using column '{class_column}' for class analysis")
-        
-    try: 
-        breakdown, breakdown_pct = calculate_sentiment_breakdown(processed_data, class_column)
+
+    try:
+        if running is not None and running.total == len(processed_data):
+            breakdown, breakdown_pct = running.to_frames()
+        else:
+            breakdown, breakdown_pct = calculate_sentiment_breakdown(processed_data, class_column)
         if breakdown is None:
             print(" Analysis Pipeline failed at calculation step")
             return False
-        
+
+        charts_dir = os.path.join(output_dir or '', 'charts')
+        report_path = os.path.join(output_dir or '', 'insights_report.txt')
+
+        save_breakdown(breakdown, breakdown_pct, os.path.join(charts_dir, 'sentiment_breakdown.csv'))
+
         top_classes = identify_top_classes(processed_data, breakdown_pct, class_column)
-        charts = create_visualizations(processed_data, breakdown, breakdown_pct, class_column)
+        with profiling.track_memory('create_visualizations'):
+            charts = create_visualizations(processed_data, breakdown, breakdown_pct, class_column,
+                                           charts_dir=charts_dir)
         if not charts:
             print("Visualization creation encountered issues")
-        
-        report = generate_insights_report(processed_data, breakdown, breakdown_pct, top_classes, class_column)
+
+        report = generate_insights_report(processed_data, breakdown, breakdown_pct, top_classes, class_column,
+                                          report_path=report_path)
 
         return True
     except Exception as e:
@@ -86,38 +139,658 @@ def run_analysis_pipeline(processed_data):
         import traceback
         traceback.print_exc()
         return False
-    
-def run_full_pipeline():
-    """  Runs the complete analysis pipeline: """
-   
+
+
+def read_worksheet(spreadsheet, worksheet_name):
+    """  Reads a pipeline worksheet (staging / processed) back into a cleaned DataFrame.  """
+    from src.etl import extract_raw_data, clean_data
+
+    df = extract_raw_data(spreadsheet, worksheet_name)
+    if df is None:
+        return None
+
+    return clean_data(df)
+
+
+def connect():
+    """  Connects to Google Sheets, printing the failure reason if it cannot.  """
+    from src.utils import connect_to_google_sheets
+
     print("\n Connecting to Google Sheets...")
     spreadsheet = connect_to_google_sheets()
-    
+
     if not spreadsheet:
         print(" Pipeline failed: Could not connect to Google Sheets")
+    return spreadsheet
+
+
+def llm_stage_version(llm_options=None):
+    """
+    Fingerprint of what the llm stage's labels depend on besides its input: the
+    label version (model and prompt) of every model it may call, the per-review
+    token budget and stream mode.
+    """
+    from src.checkpoints import fingerprint
+    from src.prompts import MAX_REVIEW_TOKENS
+    from src.utils import label_version
+
+    llm_options = llm_options or {}
+    router = llm_options.get('router')
+    models = [None] if router is None else [router.small_model, router.large_model]
+    return fingerprint(*(label_version(model) for model in models),
+                       f"max_review_tokens={llm_options.get('max_review_tokens', MAX_REVIEW_TOKENS)}",
+                       f"stream={bool(llm_options.get('stream_completions'))}")
+
+
+def _execute_stage(stage, state, use_cache, cache_dir, overlap, llm_options, results_db=None,
+                   clean_workers=None):
+    """  Runs (or reuses) one stage of the full pipeline, updating state in place. Returns False on failure.  """
+    from src.checkpoints import fingerprint, frame_fingerprint, save_stage, load_stage
+
+    if stage == 'analyze':
+        print("\n Running Analysis Pipeline...")
+        if not run_analysis_pipeline(state['data'], running=state['running']):
+            print("⚠️  Analysis completed with warnings")
+        return True
+
+    if stage != 'extract':
+        if stage == 'llm':
+            # A new prompt, model or stream mode must not reuse old labels
+            state['key'] = fingerprint(stage, state['key'], llm_stage_version(llm_options))
+        else:
+            state['key'] = fingerprint(stage, state['key'])
+        cached = load_stage(stage, state['key'], cache_dir) if use_cache else None
+        if cached is not None:
+            print(f"\n ♻️  Reusing saved '{stage}' output (input unchanged)")
+            metrics.increment('stage_cache_hits_total', stage=stage)
+            state['data'] = cached
+            return True
+
+    # Only connect once a stage actually needs Google Sheets
+    if state['spreadsheet'] is None:
+        state['spreadsheet'] = connect()
+        if not state['spreadsheet']:
+            return False
+    spreadsheet = state['spreadsheet']
+
+    if stage == 'extract':
+        from src.etl import extract_raw_data
+
+        print("\n Running ETL Pipeline...")
+        data = extract_raw_data(spreadsheet, typed=True)
+        if data is None:
+            print(" Pipeline failed: ETL process encountered errors")
+            return False
+        state['key'] = frame_fingerprint(data)
+        if state.get('on_extract') is not None:
+            state['on_extract'](data)
+
+    elif stage == 'clean':
+        from src.etl import clean_data
+
+        with profiling.track_memory('clean_data'):
+            data = clean_data(state['data'], workers=clean_workers)
+        if data is None:
+            print("ETL Pipeline failed at cleaning step")
+            print(" Pipeline failed: ETL process encountered errors")
+            return False
+
+        # The LLM stage only needs the cleaned frame, so staging is written alongside it.
+        # The clean checkpoint is saved once that write succeeds.
+        _start_background(state, 'load_to_staging', _load_staging_and_save,
+                          spreadsheet, data, state['key'], cache_dir)
+        state['data'] = data
+        return True
+
+    else:
+        print("\n Running LLM Processing Pipeline...")
+        class_column = find_class_column(state['data'])
+        if overlap and class_column:
+            from src.streaming import RunningBreakdown
+
+            state['running'] = RunningBreakdown(class_column)
+        data = run_llm_pipeline(spreadsheet, state['data'], overlap=overlap, running=state['running'],
+                                llm_options=llm_options, results_db=results_db)
+        if data is None:
+            print(" Pipeline failed: LLM processing encountered errors")
+            return False
+
+    state['data'] = data
+    if stage == 'llm' and _has_degraded_rows(data):
+        # Degraded rows must be re-processed next run, so this output is not reused
+        print("⏰ Not saving the 'llm' checkpoint: some reviews were labelled locally")
+        return True
+    save_stage(stage, state['key'], data, cache_dir)
+    return True
+
+
+def _load_staging_and_save(spreadsheet, data, key, cache_dir):
+    from src.checkpoints import save_stage
+    from src.etl import load_to_staging
+
+    if not load_to_staging(spreadsheet, data):
+        print("ETL Pipeline failed at loading step")
         return False
-    
-    print("\n Running ETL Pipeline...")
-    cleaned_data = run_etl_pipeline(spreadsheet)
-    
-    if cleaned_data is None:
-        print(" Pipeline failed: ETL process encountered errors")
+    save_stage('clean', key, data, cache_dir)
+    return True
+
+
+def _start_background(state, name, func, *args):
+    """  Runs func(*args) in a background thread; _join_background waits for it.  """
+    from concurrent.futures import ThreadPoolExecutor
+
+    def timed():
+        started = time.perf_counter()
+        try:
+            return func(*args)
+        finally:
+            metrics.observe('background_task_seconds', time.perf_counter() - started, task=name)
+
+    executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=name)
+    state['background'][name] = executor.submit(timed)
+    executor.shutdown(wait=False)
+
+
+def _join_background(state):
+    """  Waits for every background task. Returns False (after reporting each failure) if any failed.  """
+    succeeded = True
+    for name, future in state['background'].items():
+        try:
+            ok = future.result()
+        except Exception as e:
+            print(f"❌ Error in {name}: {e}")
+            ok = False
+        metrics.increment('background_tasks_total', task=name, status='ok' if ok else 'failed')
+        if not ok:
+            print(f" Pipeline failed: {name} encountered errors")
+            succeeded = False
+    state['background'] = {}
+    return succeeded
+
+
+def _has_degraded_rows(df):
+    from src.deadline import DEGRADED_COLUMN
+
+    return DEGRADED_COLUMN in df.columns and (df[DEGRADED_COLUMN] == 'Yes').any()
+
+
+def run_full_pipeline(from_stage='extract', to_stage='analyze', use_cache=True, cache_dir=None,
+                      overlap=False, metrics_dir=None, profile=False, profile_dir=None,
+                      llm_options=None, results_db=None, clean_workers=None, on_extract=None):
+    """  Runs the complete analysis pipeline, or only the stages from_stage..to_stage.
+
+    Each stage's output is saved locally under a fingerprint of its input, so clean
+    and llm (and their worksheet writes) are skipped when their input is unchanged,
+    and a run can start from any stage using the last saved output of the one before.
+    overlap=True streams LLM results to the processed worksheet as they arrive.
+    The staging write runs in the background while the LLM stage works and is
+    joined before the run counts as successful.
+    Per-stage timings and counters are written to metrics_dir at the end of the run;
+    profile=True also writes per-stage CPU profiles and memory peaks to profile_dir.
+    llm_options are passed through to the LLM stage; results_db also saves the LLM
+    output to a local ResultsStore. clean_workers > 1 cleans in that many processes.
+    on_extract(raw_df) is called as soon as raw_data has been read.
+    """
+    from src.checkpoints import CACHE_DIR, load_latest
+
+    cache_dir = cache_dir or CACHE_DIR
+    start, end = STAGES.index(from_stage), STAGES.index(to_stage)
+    if start > end:
+        print(f" Pipeline failed: --from-stage '{from_stage}' comes after --to-stage '{to_stage}'")
         return False
-    
-    print("\n Running LLM Processing Pipeline...")
-    processed_data = run_llm_pipeline(spreadsheet, cleaned_data)
-    
+
+    state = {'spreadsheet': None, 'data': None, 'key': None, 'running': None, 'background': {},
+             'on_extract': on_extract}
+
+    if start > 0:
+        previous = STAGES[start - 1]
+        state['data'], state['key'] = load_latest(previous, cache_dir)
+        if state['data'] is None:
+            print(f" Pipeline failed: no saved '{previous}' output to start '{from_stage}' from")
+            return False
+        print(f"\n Starting from saved '{previous}' output ({len(state['data'])} rows)")
+
+    metrics.reset()
+    if profile:
+        profiling.enable(profile_dir or profiling.PROFILE_DIR)
+    try:
+        for stage in STAGES[start:end + 1]:
+            with metrics.stage_timer(stage) as timing, profiling.profile_stage(stage):
+                succeeded = _execute_stage(stage, state, use_cache, cache_dir, overlap, llm_options,
+                                           results_db, clean_workers)
+                if state['data'] is not None:
+                    timing['rows'] = len(state['data'])
+            if not succeeded:
+                _join_background(state)
+                return False
+
+        if not _join_background(state):
+            return False
+
+        print("\n🎉 FULL PIPELINE COMPLETED SUCCESSFULLY!")
+        return True
+
+    finally:
+        metrics.write_metrics(metrics_dir or metrics.METRICS_DIR)
+        if profile:
+            profiling.write_summary()
+            profiling.disable()
+
+
+def run_stage(stage, output=None, overlap=False, llm_options=None, results_db=None, clean_workers=None):
+    """  Runs one stage on its own, reading its input from the previous stage's worksheet.  """
+    if stage not in STAGES:
+        raise ValueError(f"Unknown stage: {stage}")
+
+    spreadsheet = connect()
+    if not spreadsheet:
+        return False
+
+    if stage == 'extract':
+        from src.etl import extract_raw_data
+
+        raw_df = extract_raw_data(spreadsheet, typed=True)
+        if raw_df is None:
+            return False
+        if output:
+            raw_df.to_csv(output, index=False)
+            print(f"✅ Saved raw data to {output}")
+        return True
+
+    if stage == 'clean':
+        return run_etl_pipeline(spreadsheet, clean_workers=clean_workers) is not None
+
+    if stage == 'llm':
+        cleaned_data = read_worksheet(spreadsheet, 'staging')
+        if cleaned_data is None:
+            return False
+        return run_llm_pipeline(spreadsheet, cleaned_data, overlap=overlap,
+                                llm_options=llm_options, results_db=results_db) is not None
+
+    processed_data = read_worksheet(spreadsheet, 'processed')
     if processed_data is None:
-        print(" Pipeline failed: LLM processing encountered errors")
         return False
-    
-    print("\n Running Analysis Pipeline...")
-    success = run_analysis_pipeline(processed_data)
-    
-    if not success:
-        print("⚠️  Analysis completed with warnings")
+    return run_analysis_pipeline(processed_data)
+
+
+def build_parser():
+    """  Builds the command-line parser: one subcommand per stage plus 'full'.  """
+    parser = argparse.ArgumentParser(
+        prog='python -m src.main',
+        description='Automated review analysis pipeline'
+    )
+    subparsers = parser.add_subparsers(dest='command')
+
+    extract_parser = subparsers.add_parser('extract', help='Extract raw_data from Google Sheets')
+    extract_parser.add_argument('-o', '--output', help='Optional CSV path for the raw extract')
+
+    clean_parser = subparsers.add_parser('clean', help='Extract, clean and load to the staging worksheet')
+    llm_parser = subparsers.add_parser('llm', help='Process staging rows with the LLM and load to processed')
+    subparsers.add_parser('analyze', help='Build charts and the insights report from processed')
+    full_parser = subparsers.add_parser('full', help='Run every stage end to end (default)')
+    watch_parser = subparsers.add_parser('watch', help='Run once, then keep processing new raw_data rows')
+    watch_parser.add_argument('--min-interval', type=float, default=5.0,
+                              help='Seconds between polls while new rows are arriving')
+    watch_parser.add_argument('--max-interval', type=float, default=30.0,
+                              help='Longest wait between polls when raw_data is idle')
+    full_parser.add_argument('--from-stage', choices=STAGES, default='extract',
+                             help='First stage to run; earlier stages come from saved outputs')
+    full_parser.add_argument('--to-stage', choices=STAGES, default='analyze',
+                             help='Last stage to run')
+    full_parser.add_argument('--no-cache', action='store_true',
+                             help='Re-run clean/llm even if their saved output matches')
+    full_parser.add_argument('--cache-dir', default=None,
+                             help='Directory for saved stage outputs (default: .pipeline_cache)')
+
+    full_parser.add_argument('--metrics-dir', default=None,
+                             help='Directory for run_summary.json / pipeline.prom (default: metrics)')
+
+    full_parser.add_argument('--profile', action='store_true',
+                             help='Collect per-stage CPU profiles and memory peaks')
+    full_parser.add_argument('--profile-dir', default=None,
+                             help='Directory for profile output (default: profiles)')
+
+    sheets_parser = subparsers.add_parser('sheets', help='Run several spreadsheets concurrently with shared quotas')
+    sheets_parser.add_argument('sheet_ids', nargs='*',
+                               help='Spreadsheet IDs (default: GOOGLE_SHEET_IDS, comma separated)')
+    sheets_parser.add_argument('--rpm', type=int, default=30,
+                               help='Groq requests-per-minute budget shared by all sheets')
+    sheets_parser.add_argument('--sheets-rpm', type=int, default=60,
+                               help='Google Sheets requests-per-minute budget shared by all sheets')
+    sheets_parser.add_argument('--max-parallel', type=int, default=None,
+                               help='Most sheets processed at once (default: all)')
+    sheets_parser.add_argument('--output-dir', default='sheets',
+                               help='Per-sheet charts and reports go to <output-dir>/<sheet>/')
+
+    preview_parser = subparsers.add_parser('preview', help='Quick estimated report from a stratified sample')
+    preview_parser.add_argument('--per-class', type=int, default=30,
+                                help='Reviews sampled from each class')
+    preview_parser.add_argument('--seed', type=int, default=0, help='Sampling seed')
+    preview_parser.add_argument('--output-dir', default=None,
+                                help='Where the preview report and breakdown go (default: working directory)')
+    preview_parser.add_argument('--then-full', action='store_true',
+                                help='Run the full pipeline after the preview, reusing its LLM results')
+
+    relabel_parser = subparsers.add_parser(
+        'relabel', help='After a model or prompt change, re-label only the reviews most likely to change')
+    relabel_parser.add_argument('--audit-fraction', type=float, default=0.05,
+                                help='Random share of the other outdated labels re-checked to estimate drift')
+    relabel_parser.add_argument('--seed', type=int, default=0, help='Audit sampling seed')
+    relabel_parser.add_argument('--dry-run', action='store_true', help='Only print the re-labelling plan')
+    relabel_parser.add_argument('--report', default='relabel_report.txt', help='Where the change report goes')
+
+    queue_parser = subparsers.add_parser(
+        'queue', help='Run the LLM stage through a shared work queue, then load the processed sheet')
+    queue_parser.add_argument('--workers', type=int, default=1,
+                              help='Worker processes on this machine (this one included)')
+    queue_parser.add_argument('--chunk-size', type=int, default=100, help='Reviews per leased chunk')
+
+    worker_parser = subparsers.add_parser(
+        'worker', help='Join a running queue as an extra worker (any machine that shares the queue file); '
+                       'give it its own share of the request budget')
+    worker_parser.add_argument('--wait', type=float, default=300.0,
+                               help='Seconds to wait for the coordinator to queue work before giving up')
+
+    for stage_parser in (queue_parser, worker_parser):
+        stage_parser.add_argument('--queue', default='review_queue.db', help='Work queue (SQLite file)')
+        stage_parser.add_argument('--lease-seconds', type=float, default=120.0,
+                                  help='A chunk goes back to the queue if its worker is silent this long')
+
+    query_parser = subparsers.add_parser('query', help='Query the local results store (no Sheets API calls)')
+    query_parser.add_argument('--db', default=None, help='Results store path (default: results.db)')
+    query_parser.add_argument('--class', dest='class_name', default=None)
+    query_parser.add_argument('--department', default=None)
+    query_parser.add_argument('--sentiment', choices=['Positive', 'Negative', 'Neutral'], default=None)
+    query_parser.add_argument('--action-needed', action='store_true', help='Only rows flagged for action')
+    query_parser.add_argument('--min-rating', type=int, default=None)
+    query_parser.add_argument('--max-rating', type=int, default=None)
+    query_parser.add_argument('--days', type=float, default=None, help='Only reviews first loaded in the last N days')
+    query_parser.add_argument('--count-by', nargs='+', default=None,
+                              help='Print counts grouped by these columns (e.g. class_name sentiment)')
+    query_parser.add_argument('--limit', type=int, default=20)
+
+    for stage_parser in (clean_parser, full_parser):
+        stage_parser.add_argument('--clean-workers', type=int, default=None,
+                                  help='Clean very large sheets in N processes (same output as serial)')
+
+    for stage_parser in (llm_parser, full_parser, watch_parser, preview_parser, relabel_parser, queue_parser):
+        stage_parser.add_argument('--results-db', default='results.db',
+                                  help='Also save processed rows to this local SQLite store')
+        stage_parser.add_argument('--no-results-db', action='store_true',
+                                  help='Do not write the local results store')
+
+    # Only llm and full can write processed while the LLM stage runs
+    for stage_parser in (llm_parser, full_parser):
+        stage_parser.add_argument('--overlap', action='store_true',
+                                  help='Write LLM results to processed_stream in blocks while the LLM stage runs '
+                                       '(processed is replaced once all rows are in)')
+
+    # Every subcommand that runs the LLM stage
+    for stage_parser in (llm_parser, full_parser, watch_parser, sheets_parser, preview_parser, relabel_parser,
+                         queue_parser, worker_parser):
+        stage_parser.add_argument('--key-pool', action='store_true',
+                                  help='Spread LLM calls over every key in GROQ_API_KEYS (comma separated)')
+        stage_parser.add_argument('--rpm-per-key', type=int, default=30,
+                                  help='Requests-per-minute budget for each key in the pool')
+        stage_parser.add_argument('--tpm-per-key', type=int, default=None,
+                                  help='Tokens-per-minute budget for each key (uses local token estimates)')
+        stage_parser.add_argument('--max-review-tokens', type=int, default=None,
+                                  help='Trim reviews longer than this many (estimated) tokens before '
+                                       'prompting (default: 400)')
+        stage_parser.add_argument('--route-models', action='store_true',
+                                  help='Send short, unambiguous reviews to a smaller, faster model')
+        stage_parser.add_argument('--stream-completions', action='store_true',
+                                  help='Stream each completion and stop as soon as SENTIMENT and SUMMARY are in')
+        stage_parser.add_argument('--hedge', action='store_true',
+                                  help='Re-issue LLM requests that are slower than recent calls; first answer wins')
+        stage_parser.add_argument('--hedge-percentile', type=float, default=95.0,
+                                  help='Latency percentile after which a request is hedged')
+        stage_parser.add_argument('--hedge-max-extra', type=float, default=0.05,
+                                  help='Most hedged requests, as a fraction of all LLM calls')
+        stage_parser.add_argument('--adaptive-concurrency', action='store_true',
+                                  help='Run LLM calls in parallel under a limit that follows latency and 429s')
+        stage_parser.add_argument('--max-concurrency', type=int, default=16,
+                                  help='Upper bound for the adaptive in-flight limit')
+
+    # One run whose results are used as they arrive; a sample, a relabel or a
+    # shared queue would be skewed by degraded (locally labelled) rows
+    for stage_parser in (llm_parser, full_parser, watch_parser):
+        stage_parser.add_argument('--prioritize', action='store_true',
+                                  help='Classify the most likely negative reviews first')
+        stage_parser.add_argument('--alerts-file', default=None,
+                                  help='Append action-needed reviews to this JSON-lines file as they are found')
+        stage_parser.add_argument('--deadline', type=float, default=None,
+                                  help='Run budget in seconds; reviews the LLM cannot reach in time are '
+                                       'labelled locally and marked as degraded')
+        stage_parser.add_argument('--deadline-reserve', type=float, default=60.0,
+                                  help='Seconds of the deadline kept back for loading and analysis')
+
+    return parser
+
+
+def build_llm_options(args):
+    """  Turns LLM-stage CLI flags into keyword arguments for process_reviews_with_llm.  """
+    llm_options = {}
+
+    if getattr(args, 'key_pool', False):
+        from src.keypool import KeyPool
+
+        llm_options['key_pool'] = KeyPool.from_env(requests_per_minute=args.rpm_per_key,
+                                                   tokens_per_minute=args.tpm_per_key)
+
+    if getattr(args, 'route_models', False):
+        from src.routing import ModelRouter
+
+        llm_options['router'] = ModelRouter()
+
+    if getattr(args, 'prioritize', False):
+        llm_options['prioritize'] = True
+
+    if getattr(args, 'alerts_file', None):
+        from src.priority import ActionAlertWriter
+
+        llm_options['on_action_needed'] = ActionAlertWriter(args.alerts_file)
+
+    if getattr(args, 'deadline', None):
+        from src.deadline import RunDeadline
+
+        llm_options['deadline'] = RunDeadline(args.deadline, reserve_seconds=args.deadline_reserve)
+
+    if getattr(args, 'stream_completions', False):
+        llm_options['stream_completions'] = True
+
+    if getattr(args, 'max_review_tokens', None) is not None:
+        llm_options['max_review_tokens'] = args.max_review_tokens
+
+    if getattr(args, 'hedge', False):
+        from src.hedging import RequestHedger
+
+        llm_options['hedger'] = RequestHedger(percentile=args.hedge_percentile,
+                                              max_extra_rate=args.hedge_max_extra)
+
+    if getattr(args, 'adaptive_concurrency', False):
+        from src.concurrency import ConcurrencyController
+
+        llm_options['concurrency'] = ConcurrencyController(max_limit=args.max_concurrency)
+
+    return llm_options
 
-    print("\n🎉 FULL PIPELINE COMPLETED SUCCESSFULLY!")
-if __name__ == "__main__":
 
-    run_full_pipeline()
\ No newline at end of file
+def run_preview_command(args, llm_options):
+    """  Writes the estimated preview report, then optionally runs the full pipeline.  """
+    from src.llm_cache import ResultCache
+    from src.preview import run_preview
+
+    # The full run gets the sampled reviews' labels from the cache instead of the API
+    llm_options.setdefault('cache', ResultCache())
+    if run_preview(per_class=args.per_class, llm_options=llm_options, output_dir=args.output_dir,
+                   seed=args.seed) is None:
+        return False
+    if not args.then_full:
+        return True
+    return run_full_pipeline(llm_options=llm_options, results_db=results_db_path(args))
+
+
+def run_relabel_command(args, llm_options):
+    """  Re-labels the planned subset of the processed worksheet and writes it back.  """
+    from src.etl import load_to_processed
+    from src.relabel import run_relabel
+
+    spreadsheet = connect()
+    if not spreadsheet:
+        return False
+    processed = read_worksheet(spreadsheet, 'processed')
+    if processed is None:
+        return False
+
+    updated, summary = run_relabel(processed, llm_options, audit_fraction=args.audit_fraction, seed=args.seed,
+                                   dry_run=args.dry_run, report_path=args.report)
+    if summary is None:
+        return True
+    if not load_to_processed(spreadsheet, updated):
+        return False
+
+    results_db = results_db_path(args)
+    if results_db:
+        from src.results_store import ResultsStore
+
+        ResultsStore(results_db).replace(updated)
+    return True
+
+
+def run_queue_command(args, llm_options):
+    """  Coordinates a queued LLM run over the staging sheet and loads the assembled result.  """
+    from src.etl import load_to_processed
+    from src.workqueue import run_coordinator
+
+    spreadsheet = connect()
+    if not spreadsheet:
+        return False
+    cleaned = read_worksheet(spreadsheet, 'staging')
+    if cleaned is None:
+        return False
+
+    processed = run_coordinator(cleaned, path=args.queue, chunk_size=args.chunk_size, workers=args.workers,
+                                llm_options=llm_options, lease_seconds=args.lease_seconds)
+    metrics.write_metrics()
+    if processed is None or not load_to_processed(spreadsheet, processed):
+        return False
+
+    results_db = results_db_path(args)
+    if results_db:
+        from src.results_store import ResultsStore
+
+        ResultsStore(results_db).replace(processed)
+    return True
+
+
+def run_query_command(args):
+    """  Runs the 'query' subcommand against the local results store.  """
+    from src.results_store import COLUMNS, RESULTS_DB, ResultsStore
+
+    path = args.db or RESULTS_DB
+    if not os.path.exists(path):
+        print(f" No results store at {path} - run the llm stage first")
+        return False
+
+    store = ResultsStore(path)
+    filters = {
+        'class_name': args.class_name,
+        'department': args.department,
+        'sentiment': args.sentiment,
+        'action_needed': True if args.action_needed else None,
+        'min_rating': args.min_rating,
+        'max_rating': args.max_rating,
+        'since': time.time() - args.days * 86400 if args.days is not None else None,
+    }
+
+    if args.count_by:
+        try:
+            result = store.counts(by=args.count_by, **filters)
+        except ValueError as e:
+            print(f"❌ {e}. Valid columns: {', '.join(COLUMNS)}")
+            return False
+    else:
+        result = store.query(limit=args.limit, **filters)
+    print(result.to_string(index=False))
+    return True
+
+
+def results_db_path(args):
+    if getattr(args, 'no_results_db', False):
+        return None
+    return getattr(args, 'results_db', None)
+
+
+def run_sheets_command(args, llm_options):
+    """  Runs the 'sheets' subcommand. True only if every sheet succeeded.  """
+    from src.multisheet import run_sheets
+    from src.utils import load_env
+
+    sheet_ids = args.sheet_ids
+    if not sheet_ids:
+        load_env()
+        sheet_ids = [sheet_id.strip() for sheet_id in os.getenv('GOOGLE_SHEET_IDS', '').split(',')
+                     if sheet_id.strip()]
+    if not sheet_ids:
+        print(" No spreadsheet IDs given (pass them or set GOOGLE_SHEET_IDS)")
+        return False
+
+    statuses = run_sheets(sheet_ids, llm_options, requests_per_minute=args.rpm,
+                          max_parallel=args.max_parallel, output_dir=args.output_dir,
+                          sheets_requests_per_minute=args.sheets_rpm)
+    metrics.write_metrics()
+    return all(status['status'].startswith('ok') for status in statuses)
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    command = args.command or 'full'
+    llm_options = build_llm_options(args)
+
+    if command == 'full':
+        success = run_full_pipeline(
+            from_stage=getattr(args, 'from_stage', 'extract'),
+            to_stage=getattr(args, 'to_stage', 'analyze'),
+            use_cache=not getattr(args, 'no_cache', False),
+            cache_dir=getattr(args, 'cache_dir', None),
+            overlap=getattr(args, 'overlap', False),
+            metrics_dir=getattr(args, 'metrics_dir', None),
+            profile=getattr(args, 'profile', False),
+            profile_dir=getattr(args, 'profile_dir', None),
+            llm_options=llm_options,
+            results_db=results_db_path(args),
+            clean_workers=getattr(args, 'clean_workers', None)
+        )
+    elif command == 'query':
+        success = run_query_command(args)
+    elif command == 'preview':
+        success = run_preview_command(args, llm_options)
+    elif command == 'relabel':
+        success = run_relabel_command(args, llm_options)
+    elif command == 'queue':
+        success = run_queue_command(args, llm_options)
+    elif command == 'worker':
+        from src.workqueue import run_worker
+
+        run_worker(args.queue, llm_options=llm_options, lease_seconds=args.lease_seconds, report_metrics=True,
+                   wait_seconds=args.wait)
+        success = True
+    elif command == 'sheets':
+        success = run_sheets_command(args, llm_options)
+    elif command == 'watch':
+        from src.watch import watch
+
+        success = watch(min_interval=args.min_interval, max_interval=args.max_interval,
+                        llm_options=llm_options, results_db=results_db_path(args))
+    else:
+        success = run_stage(command, output=getattr(args, 'output', None),
+                            overlap=getattr(args, 'overlap', False), llm_options=llm_options,
+                            results_db=results_db_path(args),
+                            clean_workers=getattr(args, 'clean_workers', None))
+
+    return 0 if success else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,315 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+# Latency buckets (seconds) shared by every histogram; the last bucket is +Inf
+LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.0, 5.0, 10.0, 30.0)
+
+METRICS_DIR = 'metrics'
+
+# Changes kept per gauge for its history in the run summary
+GAUGE_HISTORY = 500
+
+_lock = threading.Lock()
+_counters = {}
+_histograms = {}
+_gauges = {}
+_stages = {}
+_run_started = time.time()
+
+
+def _key(name, labels):
+    return name, tuple(sorted(labels.items()))
+
+
+def reset():
+    """  Clears every metric (start of a run, or between tests).  """
+    global _run_started
+    with _lock:
+        _counters.clear()
+        _histograms.clear()
+        _gauges.clear()
+        _stages.clear()
+        _run_started = time.time()
+
+
+def increment(name, value=1, **labels):
+    """  Adds value to a counter, e.g. increment('sheets_calls_total', method='update').  """
+    key = _key(name, labels)
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + value
+
+
+def observe(name, value, **labels):
+    """  Records one observation (e.g. a latency in seconds) in a histogram.  """
+    key = _key(name, labels)
+    with _lock:
+        hist = _histograms.get(key)
+        if hist is None:
+            hist = {'count': 0, 'sum': 0.0, 'min': value, 'max': value,
+                    'buckets': [0] * (len(LATENCY_BUCKETS) + 1)}
+            _histograms[key] = hist
+
+        hist['count'] += 1
+        hist['sum'] += value
+        hist['min'] = min(hist['min'], value)
+        hist['max'] = max(hist['max'], value)
+        for i, bound in enumerate(LATENCY_BUCKETS):
+            if value <= bound:
+                hist['buckets'][i] += 1
+                break
+        else:
+            hist['buckets'][-1] += 1
+
+
+def set_gauge(name, value, **labels):
+    """  Sets a gauge (e.g. a current limit); each change is also kept, with its time, as the gauge's history.  """
+    key = _key(name, labels)
+    with _lock:
+        gauge = _gauges.setdefault(key, {'value': None, 'history': []})
+        if gauge['value'] != value:
+            gauge['history'] = (gauge['history'] + [(round(time.time() - _run_started, 4), value)])[-GAUGE_HISTORY:]
+        gauge['value'] = value
+
+
+def get_gauge(name, **labels):
+    with _lock:
+        gauge = _gauges.get(_key(name, labels))
+        return gauge['value'] if gauge else None
+
+
+def get_gauge_history(name, **labels):
+    """  [(seconds since the run started, value), ...] for every change of the gauge.  """
+    with _lock:
+        gauge = _gauges.get(_key(name, labels))
+        return list(gauge['history']) if gauge else []
+
+
+def get_counter(name, **labels):
+    with _lock:
+        return _counters.get(_key(name, labels), 0)
+
+
+def get_histogram(name, **labels):
+    with _lock:
+        hist = _histograms.get(_key(name, labels))
+        return dict(hist, buckets=list(hist['buckets'])) if hist else None
+
+
+def snapshot():
+    """  Raw counters and histograms as JSON-serialisable lists, for merge() in another process.  """
+    with _lock:
+        return {
+            'counters': [[name, list(labels), value] for (name, labels), value in _counters.items()],
+            'histograms': [[name, list(labels), dict(hist, buckets=list(hist['buckets']))]
+                           for (name, labels), hist in _histograms.items()]
+        }
+
+
+def merge(other):
+    """  Adds a snapshot() taken in another process (e.g. a queue worker) to this process's metrics.  """
+    with _lock:
+        for name, labels, value in other['counters']:
+            key = (name, tuple(tuple(label) for label in labels))
+            _counters[key] = _counters.get(key, 0) + value
+
+        for name, labels, hist in other['histograms']:
+            key = (name, tuple(tuple(label) for label in labels))
+            mine = _histograms.get(key)
+            if mine is None:
+                _histograms[key] = dict(hist, buckets=list(hist['buckets']))
+                continue
+            mine['count'] += hist['count']
+            mine['sum'] += hist['sum']
+            mine['min'] = min(mine['min'], hist['min'])
+            mine['max'] = max(mine['max'], hist['max'])
+            mine['buckets'] = [a + b for a, b in zip(mine['buckets'], hist['buckets'])]
+
+
+@contextmanager
+def stage_timer(stage):
+    """
+    Times a pipeline stage. The yielded dict can be given a row count
+    (stage_info['rows'] = n) so the summary reports rows/sec.
+    """
+    info = {'rows': None}
+    start = time.perf_counter()
+    try:
+        yield info
+    finally:
+        elapsed = time.perf_counter() - start
+        with _lock:
+            _stages[stage] = {'seconds': elapsed, 'rows': info['rows']}
+
+
+def _quantile(hist, q):
+    """  Bucket-resolution quantile estimate (upper bound of the bucket holding q).  """
+    target = q * hist['count']
+    seen = 0
+    for bound, count in zip(LATENCY_BUCKETS + (hist['max'],), hist['buckets']):
+        seen += count
+        if seen >= target:
+            return min(bound, hist['max'])
+    return hist['max']
+
+
+def _label_text(labels):
+    return ','.join(f'{k}={v}' for k, v in labels)
+
+
+def summary():
+    """  Returns the whole run as a JSON-serialisable dict.  """
+    with _lock:
+        stages = {}
+        for stage, info in _stages.items():
+            rows = info['rows']
+            stages[stage] = {
+                'seconds': round(info['seconds'], 4),
+                'rows': rows,
+                'rows_per_second': round(rows / info['seconds'], 2) if rows and info['seconds'] > 0 else None
+            }
+
+        counters = {}
+        for (name, labels), value in sorted(_counters.items()):
+            counters.setdefault(name, {})[_label_text(labels) or 'total'] = value
+
+        histograms = {}
+        for (name, labels), hist in sorted(_histograms.items()):
+            histograms.setdefault(name, {})[_label_text(labels) or 'all'] = {
+                'count': hist['count'],
+                'mean': round(hist['sum'] / hist['count'], 4),
+                'min': round(hist['min'], 4),
+                'max': round(hist['max'], 4),
+                'p50': round(_quantile(hist, 0.50), 4),
+                'p95': round(_quantile(hist, 0.95), 4),
+                'p99': round(_quantile(hist, 0.99), 4),
+                'buckets': dict(zip([str(b) for b in LATENCY_BUCKETS] + ['+Inf'], hist['buckets']))
+            }
+
+        gauges = {}
+        for (name, labels), gauge in sorted(_gauges.items()):
+            gauges.setdefault(name, {})[_label_text(labels) or 'all'] = {
+                'value': gauge['value'],
+                'history': [list(change) for change in gauge['history']]
+            }
+
+        return {
+            'started_at': _run_started,
+            'wall_seconds': round(time.time() - _run_started, 4),
+            'stages': stages,
+            'counters': counters,
+            'histograms': histograms,
+            'gauges': gauges
+        }
+
+
+def _prom_escape(value):
+    """  Escapes a label value (backslash, double quote, newline) for the exposition format.  """
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _prom_labels(labels, extra=()):
+    items = list(labels) + list(extra)
+    if not items:
+        return ''
+    return '{' + ','.join(f'{k}="{_prom_escape(v)}"' for k, v in items) + '}'
+
+
+def _prom_family(lines, seen, prefix, name, kind):
+    """  Adds the HELP and TYPE lines before a metric family's first sample.  """
+    metric = f'{prefix}_{name}'
+    if metric not in seen:
+        seen.add(metric)
+        lines.append(f'# HELP {metric} Review pipeline {kind} {name}.')
+        lines.append(f'# TYPE {metric} {kind}')
+
+
+def to_prometheus(prefix='review_pipeline'):
+    """  Renders all metrics in the Prometheus text exposition format.  """
+    lines = []
+    seen = set()
+    with _lock:
+        for stage, info in sorted(_stages.items()):
+            _prom_family(lines, seen, prefix, 'stage_seconds', 'gauge')
+            lines.append(f'{prefix}_stage_seconds{_prom_labels([("stage", stage)])} {info["seconds"]:.6f}')
+        for stage, info in sorted(_stages.items()):
+            if info['rows'] is not None:
+                _prom_family(lines, seen, prefix, 'stage_rows', 'gauge')
+                lines.append(f'{prefix}_stage_rows{_prom_labels([("stage", stage)])} {info["rows"]}')
+
+        for (name, labels), value in sorted(_counters.items()):
+            _prom_family(lines, seen, prefix, name, 'counter')
+            lines.append(f'{prefix}_{name}{_prom_labels(labels)} {value}')
+
+        for (name, labels), gauge in sorted(_gauges.items()):
+            _prom_family(lines, seen, prefix, name, 'gauge')
+            lines.append(f'{prefix}_{name}{_prom_labels(labels)} {gauge["value"]}')
+
+        for (name, labels), hist in sorted(_histograms.items()):
+            _prom_family(lines, seen, prefix, name, 'histogram')
+            cumulative = 0
+            bounds = [str(b) for b in LATENCY_BUCKETS] + ['+Inf']
+            for bound, count in zip(bounds, hist['buckets']):
+                cumulative += count
+                lines.append(f'{prefix}_{name}_bucket{_prom_labels(labels, [("le", bound)])} {cumulative}')
+            lines.append(f'{prefix}_{name}_sum{_prom_labels(labels)} {hist["sum"]:.6f}')
+            lines.append(f'{prefix}_{name}_count{_prom_labels(labels)} {hist["count"]}')
+
+    return '\n'.join(lines) + '\n'
+
+
+def _write_atomic(path, text):
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(text)
+    # Rename so a textfile collector never reads a half-written file
+    os.replace(tmp_path, path)
+
+
+def write_metrics(metrics_dir=METRICS_DIR):
+    """  Writes run_summary.json and pipeline.prom (Prometheus textfile) to metrics_dir.  """
+    try:
+        summary_path = os.path.join(metrics_dir, 'run_summary.json')
+        prom_path = os.path.join(metrics_dir, 'pipeline.prom')
+
+        _write_atomic(summary_path, json.dumps(summary(), indent=2, default=str))
+        _write_atomic(prom_path, to_prometheus())
+
+        print(f"📈 Metrics written to {summary_path} and {prom_path}")
+        return summary_path, prom_path
+
+    except Exception as e:
+        print(f"⚠️  Could not write metrics: {e}")
+        return None
+
+
+class ProgressReporter:
+    """
+    Prints progress, rate and ETA at most once per `interval` seconds,
+    replacing fixed every-N-rows progress prints.
+    """
+
+    def __init__(self, total, label='reviews', interval=5.0):
+        self.total = total
+        self.label = label
+        self.interval = interval
+        self.done = 0
+        self.start = time.perf_counter()
+        self._last_report = self.start
+
+    def update(self, n=1, suffix=''):
+        self.done += n
+        now = time.perf_counter()
+        if now - self._last_report < self.interval and self.done < self.total:
+            return
+        self._last_report = now
+
+        elapsed = now - self.start
+        rate = self.done / elapsed if elapsed > 0 else 0.0
+        remaining = (self.total - self.done) / rate if rate > 0 else float('inf')
+        eta = f"{remaining:.0f}s" if remaining != float('inf') else '?'
+        print(f"   Processed {self.done}/{self.total} {self.label} "
+              f"({rate:.1f}/s, ETA {eta}){suffix}")
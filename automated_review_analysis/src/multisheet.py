@@ -0,0 +1,176 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from src import metrics
+
+OUTPUT_DIR = 'sheets'
+
+
+class FairRateLimiter:
+    """
+    One requests-per-minute budget shared by every sheet in the process. Slots are
+    handed out round-robin between the sheets that are waiting, so a large sheet
+    cannot starve a small one.
+    """
+
+    def __init__(self, requests_per_minute=30):
+        self.requests_per_minute = requests_per_minute
+        self.interval = 60.0 / requests_per_minute
+        self._cond = threading.Condition()
+        # Sheets with requests waiting, in turn order
+        self._waiting = OrderedDict()
+        self._next_allowed = 0.0
+
+    def acquire(self, tenant):
+        """  Blocks until it is tenant's turn and the shared budget allows another request.  """
+        started = time.monotonic()
+        with self._cond:
+            self._waiting[tenant] = self._waiting.get(tenant, 0) + 1
+            while True:
+                now = time.monotonic()
+                my_turn = next(iter(self._waiting)) == tenant
+                if my_turn and now >= self._next_allowed:
+                    break
+                self._cond.wait(self._next_allowed - now if my_turn else None)
+
+            self._next_allowed = max(now, self._next_allowed) + self.interval
+            # Go to the back of the line for this sheet's next request
+            remaining = self._waiting.pop(tenant) - 1
+            if remaining:
+                self._waiting[tenant] = remaining
+            self._cond.notify_all()
+
+        metrics.observe('rate_limit_wait_seconds', time.monotonic() - started, tenant=tenant)
+
+    def split(self, parts):
+        """  A limiter with 1/parts of the budget, for one of `parts` processes.  """
+        return FairRateLimiter(self.requests_per_minute / parts)
+
+    def for_tenant(self, tenant):
+        """  A per-sheet handle with a plain acquire(), as iter_review_results expects.  """
+        return _TenantLimiter(self, tenant)
+
+
+class _TenantLimiter:
+    def __init__(self, limiter, tenant):
+        self.limiter = limiter
+        self.tenant = tenant
+
+    def acquire(self):
+        self.limiter.acquire(self.tenant)
+
+    def split(self, parts):
+        return self.limiter.split(parts).for_tenant(self.tenant)
+
+
+def sheet_label(sheet_id):
+    """  Short, log-friendly name for a spreadsheet ID.  """
+    return sheet_id[-8:]
+
+
+def run_sheet(sheet_id, llm_options=None, sheets_limiter=None):
+    """
+    Extract -> clean -> staging -> LLM -> processed for one spreadsheet. Every
+    Sheets call waits for sheets_limiter when one is given. Returns (status dict,
+    processed df).
+    """
+    from src.etl import clean_data, extract_raw_data, load_to_processed, load_to_staging, process_reviews_with_llm
+    from src.utils import connect_to_google_sheets
+
+    label = sheet_label(sheet_id)
+    status = {'sheet': label, 'status': 'ok', 'rows': 0, 'action_needed': 0, 'seconds': 0.0}
+    started = time.perf_counter()
+    processed = None
+
+    try:
+        if sheets_limiter is not None:
+            sheets_limiter.acquire()
+        spreadsheet = connect_to_google_sheets(sheet_id)
+        if not spreadsheet:
+            status['status'] = 'failed: connect'
+            return status, None
+
+        raw = extract_raw_data(spreadsheet, typed=True, sheets_limiter=sheets_limiter)
+        if raw is None:
+            status['status'] = 'failed: extract'
+            return status, None
+
+        cleaned = clean_data(raw)
+        if not load_to_staging(spreadsheet, cleaned, sheets_limiter=sheets_limiter):
+            status['status'] = 'failed: staging'
+            return status, None
+
+        processed = process_reviews_with_llm(cleaned, **(llm_options or {}))
+        if not load_to_processed(spreadsheet, processed, sheets_limiter=sheets_limiter):
+            status['status'] = 'failed: processed'
+            return status, None
+
+        status['rows'] = len(processed)
+        status['action_needed'] = int((processed['Action Needed?'] == 'Yes').sum())
+        return status, processed
+
+    except Exception as e:
+        print(f"❌ Error processing sheet {label}: {e}")
+        status['status'] = f'failed: {type(e).__name__}'
+        return status, None
+
+    finally:
+        status['seconds'] = round(time.perf_counter() - started, 2)
+        metrics.increment('sheets_processed_total', sheet=label, status=status['status'])
+
+
+def run_sheets(sheet_ids, llm_options=None, requests_per_minute=30, max_parallel=None,
+               output_dir=OUTPUT_DIR, sheets_requests_per_minute=60):
+    """
+    Runs the pipeline for several spreadsheets concurrently in one process.
+
+    Every sheet shares one ResultCache and one rate budget: a FairRateLimiter, or
+    the KeyPool in llm_options when one is given. Their Sheets reads and writes
+    share a second FairRateLimiter of sheets_requests_per_minute. Analysis (charts and report)
+    then runs for each sheet in turn, into output_dir/<sheet>/, because
+    matplotlib is not thread-safe. Returns the list of per-sheet status dicts.
+    """
+    from src.llm_cache import ResultCache
+    from src.main import run_analysis_pipeline
+
+    llm_options = dict(llm_options or {})
+    llm_options.setdefault('cache', ResultCache())
+    limiter = FairRateLimiter(requests_per_minute)
+    sheets_limiter = FairRateLimiter(sheets_requests_per_minute)
+
+    def one_sheet(sheet_id):
+        label = sheet_label(sheet_id)
+        options = dict(llm_options, rate_limiter=limiter.for_tenant(label))
+        return run_sheet(sheet_id, options, sheets_limiter=sheets_limiter.for_tenant(label))
+
+    print(f"\n🗂️  Processing {len(sheet_ids)} spreadsheets concurrently...")
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max_parallel or len(sheet_ids)) as executor:
+        outcomes = list(executor.map(one_sheet, sheet_ids))
+
+    statuses = []
+    for status, processed in outcomes:
+        if processed is not None:
+            sheet_dir = os.path.join(output_dir, status['sheet'])
+            if not run_analysis_pipeline(processed, output_dir=sheet_dir):
+                status['status'] = 'ok (analysis warnings)'
+        statuses.append(status)
+
+    print_status(statuses, time.perf_counter() - started)
+    return statuses
+
+
+def print_status(statuses, elapsed):
+    print("\n📋 Per-sheet status:")
+    print(f"   {'sheet':<10} {'status':<24} {'rows':>7} {'action':>7} {'seconds':>8} {'rows/s':>7}")
+    for status in statuses:
+        rate = status['rows'] / status['seconds'] if status['seconds'] else 0.0
+        print(f"   {status['sheet']:<10} {status['status']:<24} {status['rows']:>7} "
+              f"{status['action_needed']:>7} {status['seconds']:>8.1f} {rate:>7.1f}")
+
+    total_rows = sum(status['rows'] for status in statuses)
+    rate = total_rows / elapsed if elapsed > 0 else 0.0
+    print(f"   Total: {total_rows} rows in {elapsed:.1f}s ({rate:.1f} rows/s across all sheets)")
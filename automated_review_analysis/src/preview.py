@@ -0,0 +1,183 @@
+import math
+import os
+
+import numpy as np
+import pandas as pd
+
+from src import metrics
+
+SENTIMENTS = ['Positive', 'Negative', 'Neutral']
+Z_95 = 1.96
+PREVIEW_REPORT = 'insights_report_preview.txt'
+PREVIEW_BREAKDOWN = os.path.join('charts', 'sentiment_breakdown_preview.csv')
+
+
+def stratified_sample(df, class_column, per_class=30, seed=0):
+    """  Up to per_class random rows from every class (all rows of smaller classes), in the original order.  """
+    shuffled = df.sample(frac=1, random_state=seed)
+    picked = shuffled.groupby(class_column, sort=False, dropna=False).head(per_class)
+    return df.loc[df.index.isin(picked.index)]
+
+
+def wilson_interval(p, n, N, z=Z_95):
+    """
+    Wilson score interval for proportions p observed in n of N rows, with the
+    finite-population correction (exact once a class is fully sampled). Arrays
+    in, (low, high) arrays of fractions out.
+    """
+    p, n, N = (np.asarray(a, dtype=float) for a in (p, n, N))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        denom = 1 + z * z / n
+        centre = (p + z * z / (2 * n)) / denom
+        half = z * np.sqrt(p * (1 - p) / n + z * z / (4 * n * n)) / denom
+        fpc = np.sqrt(np.clip((N - n) / np.maximum(N - 1, 1), 0, 1))
+    half = half * fpc
+    centre = np.where(fpc > 0, centre, p)
+    return np.clip(centre - half, 0, 1), np.clip(centre + half, 0, 1)
+
+
+def estimate_breakdown(sample, population, class_column='Class Name', z=Z_95):
+    """
+    Per-class sentiment estimates from a labelled stratified sample.
+    population maps class -> number of reviews. Returns a DataFrame with one
+    row per class: sampled / reviews counts and, per sentiment, the estimated
+    percentage and its confidence bounds ('<S> %', '<S> low %', '<S> high %').
+    """
+    counts = sample.groupby([class_column, 'AI Sentiment']).size().unstack(fill_value=0)
+    counts = counts.reindex(columns=SENTIMENTS, fill_value=0)
+    n = counts.sum(axis=1)
+    N = population.reindex(counts.index).fillna(n)
+
+    estimates = pd.DataFrame({'sampled': n, 'reviews': N.astype(int)}, index=counts.index)
+    for sentiment in SENTIMENTS:
+        p = counts[sentiment] / n
+        low, high = wilson_interval(p, n, N, z)
+        estimates[f'{sentiment} %'] = p * 100
+        estimates[f'{sentiment} low %'] = low * 100
+        estimates[f'{sentiment} high %'] = high * 100
+    return estimates
+
+
+def estimate_overall(estimates, z=Z_95):
+    """
+    Stratified estimate of the overall sentiment mix: {sentiment: (pct, low, high)}.
+    Each class is weighted by its share of all reviews.
+    """
+    N = estimates['reviews'].astype(float)
+    n = estimates['sampled'].astype(float)
+    weights = N / N.sum()
+    fpc = (1 - n / N).clip(lower=0)
+
+    overall = {}
+    for sentiment in SENTIMENTS:
+        p = estimates[f'{sentiment} %'] / 100
+        variance = (weights ** 2 * fpc * p * (1 - p) / (n - 1).clip(lower=1)).sum()
+        pct = float((weights * p).sum())
+        half = z * math.sqrt(variance)
+        overall[sentiment] = (pct * 100, max(pct - half, 0) * 100, min(pct + half, 1) * 100)
+    return overall
+
+
+def top_classes_estimate(estimates):
+    """  Class with the highest estimated share of each sentiment, with its interval.  """
+    top = {}
+    for sentiment in SENTIMENTS:
+        column = f'{sentiment} %'
+        if estimates[column].max() <= 0:
+            continue
+        cls = estimates[column].idxmax()
+        top[sentiment] = {
+            'class': cls,
+            'percentage': estimates.loc[cls, column],
+            'low': estimates.loc[cls, f'{sentiment} low %'],
+            'high': estimates.loc[cls, f'{sentiment} high %'],
+        }
+    return top
+
+
+def generate_preview_report(estimates, overall, top, report_path=PREVIEW_REPORT):
+    """  Writes the preview report; every figure is labelled as an estimate with its 95% interval.  """
+    sampled, total = int(estimates['sampled'].sum()), int(estimates['reviews'].sum())
+
+    report = []
+    report.append("=" * 70)
+    report.append("AUTOMATED REVIEW ANALYSIS - PREVIEW REPORT (ESTIMATES)")
+    report.append("=" * 70)
+    report.append(f"Based on a stratified sample of {sampled} of {total} reviews across "
+                  f"{len(estimates)} classes.")
+    report.append("All figures are ESTIMATES with 95% confidence intervals; the full run replaces them.")
+
+    report.append("\n📊 ESTIMATED OVERALL SENTIMENT")
+    report.append("-" * 70)
+    for sentiment, (pct, low, high) in overall.items():
+        report.append(f"  • {sentiment}: ~{pct:.1f}% (95% CI {low:.1f}-{high:.1f}%)")
+
+    pct, low, high = overall['Negative']
+    report.append(f"\n⚠️  Estimated Reviews Requiring Action: ~{pct / 100 * total:.0f} "
+                  f"(~{pct:.1f}%, 95% CI {low:.1f}-{high:.1f}%)")
+
+    report.append("\n🏆 TOP CLASSES (ESTIMATED)")
+    report.append("-" * 70)
+    for sentiment, entry in top.items():
+        report.append(f"  Highest {sentiment}: {entry['class']} ~{entry['percentage']:.1f}% "
+                      f"(95% CI {entry['low']:.1f}-{entry['high']:.1f}%)")
+
+    report.append("\n📋 PER-CLASS ESTIMATES")
+    report.append("-" * 70)
+    for cls, row in estimates.iterrows():
+        parts = [f"{sentiment} ~{row[f'{sentiment} %']:.0f}% [{row[f'{sentiment} low %']:.0f}-"
+                 f"{row[f'{sentiment} high %']:.0f}]" for sentiment in SENTIMENTS]
+        report.append(f"  • {cls} ({int(row['sampled'])} of {int(row['reviews'])}): {', '.join(parts)}")
+
+    report_text = "\n".join(report)
+    print(report_text)
+
+    os.makedirs(os.path.dirname(report_path) or '.', exist_ok=True)
+    with open(report_path, 'w', encoding='utf-8') as f:
+        f.write(report_text)
+
+    print(f"\n Preview report saved to: {report_path}")
+    return report_text
+
+
+def run_preview(spreadsheet=None, per_class=30, llm_options=None, output_dir=None, seed=0):
+    """
+    Quick estimate of the analysis from a stratified sample: extract and clean
+    raw_data, send per_class reviews from every class through the LLM stage,
+    and write an estimates-only report and breakdown CSV. Nothing is written
+    to the Google Sheet. Returns the estimates DataFrame, or None on failure.
+    """
+    from src.etl import clean_data, extract_raw_data, process_reviews_with_llm
+    from src.main import connect, find_class_column
+
+    spreadsheet = spreadsheet or connect()
+    if not spreadsheet:
+        return None
+
+    raw = extract_raw_data(spreadsheet, typed=True)
+    if raw is None:
+        return None
+    cleaned = clean_data(raw)
+
+    class_column = find_class_column(cleaned)
+    if not class_column:
+        print(" Could not find clothing class column || Preview needs one to stratify by")
+        return None
+
+    sample = stratified_sample(cleaned, class_column, per_class=per_class, seed=seed)
+    print(f"\n🔎 Preview: classifying {len(sample)} of {len(cleaned)} reviews "
+          f"(up to {per_class} per class)")
+    metrics.increment('preview_reviews_total', len(sample))
+
+    labelled = process_reviews_with_llm(sample, **(llm_options or {}))
+    estimates = estimate_breakdown(labelled, cleaned[class_column].value_counts(), class_column)
+    overall = estimate_overall(estimates)
+
+    breakdown_path = os.path.join(output_dir or '', PREVIEW_BREAKDOWN)
+    os.makedirs(os.path.dirname(breakdown_path), exist_ok=True)
+    estimates.round(2).to_csv(breakdown_path)
+    print(f"   ✅ Saved estimated breakdown: {breakdown_path}")
+
+    generate_preview_report(estimates, overall, top_classes_estimate(estimates),
+                            os.path.join(output_dir or '', PREVIEW_REPORT))
+    return estimates
@@ -0,0 +1,70 @@
+import json
+import os
+import re
+import threading
+import time
+
+import pandas as pd
+
+from src import metrics
+from src.utils import NEGATIVE_WORDS
+
+_NEGATIVE_PATTERN = r'\b(?:' + '|'.join(sorted(re.escape(word) for word in NEGATIVE_WORDS)) + r')\b'
+
+
+def urgency_scores(df, review_column='Review Text', rating_column='Rating',
+                   recommended_column='Recommended IND'):
+    """
+    Cheap urgency score per row (higher = more likely to need action):
+    up to 2 points for a low star rating, 1 for Recommended IND == 0 and
+    0.5 per negative lexicon word (capped at 3 words).
+    """
+    score = pd.Series(0.0, index=df.index)
+
+    if rating_column in df.columns:
+        rating = pd.to_numeric(df[rating_column], errors='coerce')
+        score += ((5 - rating.clip(1, 5)) / 2).fillna(0)
+
+    if recommended_column in df.columns:
+        recommended = pd.to_numeric(df[recommended_column], errors='coerce')
+        score += (recommended == 0).astype(float)
+
+    if review_column in df.columns:
+        hits = df[review_column].astype(str).str.lower().str.count(_NEGATIVE_PATTERN)
+        score += hits.clip(upper=3) * 0.5
+
+    return score
+
+
+def priority_order(df, review_column='Review Text'):
+    """  Row labels sorted by urgency, most urgent first (sheet order breaks ties).  """
+    scores = urgency_scores(df, review_column)
+    return scores.sort_values(ascending=False, kind='stable').index
+
+
+class ActionAlertWriter:
+    """
+    Callback for iter_review_results(on_action_needed=...): appends every
+    action-needed review to a JSON-lines file the moment it is classified, so
+    alerts do not wait for the stage (or the processed write) to finish.
+    """
+
+    def __init__(self, path, columns=('Clothing ID', 'Class Name', 'Rating', 'Review Text')):
+        self.path = path
+        self.columns = columns
+        self.count = 0
+        self.started = time.perf_counter()
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+
+    def __call__(self, idx, row, outputs):
+        record = {'row': str(idx)}
+        record.update({col: str(row[col]) for col in self.columns if col in row.index})
+        record.update(outputs)
+
+        with self._lock:
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(record) + '\n')
+            self.count += 1
+
+        metrics.observe('action_alert_seconds', time.perf_counter() - self.started)
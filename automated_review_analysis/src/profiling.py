@@ -0,0 +1,103 @@
+import os
+from contextlib import contextmanager
+
+PROFILE_DIR = 'profiles'
+
+# None while profiling is off: every hook below checks this first and does
+# nothing else, so leaving the hooks in production code costs nothing.
+_profile_dir = None
+_stage_reports = []
+_memory_peaks = {}
+
+
+def enable(profile_dir=PROFILE_DIR):
+    """  Turns profiling on for the rest of the run.  """
+    global _profile_dir
+    os.makedirs(profile_dir, exist_ok=True)
+    _profile_dir = profile_dir
+    _stage_reports.clear()
+    _memory_peaks.clear()
+
+
+def disable():
+    global _profile_dir
+    _profile_dir = None
+
+
+def is_enabled():
+    return _profile_dir is not None
+
+
+@contextmanager
+def profile_stage(stage, top_n=15):
+    """  Collects a cProfile for one stage into <profile_dir>/<stage>.prof.  """
+    if _profile_dir is None:
+        yield
+        return
+
+    import cProfile
+    import io
+    import pstats
+
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        profiler.dump_stats(os.path.join(_profile_dir, f'{stage}.prof'))
+
+        stream = io.StringIO()
+        stats = pstats.Stats(profiler, stream=stream)
+        stats.sort_stats('tottime').print_stats(top_n)
+        _stage_reports.append((stage, stats.total_tt, stream.getvalue()))
+
+
+@contextmanager
+def track_memory(name):
+    """  Records the tracemalloc peak (in bytes) reached while the block runs.  """
+    if _profile_dir is None:
+        yield
+        return
+
+    import tracemalloc
+
+    started_here = not tracemalloc.is_tracing()
+    if started_here:
+        tracemalloc.start()
+    tracemalloc.reset_peak()
+    try:
+        yield
+    finally:
+        _, peak = tracemalloc.get_traced_memory()
+        _memory_peaks[name] = max(peak, _memory_peaks.get(name, 0))
+        if started_here:
+            tracemalloc.stop()
+
+
+def write_summary():
+    """  Writes <profile_dir>/summary.txt: stage CPU times, memory peaks and top hot functions.  """
+    if _profile_dir is None:
+        return None
+
+    lines = ["PIPELINE PROFILE SUMMARY", "=" * 70, "", "Stage CPU time (profiled):"]
+    for stage, total, _ in _stage_reports:
+        lines.append(f"  • {stage}: {total:.3f}s")
+
+    lines.append("")
+    lines.append("Peak traced memory:")
+    for name, peak in _memory_peaks.items():
+        lines.append(f"  • {name}: {peak / (1024 * 1024):.1f} MiB")
+
+    for stage, _, report in _stage_reports:
+        lines.append("")
+        lines.append(f"Hot functions - {stage} (by own time)")
+        lines.append("-" * 70)
+        lines.append(report.strip())
+
+    path = os.path.join(_profile_dir, 'summary.txt')
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write("\n".join(lines) + "\n")
+
+    print(f"🔬 Profile written to {_profile_dir}/ (summary: {path})")
+    return path
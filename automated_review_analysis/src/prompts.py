@@ -0,0 +1,72 @@
+import math
+
+from src import metrics
+from src.checkpoints import fingerprint
+
+# Reviews longer than this (estimated tokens) are trimmed to their start and end
+MAX_REVIEW_TOKENS = 400
+# Matches max_tokens on the Groq request
+MAX_COMPLETION_TOKENS = 150
+
+# Rough tokenizer-free estimate for English text
+CHARS_PER_TOKEN = 4
+
+TRUNCATION_MARKER = ' [...] '
+
+SYSTEM_PROMPT = "You are a sentiment analysis expert. Always respond in the exact format requested."
+
+PROMPT_TEMPLATE = """Classify this product review. Reply in exactly this format:
+SENTIMENT: Positive, Negative or Neutral (Positive = likes it, Negative = dislikes it, Neutral = mixed or factual)
+SUMMARY: one sentence summarizing the review
+
+Review: "{review}\""""
+
+# Recorded with every label, so a prompt change can be told apart from the old labels
+PROMPT_VERSION = fingerprint(SYSTEM_PROMPT, PROMPT_TEMPLATE)[:8]
+
+
+def estimate_tokens(text):
+    """  Local token estimate (~4 characters per token); no tokenizer needed.  """
+    if not text:
+        return 0
+    return math.ceil(len(str(text)) / CHARS_PER_TOKEN)
+
+
+def truncate_review(review_text, max_tokens=MAX_REVIEW_TOKENS):
+    """
+    Trims a review to about max_tokens, keeping its start and end (where the
+    verdict usually is). None means no limit; a budget too small for any text
+    (0 included) leaves only the truncation marker.
+    """
+    text = str(review_text)
+    if max_tokens is None or estimate_tokens(text) <= max_tokens:
+        return text
+
+    keep = max(max_tokens * CHARS_PER_TOKEN - len(TRUNCATION_MARKER), 0)
+    head = keep * 2 // 3
+    tail = keep - head
+    return text[:head].rstrip() + TRUNCATION_MARKER + text[len(text) - tail:].lstrip()
+
+
+# Template and system prompt cost the same for every review
+_FIXED_TOKENS = estimate_tokens(SYSTEM_PROMPT) + estimate_tokens(PROMPT_TEMPLATE.format(review=''))
+
+
+def build_messages(review_text, max_review_tokens=MAX_REVIEW_TOKENS):
+    """  Returns (messages, estimated_prompt_tokens) for one review.  """
+    review = truncate_review(review_text, max_review_tokens)
+    if review != str(review_text):
+        metrics.increment('reviews_truncated_total')
+
+    messages = [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": PROMPT_TEMPLATE.format(review=review)},
+    ]
+    return messages, _FIXED_TOKENS + estimate_tokens(review)
+
+
+def request_tokens(review_text, max_review_tokens=MAX_REVIEW_TOKENS):
+    """  Estimated tokens one Groq request for this review will use (prompt + completion budget).  """
+    # Same trimming as build_messages, so both agree on what a budget means
+    return _FIXED_TOKENS + estimate_tokens(truncate_review(review_text, max_review_tokens)) + MAX_COMPLETION_TOKENS
+
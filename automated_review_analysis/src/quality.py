@@ -0,0 +1,88 @@
+import numpy as np
+import pandas as pd
+
+from src import metrics
+
+# The same empty-value sentinels clean_data replaces (compared lower-cased); '<na>' is how
+# staging sheets written before clean_data blanked missing text show a missing review
+EMPTY_SENTINELS = ('', 'nan', 'none', '<na>')
+
+MIN_LETTERS = 3            # "ok", "!!", "5" carry nothing to classify
+MIN_LETTER_RATIO = 0.5     # letters per non-space character
+MIN_ASCII_RATIO = 0.5      # Latin letters per letter (the prompt and lexicon are English)
+REPETITIVE_MIN_TOKENS = 8
+MAX_UNIQUE_TOKEN_RATIO = 0.25
+
+REASON_OUTPUTS = {
+    'empty': 'No review text provided',
+}
+
+
+def empty_reviews(texts):
+    """  Boolean array: True where a review-text Series is missing or an empty sentinel.  """
+    text = texts.fillna('').astype(str).str.strip().str.lower()
+    return texts.isna().to_numpy() | text.isin(EMPTY_SENTINELS).to_numpy()
+
+
+def review_quality(texts):
+    """
+    Vectorised quality gate over a review-text Series. Returns a DataFrame
+    (same index) with a boolean 'valid' column and a 'reason' column ('' when
+    valid): empty, too_short, non_text, non_english, repeated_chars, repetitive
+    or contains_link - the first that applies.
+    """
+    raw = texts.reset_index(drop=True)
+    text = raw.fillna('').astype(str).str.strip()
+
+    empty = empty_reviews(raw)
+
+    non_space = text.str.count(r'\S').to_numpy()
+    letters = text.str.count(r'[^\W\d_]').to_numpy()
+    ascii_letters = text.str.count(r'[A-Za-z]').to_numpy()
+
+    tokens = text.str.lower().str.split().explode()
+    token_stats = tokens.groupby(level=0).agg(['size', 'nunique']).reindex(raw.index, fill_value=0)
+    token_count = token_stats['size'].to_numpy()
+    unique_ratio = token_stats['nunique'].to_numpy() / np.maximum(token_count, 1)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        letter_ratio = np.where(non_space > 0, letters / non_space, 0.0)
+        ascii_ratio = np.where(letters > 0, ascii_letters / letters, 0.0)
+
+    conditions = [
+        empty,
+        letters < MIN_LETTERS,
+        letter_ratio < MIN_LETTER_RATIO,
+        ascii_ratio < MIN_ASCII_RATIO,
+        text.str.count(r'([^\W\d_])\1{9,}').to_numpy() > 0,
+        (token_count >= REPETITIVE_MIN_TOKENS) & (unique_ratio < MAX_UNIQUE_TOKEN_RATIO),
+        text.str.contains(r'https?://|www\.', case=False, regex=True).to_numpy(),
+    ]
+    reasons = ['empty', 'too_short', 'non_text', 'non_english', 'repeated_chars', 'repetitive',
+               'contains_link']
+    reason = np.select(conditions, reasons, default='')
+
+    return pd.DataFrame({'valid': reason == '', 'reason': reason}, index=texts.index)
+
+
+def rejected_outputs(reason):
+    """  Outputs for a review the gate kept away from the LLM.  """
+    from src.relabel import LABEL_SOURCE_COLUMN
+
+    return {
+        'AI Sentiment': 'Neutral',
+        'AI Summary': REASON_OUTPUTS.get(reason, f'Not analyzed ({reason.replace("_", " ")})'),
+        'Action Needed?': 'No',
+        LABEL_SOURCE_COLUMN: 'empty' if reason == 'empty' else 'quality_gate'
+    }
+
+
+def quality_gate(df, review_column='Review Text'):
+    """  Splits df into (rows worth an LLM call, gate DataFrame for every row).  """
+    texts = df[review_column] if review_column in df.columns else pd.Series(np.nan, index=df.index)
+    gate = review_quality(texts)
+
+    for reason, count in gate.loc[~gate['valid'], 'reason'].value_counts().items():
+        metrics.increment('quality_rejected_total', int(count), reason=reason)
+
+    return df[gate['valid'].to_numpy()], gate
@@ -0,0 +1,168 @@
+import math
+
+import pandas as pd
+
+from src import metrics
+
+LABEL_VERSION_COLUMN = 'AI Label Version'
+LABEL_SOURCE_COLUMN = 'AI Label Source'
+
+# Labels that never came from the model, so a new model or prompt cannot change them
+FIXED_SOURCES = ('empty', 'quality_gate')
+# Labels that need an LLM answer regardless of any upgrade
+FAILED_SOURCES = ('error', 'local')
+
+RELABEL_REPORT = 'relabel_report.txt'
+
+
+def label_disagrees(df, rating_column='Rating', recommended_column='Recommended IND'):
+    """  True where the AI sentiment contradicts the star rating or the recommendation flag.  """
+    sentiment = df['AI Sentiment']
+    disagrees = pd.Series(False, index=df.index)
+
+    if rating_column in df.columns:
+        rating = pd.to_numeric(df[rating_column], errors='coerce')
+        disagrees |= ((rating >= 4) & (sentiment == 'Negative')) | ((rating <= 2) & (sentiment == 'Positive'))
+    if recommended_column in df.columns:
+        recommended = pd.to_numeric(df[recommended_column], errors='coerce')
+        disagrees |= ((recommended == 1) & (sentiment == 'Negative')) | ((recommended == 0) & (sentiment == 'Positive'))
+
+    return disagrees
+
+
+def _column(df, name):
+    return df[name].astype(str) if name in df.columns else pd.Series('', index=df.index)
+
+
+def plan_relabel(df, version, audit_fraction=0.05, seed=0):
+    """
+    Rows of a processed DataFrame to re-label for a new label version (one
+    version string, or a Series of each row's expected version), as a Series
+    of reasons: 'failed' (error / local fallback), 'keyword_fallback'
+    (the reply did not follow the format), 'disagrees' (contradicts Rating or
+    Recommended IND) and 'audit' (a random audit_fraction of the other stale
+    rows). Rows already at version, or whose label never came from the model,
+    are left out.
+    """
+    sources = _column(df, LABEL_SOURCE_COLUMN)
+    stale = (_column(df, LABEL_VERSION_COLUMN) != version) & ~sources.isin(FIXED_SOURCES)
+
+    reason = pd.Series('', index=df.index, dtype=object)
+    reason[stale & label_disagrees(df)] = 'disagrees'
+    reason[stale & (sources == 'keyword_fallback')] = 'keyword_fallback'
+    reason[stale & sources.isin(FAILED_SOURCES)] = 'failed'
+
+    rest = df.index[stale & (reason == '')]
+    audit_size = min(len(rest), math.ceil(len(rest) * audit_fraction))
+    reason[pd.Series(rest).sample(n=audit_size, random_state=seed)] = 'audit'
+
+    plan = reason[reason != '']
+    plan.attrs['stale'] = int(stale.sum())
+    return plan
+
+
+def expected_versions(df, router=None, review_column='Review Text', rating_column='Rating'):
+    """
+    The label version each row would get now: with a ModelRouter, the version of
+    the model it would route the row to, so small-model labels are not stale
+    just for not coming from the default model.
+    """
+    from src.utils import label_version
+
+    if router is None or review_column not in df.columns:
+        return pd.Series(label_version(), index=df.index)
+    ratings = df[rating_column] if rating_column in df.columns else pd.Series(None, index=df.index)
+    return pd.Series([label_version(router.decide(text, rating)[0])
+                      for text, rating in zip(df[review_column], ratings)], index=df.index)
+
+
+def estimate_change(before, after, plan):
+    """
+    Sentiment change rates per reason among the re-labelled rows, and an
+    estimate (with a 95% interval) of how many stale rows that were not
+    re-labelled would change, extrapolated from the audit sample.
+    """
+    from src.preview import wilson_interval
+
+    changed = before.loc[plan.index, 'AI Sentiment'] != after.loc[plan.index, 'AI Sentiment']
+    by_reason = {}
+    for reason, rows in plan.groupby(plan):
+        by_reason[reason] = {'rows': len(rows), 'changed': int(changed[rows.index].sum())}
+
+    audit = by_reason.get('audit', {'rows': 0, 'changed': 0})
+    remaining = plan.attrs.get('stale', len(plan)) - len(plan)
+    estimate = None
+    if audit['rows'] and remaining > 0:
+        rate = audit['changed'] / audit['rows']
+        low, high = wilson_interval([rate], [audit['rows']], [remaining + audit['rows']])
+        estimate = {'rate': rate * 100, 'low': float(low[0]) * 100, 'high': float(high[0]) * 100,
+                    'rows': round(rate * remaining)}
+
+    return {'by_reason': by_reason, 'relabelled': len(plan), 'remaining': remaining, 'estimate': estimate}
+
+
+def write_relabel_report(summary, version, total, report_path=RELABEL_REPORT):
+    report = []
+    report.append("=" * 70)
+    report.append(f"RE-LABELLING REPORT - {version}")
+    report.append("=" * 70)
+    report.append(f"Re-labelled {summary['relabelled']} of {total} reviews "
+                  f"({summary['relabelled'] / total * 100 if total else 0:.1f}%)")
+
+    report.append("\n🔁 SENTIMENT CHANGES BY REASON")
+    report.append("-" * 70)
+    for reason, counts in summary['by_reason'].items():
+        rate = counts['changed'] / counts['rows'] * 100 if counts['rows'] else 0.0
+        report.append(f"  • {reason}: {counts['changed']} of {counts['rows']} changed ({rate:.1f}%)")
+
+    report.append("\n📈 NOT RE-LABELLED (ESTIMATE)")
+    report.append("-" * 70)
+    estimate = summary['estimate']
+    if estimate is None:
+        report.append(f"  {summary['remaining']} older labels kept; no audit sample to estimate changes from")
+    else:
+        report.append(f"  {summary['remaining']} older labels kept; ~{estimate['rows']} would change "
+                      f"(~{estimate['rate']:.1f}%, 95% CI {estimate['low']:.1f}-{estimate['high']:.1f}%)")
+
+    report_text = "\n".join(report)
+    print(report_text)
+    with open(report_path, 'w', encoding='utf-8') as f:
+        f.write(report_text)
+    print(f"\n Report saved to: {report_path}")
+    return report_text
+
+
+def run_relabel(processed_df, llm_options=None, audit_fraction=0.05, seed=0, dry_run=False,
+                report_path=RELABEL_REPORT):
+    """
+    Re-labels the planned subset of a processed DataFrame with the current
+    model and prompt, leaving every other row's label as it is. Returns
+    (updated DataFrame, change summary); dry_run only prints the plan.
+    """
+    from src.etl import llm_columns, process_reviews_with_llm
+    from src.utils import label_version
+
+    llm_options = llm_options or {}
+    version = label_version()
+    expected = expected_versions(processed_df, llm_options.get('router'))
+    plan = plan_relabel(processed_df, expected, audit_fraction=audit_fraction, seed=seed)
+
+    print(f"\n🔁 Re-labelling plan for {version}: {len(plan)} of {len(processed_df)} reviews")
+    for reason, count in plan.value_counts().items():
+        print(f"   {reason}: {count}")
+    if dry_run or plan.empty:
+        return processed_df, None
+
+    relabelled = process_reviews_with_llm(processed_df.loc[plan.index], **llm_options)
+    for reason, count in plan.value_counts().items():
+        metrics.increment('relabel_reviews_total', int(count), reason=reason)
+
+    updated = processed_df.copy()
+    for col in llm_columns(llm_options.get('deadline')):
+        if col not in updated.columns:
+            updated[col] = ''
+        updated.loc[plan.index, col] = relabelled[col]
+
+    summary = estimate_change(processed_df, relabelled, plan)
+    write_relabel_report(summary, version, len(processed_df), report_path)
+    return updated, summary
@@ -0,0 +1,215 @@
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+from src import metrics
+
+RESULTS_DB = 'results.db'
+
+# Typed, indexed columns -> the processed-sheet column they come from
+COLUMNS = {
+    'clothing_id': 'Clothing ID',
+    'class_name': 'Class Name',
+    'department': 'Department Name',
+    'division': 'Division Name',
+    'rating': 'Rating',
+    'recommended': 'Recommended IND',
+    'sentiment': 'AI Sentiment',
+    'summary': 'AI Summary',
+    'action_needed': 'Action Needed?',
+    'review_text': 'Review Text',
+}
+INTEGER_COLUMNS = {'clothing_id', 'rating', 'recommended', 'action_needed'}
+
+INDEXES = {
+    'idx_results_class': 'class_name',
+    'idx_results_department': 'department',
+    'idx_results_sentiment': 'sentiment',
+    'idx_results_action': 'action_needed',
+    'idx_results_rating': 'rating',
+    'idx_results_class_sentiment': 'class_name, sentiment',
+}
+
+FILTERS = ('class_name', 'department', 'sentiment', 'action_needed')
+
+
+def _to_int(value):
+    try:
+        return int(float(value))
+    except (TypeError, ValueError):
+        return None
+
+
+class ResultsStore:
+    """
+    Local SQLite copy of the processed results, indexed for dashboard queries
+    (class, department, sentiment, action flag, rating), so lookups never need
+    a get_all_values() round trip to Google Sheets. The full row is kept as
+    JSON next to the typed columns.
+
+    Each row is identified by its review columns (not the LLM outputs), so a
+    full replace() keeps the loaded_at of reviews that were already stored and
+    `since` only matches reviews that are actually new.
+    """
+
+    def __init__(self, path=RESULTS_DB):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with self._connect() as conn:
+            column_defs = ', '.join(
+                f"{name} {'INTEGER' if name in INTEGER_COLUMNS else 'TEXT'}" for name in COLUMNS
+            )
+            conn.execute(f"CREATE TABLE IF NOT EXISTS results (row_id INTEGER PRIMARY KEY, "
+                         f"{column_defs}, loaded_at REAL, row_json TEXT, row_key TEXT)")
+            # Stores created before rows had an identity
+            if 'row_key' not in {column[1] for column in conn.execute("PRAGMA table_info(results)")}:
+                conn.execute("ALTER TABLE results ADD COLUMN row_key TEXT")
+            for index, columns in INDEXES.items():
+                conn.execute(f"CREATE INDEX IF NOT EXISTS {index} ON results ({columns})")
+
+    @contextmanager
+    def _connect(self):
+        """  One connection per operation, committed on success and always closed.  """
+        conn = sqlite3.connect(self.path)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _row_digest(row):
+        """  Hash of a row's review columns; relabelling a review does not change it.  """
+        from src.deadline import DEGRADED_COLUMN
+        from src.relabel import LABEL_SOURCE_COLUMN, LABEL_VERSION_COLUMN
+
+        outputs = {COLUMNS['sentiment'], COLUMNS['summary'], COLUMNS['action_needed'],
+                   LABEL_SOURCE_COLUMN, LABEL_VERSION_COLUMN, DEGRADED_COLUMN}
+        review = {str(k): str(v) for k, v in row.items() if k not in outputs}
+        return hashlib.sha256(json.dumps(review, sort_keys=True).encode()).hexdigest()
+
+    def _records(self, df, loaded_at, first_row_id, known=None, seen=None):
+        """
+        Insert records for df. Identical reviews are numbered apart (seen counts
+        the ones already stored); a row whose key is in known keeps that loaded_at.
+        """
+        known = known or {}
+        seen = seen if seen is not None else Counter()
+        sources = {name: column for name, column in COLUMNS.items() if column in df.columns}
+        for offset, (_, row) in enumerate(df.iterrows()):
+            digest = self._row_digest(row)
+            row_key = f"{digest}:{seen[digest]}"
+            seen[digest] += 1
+            record = [first_row_id + offset]
+            for name in COLUMNS:
+                value = row[sources[name]] if name in sources else None
+                if name == 'action_needed':
+                    value = 1 if value == 'Yes' else 0
+                elif name in INTEGER_COLUMNS:
+                    value = _to_int(value)
+                elif value is not None:
+                    value = str(value)
+                record.append(value)
+            record.append(known.get(row_key, loaded_at))
+            record.append(json.dumps({str(k): str(v) for k, v in row.items()}))
+            record.append(row_key)
+            yield record
+
+    def _insert(self, conn, df, first_row_id, known=None, seen=None):
+        columns = ', '.join(['row_id', *COLUMNS, 'loaded_at', 'row_json', 'row_key'])
+        placeholders = ', '.join('?' * (len(COLUMNS) + 4))
+        conn.executemany(f"INSERT INTO results ({columns}) VALUES ({placeholders})",
+                         self._records(df, time.time(), first_row_id, known, seen))
+
+    def replace(self, df):
+        """
+        Replaces every stored row with df (mirrors the idempotent load_to_processed).
+        Reviews that were already stored keep their original loaded_at.
+        """
+        try:
+            with self._connect() as conn:
+                known = dict(conn.execute("SELECT row_key, loaded_at FROM results WHERE row_key IS NOT NULL"))
+                conn.execute("DELETE FROM results")
+                self._insert(conn, df, 0, known=known)
+            metrics.increment('results_store_rows_total', len(df), mode='replace')
+            print(f"🗄️  Saved {len(df)} rows to local results store {self.path}")
+            return True
+
+        except Exception as e:
+            print(f"⚠️  Could not write local results store: {e}")
+            return False
+
+    def append(self, df):
+        """  Adds rows after the existing ones (watch mode).  """
+        try:
+            with self._connect() as conn:
+                next_id = conn.execute("SELECT COALESCE(MAX(row_id) + 1, 0) FROM results").fetchone()[0]
+                seen = Counter(key.rsplit(':', 1)[0] for key, in
+                               conn.execute("SELECT row_key FROM results WHERE row_key IS NOT NULL"))
+                self._insert(conn, df, next_id, seen=seen)
+            metrics.increment('results_store_rows_total', len(df), mode='append')
+            return True
+
+        except Exception as e:
+            print(f"⚠️  Could not append to local results store: {e}")
+            return False
+
+    @staticmethod
+    def _where(filters):
+        clauses, params = [], []
+        for name in FILTERS:
+            value = filters.get(name)
+            if value is None:
+                continue
+            if name == 'action_needed':
+                value = 1 if value in (True, 1, 'Yes') else 0
+            clauses.append(f"{name} = ?")
+            params.append(value)
+
+        if filters.get('min_rating') is not None:
+            clauses.append("rating >= ?")
+            params.append(filters['min_rating'])
+        if filters.get('max_rating') is not None:
+            clauses.append("rating <= ?")
+            params.append(filters['max_rating'])
+        if filters.get('since') is not None:
+            clauses.append("loaded_at >= ?")
+            params.append(filters['since'])
+
+        return (' WHERE ' + ' AND '.join(clauses)) if clauses else '', params
+
+    def query(self, limit=None, **filters):
+        """
+        Rows matching every given filter, as a DataFrame. Filters: class_name,
+        department, sentiment, action_needed (bool or 'Yes'/'No'), min_rating,
+        max_rating, since (unix time the review was first loaded).
+        """
+        import pandas as pd
+
+        where, params = self._where(filters)
+        sql = f"SELECT row_id, {', '.join(COLUMNS)}, loaded_at FROM results{where} ORDER BY row_id"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+
+        with self._connect() as conn:
+            return pd.read_sql_query(sql, conn, params=params)
+
+    def counts(self, by=('class_name', 'sentiment'), **filters):
+        """  Row counts grouped by the given columns, with the same filters as query().  """
+        import pandas as pd
+
+        by = [by] if isinstance(by, str) else list(by)
+        unknown = [name for name in by if name not in COLUMNS]
+        if unknown:
+            raise ValueError(f"Cannot group by {', '.join(unknown)}")
+
+        where, params = self._where(filters)
+        group = ', '.join(by)
+        sql = f"SELECT {group}, COUNT(*) AS reviews FROM results{where} GROUP BY {group} ORDER BY reviews DESC"
+        with self._connect() as conn:
+            return pd.read_sql_query(sql, conn, params=params)
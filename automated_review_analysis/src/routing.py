@@ -0,0 +1,88 @@
+import pandas as pd
+
+from src import metrics
+
+# Fast, cheap model for short / unambiguous reviews
+SMALL_MODEL = "llama-3.1-8b-instant"
+# The model every review used before routing - kept for the hard ones
+LARGE_MODEL = "openai/gpt-oss-20b"
+
+
+def rating_sentiment(rating):
+    """  Sentiment implied by a 1-5 star rating, or None if the rating is missing.  """
+    rating = pd.to_numeric(rating, errors='coerce')
+    if pd.isna(rating):
+        return None
+    if rating >= 4:
+        return 'Positive'
+    if rating <= 2:
+        return 'Negative'
+    return 'Neutral'
+
+
+def review_features(review_text, rating=None):
+    """  Cheap per-review features used for routing: word count, local confidence and rating disagreement.  """
+    from src.utils import local_sentiment
+
+    local = local_sentiment(review_text)
+    expected = rating_sentiment(rating)
+    return {
+        'words': len(str(review_text).split()),
+        'local_sentiment': local['sentiment'],
+        'confidence': local['confidence'],
+        'disagrees': expected is not None and expected != local['sentiment']
+    }
+
+
+class ModelRouter:
+    """
+    Picks a Groq model per review. Short reviews whose local lexicon label is
+    confident and agrees with the star rating go to small_model; long, ambiguous
+    or contradictory ones go to large_model.
+
+    Every decision is counted in routing_decisions_total{model, reason}; per-model
+    latency is already in the groq_latency_seconds{model} histogram.
+    """
+
+    def __init__(self, small_model=SMALL_MODEL, large_model=LARGE_MODEL,
+                 max_easy_words=40, min_confidence=0.5):
+        self.small_model = small_model
+        self.large_model = large_model
+        self.max_easy_words = max_easy_words
+        self.min_confidence = min_confidence
+
+    def decide(self, review_text, rating=None):
+        """  Returns (model, reason) for one review.  """
+        features = review_features(review_text, rating)
+
+        if features['words'] > self.max_easy_words:
+            return self.large_model, 'long'
+        if features['disagrees']:
+            return self.large_model, 'rating_disagrees'
+        if features['confidence'] < self.min_confidence:
+            return self.large_model, 'low_confidence'
+        return self.small_model, 'easy'
+
+    def route(self, df, review_column='Review Text', rating_column='Rating'):
+        """  Returns a Series mapping each row index to its model, for rows that passed the quality gate.  """
+        texts = df[review_column] if review_column in df.columns else pd.Series('', index=df.index)
+        ratings = df[rating_column] if rating_column in df.columns else pd.Series(None, index=df.index)
+
+        models = {}
+        for idx, review_text, rating in zip(df.index, texts, ratings):
+            model, reason = self.decide(review_text, rating)
+            metrics.increment('routing_decisions_total', model=model, reason=reason)
+            models[idx] = model
+
+        return pd.Series(models, dtype=object)
+
+    def print_stats(self):
+        print("\n🧭 Model routing:")
+        for model in (self.small_model, self.large_model):
+            routed = sum(
+                metrics.get_counter('routing_decisions_total', model=model, reason=reason)
+                for reason in ('easy', 'long', 'rating_disagrees', 'low_confidence')
+            )
+            hist = metrics.get_histogram('groq_latency_seconds', model=model)
+            latency = f"{hist['sum'] / hist['count']:.2f}s" if hist else '-'
+            print(f"   {model}: {routed} reviews, mean latency {latency}")
@@ -0,0 +1,211 @@
+import queue
+import threading
+from collections import Counter
+
+from src import metrics
+from src.prompts import MAX_REVIEW_TOKENS
+
+_DONE = object()
+
+# Rows are streamed here; 'processed' is only replaced once the whole run succeeded
+STREAM_WORKSHEET = 'processed_stream'
+
+
+class RunningBreakdown:
+    """
+    Incrementally maintained class x sentiment counts, updated as LLM results arrive.
+    to_frames() returns the same (breakdown, breakdown_pct) shape as
+    analysis.calculate_sentiment_breakdown.
+    """
+
+    def __init__(self, class_column):
+        self.class_column = class_column
+        self.counts = Counter()
+        self.total = 0
+
+    def add(self, class_value, sentiment):
+        self.counts[(class_value, sentiment)] += 1
+        self.total += 1
+
+    def to_frames(self):
+        import pandas as pd
+
+        if not self.counts:
+            return None, None
+
+        series = pd.Series(self.counts)
+        series.index.names = [self.class_column, 'AI Sentiment']
+        breakdown = series.unstack(fill_value=0).sort_index()
+        breakdown = breakdown[sorted(breakdown.columns)]
+        breakdown.columns.name = 'AI Sentiment'
+
+        breakdown_pct = breakdown.div(breakdown.sum(axis=1), axis=0) * 100
+        breakdown['Total'] = breakdown.sum(axis=1)
+        return breakdown, breakdown_pct
+
+
+def _runs(positions):
+    """  Splits sorted positions into runs of consecutive ones.  """
+    runs = []
+    for position in positions:
+        if runs and position == runs[-1][-1] + 1:
+            runs[-1].append(position)
+        else:
+            runs.append([position])
+    return runs
+
+
+def _writer_loop(worksheet, results_queue, block_size, state, sheets_limiter=None):
+    """
+    Background consumer: writes finished rows to the worksheet in blocks of
+    block_size, each row at its own position. Results may arrive in any order
+    (prioritised or pooled runs), so a block that is not contiguous is written
+    as one batch_update with a range per run of consecutive rows.
+    """
+    from src.etl import sheets_call
+
+    pending = {}
+
+    def flush(force=False):
+        while len(pending) >= block_size or (force and pending):
+            positions = sorted(pending)[:block_size]
+            # Row 1 is the header, so data position p lives on sheet row p + 2
+            runs = [(f'A{run[0] + 2}', [pending.pop(position) for position in run]) for run in _runs(positions)]
+            if len(runs) == 1:
+                sheets_call('update', sheets_limiter)
+                worksheet.update(range_name=runs[0][0], values=runs[0][1])
+            else:
+                sheets_call('batch_update', sheets_limiter)
+                worksheet.batch_update([{'range': range_name, 'values': values} for range_name, values in runs])
+            state['rows_written'] += len(positions)
+            state['blocks_written'] += 1
+
+    try:
+        while True:
+            item = results_queue.get()
+            if item is _DONE:
+                flush(force=True)
+                return
+            position, row_values = item
+            pending[position] = row_values
+            flush()
+    except Exception as e:
+        state['error'] = e
+        # Keep draining so the producer never blocks on a full queue
+        while results_queue.get() is not _DONE:
+            pass
+
+
+def _stream_worksheet(spreadsheet, rows, cols, sheets_limiter=None):
+    """  The worksheet rows are streamed to, created on first use.  """
+    import gspread
+    from src.etl import sheets_call
+
+    try:
+        return spreadsheet.worksheet(STREAM_WORKSHEET)
+    except gspread.exceptions.WorksheetNotFound:
+        sheets_call('add_worksheet', sheets_limiter)
+        return spreadsheet.add_worksheet(title=STREAM_WORKSHEET, rows=rows, cols=cols)
+
+
+def stream_reviews_to_processed(spreadsheet, df, review_column='Review Text',
+                                running=None, block_size=50, queue_size=200, key_pool=None,
+                                router=None, prioritize=False, on_action_needed=None,
+                                deadline=None, cache=None, rate_limiter=None, hedger=None,
+                                stream_completions=False, concurrency=None, sheets_limiter=None,
+                                max_review_tokens=MAX_REVIEW_TOKENS):
+    """
+    Runs LLM processing and the processed-worksheet load as an overlapped pipeline.
+
+    The calling thread produces LLM results; a background writer flushes them to
+    the 'processed_stream' worksheet (created if missing) in blocks of block_size
+    rows through a bounded queue (so a slow writer applies back-pressure instead
+    of buffering the whole run). A failed write stops the LLM stage at once, and
+    'processed' itself is only replaced, with load_to_processed, once every row
+    is in, so a failure never leaves it truncated.
+    If a RunningBreakdown is given it is updated as each result arrives. Results
+    may arrive out of row order (e.g. with a KeyPool or prioritize=True); the
+    writer puts each row at its own position, so the stream sheet always matches
+    the DataFrame's row order without waiting for the rows before it. Every Sheets
+    call, the writer's included, waits for sheets_limiter when one is given.
+
+    Returns the processed DataFrame, or None on failure.
+    """
+    from src.etl import iter_review_results, llm_columns, load_to_processed, sheets_call
+
+    try:
+        df_processed = df.copy()
+        for col in llm_columns(deadline):
+            df_processed[col] = ''
+        columns = df_processed.columns.tolist()
+
+        stream_worksheet = _stream_worksheet(spreadsheet, len(df_processed) + 1, len(columns), sheets_limiter)
+        # Reset what an earlier run left, then the header up front
+        sheets_call('clear', sheets_limiter)
+        stream_worksheet.clear()
+        sheets_call('update', sheets_limiter)
+        stream_worksheet.update(range_name='A1', values=[columns])
+
+        results_queue = queue.Queue(maxsize=queue_size)
+        state = {'rows_written': 0, 'blocks_written': 0, 'error': None}
+        writer = threading.Thread(
+            target=_writer_loop,
+            args=(stream_worksheet, results_queue, block_size, state, sheets_limiter),
+            name='processed-writer',
+            daemon=True
+        )
+        writer.start()
+
+        total_reviews = len(df_processed)
+        print(f"\n Streaming {total_reviews} reviews to processed in blocks of {block_size}...")
+        progress = metrics.ProgressReporter(total_reviews)
+
+        positions = {idx: position for position, idx in enumerate(df_processed.index)}
+
+        try:
+            results = iter_review_results(df_processed, review_column, key_pool=key_pool,
+                                          router=router, prioritize=prioritize,
+                                          on_action_needed=on_action_needed,
+                                          deadline=deadline, cache=cache,
+                                          rate_limiter=rate_limiter, hedger=hedger,
+                                          stream_completions=stream_completions,
+                                          concurrency=concurrency,
+                                          max_review_tokens=max_review_tokens)
+            for idx, outputs, status in results:
+                for col, value in outputs.items():
+                    df_processed.at[idx, col] = value
+
+                if running is not None:
+                    running.add(df_processed.at[idx, running.class_column], outputs['AI Sentiment'])
+
+                results_queue.put((positions[idx], df_processed.loc[idx].tolist()))
+                if state['error'] is not None:
+                    # Stop spending LLM quota on rows that can no longer be written
+                    results.close()
+                    break
+
+                progress.update(suffix=f" - {state['rows_written']} written")
+        finally:
+            results_queue.put(_DONE)
+            writer.join()
+
+        if state['error'] is not None:
+            raise state['error']
+
+        print(f"✅ Streamed {state['rows_written']} rows to {STREAM_WORKSHEET} "
+              f"in {state['blocks_written']} blocks")
+        if not load_to_processed(spreadsheet, df_processed, sheets_limiter=sheets_limiter):
+            return None
+        if key_pool is not None:
+            key_pool.print_stats()
+        if router is not None:
+            router.print_stats()
+        if hedger is not None:
+            hedger.print_stats()
+        if concurrency is not None:
+            concurrency.print_stats()
+        return df_processed
+
+    except Exception as e:
+        print(f"❌ Error streaming reviews to processed: {e}")
+        return None
@@ -0,0 +1,130 @@
+import numpy as np
+import pandas as pd
+
+# Roughly the class mix of the Women's Clothing E-Commerce dataset
+DEFAULT_CLASS_WEIGHTS = {
+    'Dresses': 0.27, 'Knits': 0.21, 'Blouses': 0.13, 'Sweaters': 0.06, 'Pants': 0.06,
+    'Jeans': 0.05, 'Fine gauge': 0.05, 'Skirts': 0.04, 'Jackets': 0.03, 'Lounge': 0.03,
+    'Swim': 0.015, 'Outerwear': 0.014, 'Shorts': 0.013, 'Sleep': 0.01, 'Legwear': 0.007,
+    'Intimates': 0.007, 'Layering': 0.006, 'Trend': 0.004
+}
+
+CLASS_DEPARTMENTS = {
+    'Dresses': 'Dresses', 'Knits': 'Tops', 'Blouses': 'Tops', 'Sweaters': 'Tops',
+    'Fine gauge': 'Tops', 'Pants': 'Bottoms', 'Jeans': 'Bottoms', 'Skirts': 'Bottoms',
+    'Shorts': 'Bottoms', 'Jackets': 'Jackets', 'Outerwear': 'Jackets', 'Lounge': 'Intimate',
+    'Swim': 'Intimate', 'Sleep': 'Intimate', 'Legwear': 'Intimate', 'Intimates': 'Intimate',
+    'Layering': 'Intimate', 'Trend': 'Trend'
+}
+
+RATING_WEIGHTS = {5: 0.56, 4: 0.22, 3: 0.12, 2: 0.07, 1: 0.03}
+
+RAW_COLUMNS = [
+    'Unnamed: 0', 'Clothing ID', 'Age', 'Title', 'Review Text', 'Rating', 'Recommended IND',
+    'Positive Feedback Count', 'Division Name', 'Department Name', 'Class Name'
+]
+
+_SENTENCES = {
+    'Positive': [
+        "I love this {item}, it fits perfectly.",
+        "The fabric is soft and comfortable.",
+        "Great quality for the price and so flattering.",
+        "I got so many compliments the first time I wore it.",
+        "Beautiful color, exactly like the picture.",
+        "Highly recommend, I ordered a second one.",
+    ],
+    'Neutral': [
+        "I ordered my usual size in the {item}.",
+        "The color is a bit different from the photo.",
+        "It runs slightly large, so consider sizing down.",
+        "The material is thinner than I expected.",
+        "Length hits just below the knee on me.",
+        "Not sure if I will keep it yet.",
+    ],
+    'Negative': [
+        "Very disappointed with this {item}.",
+        "The fabric feels cheap and itchy.",
+        "It was so unflattering that I returned it.",
+        "Poor quality, the seam ripped after one wash.",
+        "The cut is boxy and tight across the chest.",
+        "Worst purchase I have made from this retailer.",
+    ],
+}
+
+
+def zipf_class_weights(n_classes, exponent=1.1):
+    """  Long-tailed weights for n_classes synthetic classes (SKU-like cardinality).  """
+    ranks = np.arange(1, n_classes + 1)
+    weights = 1.0 / ranks ** exponent
+    return {f'Class {i:05d}': w for i, w in enumerate(weights / weights.sum())}
+
+
+def _text_pool(rng, sentiment, mean_words, pool_size):
+    sentences = _SENTENCES[sentiment]
+    items = ['dress', 'top', 'sweater', 'skirt', 'jacket', 'pair of jeans']
+    # Sentences average ~8 words
+    counts = np.maximum(1, rng.poisson(max(mean_words, 1) / 8.0, size=pool_size))
+    pool = []
+    for count in counts:
+        picked = rng.choice(len(sentences), size=count)
+        item = items[rng.integers(len(items))]
+        pool.append(' '.join(sentences[i] for i in picked).replace('{item}', item))
+    return np.array(pool, dtype=object)
+
+
+def generate_reviews(n_rows, class_weights=None, mean_words=60, empty_fraction=0.04,
+                     pool_size=4096, with_labels=False, as_strings=True, seed=0):
+    """
+    Generates n_rows synthetic reviews following the raw_data schema.
+
+    class_weights maps class name -> relative weight (DEFAULT_CLASS_WEIGHTS by default,
+    see zipf_class_weights for high cardinality); mean_words sets the typical review
+    length. Review texts are sampled from a pool of pool_size texts per sentiment so
+    generation stays vectorised up to millions of rows. as_strings=True returns
+    every value as a string, like extract_raw_data does; with_labels=True adds
+    rating-derived 'AI Sentiment' / 'AI Summary' / 'Action Needed?' columns so
+    the analysis stage can run without the LLM.
+    """
+    rng = np.random.default_rng(seed)
+    weights = class_weights or DEFAULT_CLASS_WEIGHTS
+
+    class_names = np.array(list(weights.keys()), dtype=object)
+    class_probs = np.array(list(weights.values()), dtype=float)
+    classes = class_names[rng.choice(len(class_names), size=n_rows, p=class_probs / class_probs.sum())]
+
+    ratings = rng.choice(list(RATING_WEIGHTS.keys()), size=n_rows, p=list(RATING_WEIGHTS.values()))
+    sentiments = np.where(ratings >= 4, 'Positive', np.where(ratings == 3, 'Neutral', 'Negative'))
+
+    texts = np.empty(n_rows, dtype=object)
+    for sentiment in ('Positive', 'Neutral', 'Negative'):
+        mask = sentiments == sentiment
+        pool = _text_pool(rng, sentiment, mean_words, pool_size)
+        texts[mask] = pool[rng.integers(len(pool), size=mask.sum())]
+    texts[rng.random(n_rows) < empty_fraction] = ''
+
+    departments = pd.Series(classes).map(CLASS_DEPARTMENTS).fillna('General').to_numpy()
+    divisions = np.array(['General', 'General Petite', 'Initmates'], dtype=object)
+
+    df = pd.DataFrame({
+        'Unnamed: 0': np.arange(n_rows),
+        'Clothing ID': rng.integers(0, 1200, size=n_rows),
+        'Age': rng.integers(18, 90, size=n_rows),
+        'Title': '',
+        'Review Text': texts,
+        'Rating': ratings,
+        'Recommended IND': (ratings >= 4).astype(int),
+        'Positive Feedback Count': rng.poisson(2.5, size=n_rows),
+        'Division Name': divisions[rng.choice(3, size=n_rows, p=[0.59, 0.35, 0.06])],
+        'Department Name': departments,
+        'Class Name': classes,
+    }, columns=RAW_COLUMNS)
+
+    if with_labels:
+        df['AI Sentiment'] = sentiments
+        df['AI Summary'] = pd.Series(texts).str.slice(0, 100).to_numpy()
+        df['Action Needed?'] = np.where(sentiments == 'Negative', 'Yes', 'No')
+
+    if as_strings:
+        df = df.astype(str)
+
+    return df
@@ -1,17 +1,35 @@
 import os
-import gspread
-from oauth2client.service_account import ServiceAccountCredentials
-from dotenv import load_dotenv
-from groq import Groq
+import time
 
-# Load environment variables
-load_dotenv()
+from src import metrics
+from src.prompts import MAX_COMPLETION_TOKENS, MAX_REVIEW_TOKENS, PROMPT_VERSION, build_messages, estimate_tokens
 
-def connect_to_google_sheets():
+# Heavy client libraries (gspread, oauth2client, groq) are imported inside the
+# functions that need them so that importing src.* stays cheap.
+_env_loaded = False
+
+
+def load_env():
+    """
+    Loads environment variables from .env once, on first use.
+    """
+    global _env_loaded
+    if not _env_loaded:
+        from dotenv import load_dotenv
+        load_dotenv()
+        _env_loaded = True
+
+
+def connect_to_google_sheets(sheet_id=None):
     """
     Establishes connection to Google Sheets
     """
     try:
+        import gspread
+        from oauth2client.service_account import ServiceAccountCredentials
+        
+        load_env()
+        
         scope = [
             'https://spreadsheets.google.com/feeds',
             'https://www.googleapis.com/auth/drive'
@@ -25,11 +43,12 @@ def connect_to_google_sheets():
         
         client = gspread.authorize(creds)
         
-        sheet_id = os.getenv('GOOGLE_SHEET_ID')
+        sheet_id = sheet_id or os.getenv('GOOGLE_SHEET_ID')
         
         if not sheet_id:
             raise ValueError("GOOGLE_SHEET_ID not found in .env file")
         
+        metrics.increment('sheets_calls_total', method='open_by_key')
         spreadsheet = client.open_by_key(sheet_id)
         
         print(f"✅ Successfully connected to: {spreadsheet.title}")
@@ -45,18 +64,200 @@ def connect_to_google_sheets():
         return None
 
 
-def call_groq_llm(review_text):
+POSITIVE_WORDS = {
+    'love', 'loved', 'great', 'perfect', 'beautiful', 'comfortable', 'cute', 'gorgeous',
+    'flattering', 'soft', 'excellent', 'amazing', 'recommend', 'compliments', 'pretty', 'nice'
+}
+NEGATIVE_WORDS = {
+    'disappointed', 'return', 'returned', 'returning', 'poor', 'cheap', 'terrible', 'bad',
+    'unflattering', 'itchy', 'scratchy', 'awful', 'ripped', 'tight', 'boxy', 'worst'
+}
+
+
+def local_sentiment(review_text):
     """
-    Sends review text to Groq LLM for sentiment analysis.
+    Cheap lexicon-based sentiment used where a Groq call is not possible or not
+    worth it. Returns the same keys as call_groq_llm plus a 0-1 'confidence'.
+    Empty reviews never get here: the quality gate (src.quality) labels them.
     """
-    if not review_text or str(review_text).strip() == '' or str(review_text).lower() == 'nan':
-        return {
-            'sentiment': 'Neutral',
-            'summary': 'No review text provided'
-        }
+    text = str(review_text)
+    words = [word.strip('.,!?;:"()').lower() for word in text.split()]
+    positive = sum(word in POSITIVE_WORDS for word in words)
+    negative = sum(word in NEGATIVE_WORDS for word in words)
+    
+    if positive > negative:
+        sentiment = 'Positive'
+    elif negative > positive:
+        sentiment = 'Negative'
+    else:
+        sentiment = 'Neutral'
+    
+    hits = positive + negative
+    confidence = abs(positive - negative) / (hits + 1) if hits else 0.0
+    
+    return {
+        'sentiment': sentiment,
+        'summary': text[:100],
+        'confidence': round(confidence, 3)
+    }
+
+
+def record_groq_usage(model, latency, chat_completion, estimated_prompt_tokens=None):
+    """
+    Records latency and token usage for one Groq completion (or the stream chunk
+    carrying its usage). When the API reported no prompt tokens, e.g. a stream
+    closed before its last chunk, estimated_prompt_tokens is counted instead.
+    """
+    metrics.increment('groq_requests_total', model=model)
+    metrics.observe('groq_latency_seconds', latency, model=model)
+    
+    usage = getattr(chat_completion, 'usage', None)
+    for field in ('prompt_tokens', 'completion_tokens'):
+        tokens = getattr(usage, field, None)
+        if not isinstance(tokens, int) and field == 'prompt_tokens':
+            tokens = estimated_prompt_tokens
+        if isinstance(tokens, int):
+            metrics.increment(f'groq_{field}_total', tokens, model=model)
+
+
+def is_rate_limited(error):
+    """
+    True if an exception from the Groq client is a 429 / rate-limit response.
+    """
+    return getattr(error, 'status_code', None) == 429 or type(error).__name__ == 'RateLimitError'
+
+
+DEFAULT_MODEL = "openai/gpt-oss-20b"
+
+
+def error_kind(error):
+    """  'throttled' (429), 'timeout' or 'error' for an exception from a Groq call.  """
+    if is_rate_limited(error):
+        return 'throttled'
+    if isinstance(error, TimeoutError) or 'Timeout' in type(error).__name__:
+        return 'timeout'
+    return 'error'
+
+
+def label_version(model=None):
+    """  Model and prompt version a label was produced with, e.g. 'openai/gpt-oss-20b@1a2b3c4d'.  """
+    return f"{model or DEFAULT_MODEL}@{PROMPT_VERSION}"
+
+
+def parse_llm_response(response_text, review_text):
+    """
+    Reads the SENTIMENT / SUMMARY lines of a completion, inferring the sentiment
+    from keywords when the reply does not follow the format. 'source' records
+    which of the two produced the label ('llm' or 'keyword_fallback').
+    """
+    # Parse the response more robustly
+    sentiment = 'Neutral'  # Default
+    summary = review_text[:100] if len(review_text) > 100 else review_text
     
+    # Try to parse line by line
+    lines = response_text.split('\n')
+    for line in lines:
+        line = line.strip()
+        
+        # Look for SENTIMENT line
+        if line.upper().startswith('SENTIMENT:'):
+            sentiment_raw = line.split(':', 1)[1].strip().lower()
+            
+            # More flexible matching
+            if 'positive' in sentiment_raw:
+                sentiment = 'Positive'
+            elif 'negative' in sentiment_raw:
+                sentiment = 'Negative'
+            else:
+                sentiment = 'Neutral'
+        
+        # Look for SUMMARY line
+        elif line.upper().startswith('SUMMARY:'):
+            summary = line.split(':', 1)[1].strip()
+    
+    source = 'llm'
+    
+    # Fallback: if response doesn't follow format, try to infer sentiment
+    if sentiment == 'Neutral' and summary == review_text[:100]:
+        source = 'keyword_fallback'
+        response_lower = response_text.lower()
+        if any(word in response_lower for word in ['positive', 'good', 'great', 'love', 'excellent']):
+            sentiment = 'Positive'
+        elif any(word in response_lower for word in ['negative', 'bad', 'poor', 'terrible', 'disappointed']):
+            sentiment = 'Negative'
+    
+    return {
+        'sentiment': sentiment,
+        'summary': summary,
+        'source': source
+    }
+
+
+def read_stream(stream):
+    """
+    Reads a streamed completion only until the answer is known: the SENTIMENT
+    and SUMMARY lines are complete. The stream is then closed so the rest is
+    never generated. Returns (text, stopped_early, usage_chunk), where
+    usage_chunk is the final chunk carrying token usage if it was read.
+    """
+    text = ''
+    checked = 0
+    sentiment_seen = summary_seen = False
+    usage_chunk = None
+    try:
+        for chunk in stream:
+            if getattr(chunk, 'usage', None) is not None:
+                usage_chunk = chunk
+            choices = getattr(chunk, 'choices', None)
+            delta = choices[0].delta.content if choices else None
+            if not delta:
+                continue
+            text += delta
+
+            # Only lines that have ended can be trusted
+            end = text.rfind('\n')
+            if end < checked:
+                continue
+            for line in text[checked:end].split('\n'):
+                label = line.strip().upper()
+                sentiment_seen = sentiment_seen or label.startswith('SENTIMENT:')
+                summary_seen = summary_seen or label.startswith('SUMMARY:')
+            checked = end + 1
+
+            if sentiment_seen and summary_seen:
+                return text, True, usage_chunk
+        return text, False, usage_chunk
+
+    finally:
+        close = getattr(stream, 'close', None)
+        if close is not None:
+            close()
+
+
+def call_groq_llm(review_text, api_key=None, raise_errors=False, model=None,
+                  max_review_tokens=MAX_REVIEW_TOKENS, stream=False):
+    """
+    Sends review text to Groq LLM for sentiment analysis.
+    api_key defaults to GROQ_API_KEY and model to DEFAULT_MODEL; with raise_errors=True API failures are
+    re-raised (for callers that retry or rebalance) instead of returning the
+    'Error processing review' result. Reviews longer than max_review_tokens
+    (estimated) are trimmed to their start and end before prompting.
+    stream=True reads the completion as it is generated and stops once the
+    answer lines are complete (see read_stream); parsing is the same either way.
+    The pipeline's quality gate (src.quality) keeps empty reviews away from
+    here; blank input from any other caller (empty, None, NaN) gets the gate's
+    empty label without a request.
+    """
+    from src.quality import EMPTY_SENTINELS, REASON_OUTPUTS
+
+    if review_text is None or str(review_text).strip().lower() in EMPTY_SENTINELS:
+        return {'sentiment': 'Neutral', 'summary': REASON_OUTPUTS['empty'], 'source': 'empty'}
+
     try:
-        api_key = os.getenv('GROQ_API_KEY')
+        from groq import Groq
+        
+        load_env()
+        api_key = api_key or os.getenv('GROQ_API_KEY')
         
         if not api_key:
             raise ValueError("GROQ_API_KEY not found in .env file")
@@ -64,83 +265,45 @@ def call_groq_llm(review_text):
         # Initialize Groq client
         client = Groq(api_key=api_key)
         
-        # Create a VERY clear prompt
-        prompt = f"""You are analyzing a product review. Read it carefully and respond with EXACTLY this format:
-
-                SENTIMENT: [Choose ONLY one: Positive OR Negative OR Neutral]
-                SUMMARY: [Write one clear sentence summarizing the review]
-
-                Review to analyze: "{review_text}"
-
-                Remember:
-                - Positive: Customer likes the product (good, great, love, recommend, etc.)
-                - Negative: Customer dislikes it (bad, terrible, disappointed, poor quality, etc.)
-                - Neutral: Mixed feelings or just describing facts
-
-                Your response:"""
+        messages, estimated_tokens = build_messages(review_text, max_review_tokens)
         
         # Call Groq API
+        model = model or DEFAULT_MODEL
+        started = time.perf_counter()
         chat_completion = client.chat.completions.create(
-            messages=[
-                {
-                    "role": "system",
-                    "content": "You are a sentiment analysis expert. Always respond in the exact format requested."
-                },
-                {
-                    "role": "user",
-                    "content": prompt,
-                }
-            ],
-            model="openai/gpt-oss-20b",
+            messages=messages,
+            model=model,
             temperature=0.1,  # Very low for consistency
-            max_tokens=150,
+            max_tokens=MAX_COMPLETION_TOKENS,
+            **({'stream': True, 'stream_options': {'include_usage': True}} if stream else {})
         )
         
-        # Extract response
-        response_text = chat_completion.choices[0].message.content.strip()
+        if stream:
+            response_text, stopped_early, usage_chunk = read_stream(chat_completion)
+            # Usage only arrives in the last chunk, which an early stop never reads
+            record_groq_usage(model, time.perf_counter() - started, usage_chunk, estimated_tokens)
+            metrics.increment('groq_streams_total', model=model, ended='early' if stopped_early else 'complete')
+            metrics.increment('groq_streamed_completion_tokens_total', estimate_tokens(response_text), model=model)
+            response_text = response_text.strip()
+        else:
+            record_groq_usage(model, time.perf_counter() - started, chat_completion)
+            # Extract response
+            response_text = chat_completion.choices[0].message.content.strip()
         
-        # Parse the response more robustly
-        sentiment = 'Neutral'  # Default
-        summary = review_text[:100] if len(review_text) > 100 else review_text
-        
-        # Try to parse line by line
-        lines = response_text.split('\n')
-        for line in lines:
-            line = line.strip()
-            
-            # Look for SENTIMENT line
-            if line.upper().startswith('SENTIMENT:'):
-                sentiment_raw = line.split(':', 1)[1].strip().lower()
-                
-                # More flexible matching
-                if 'positive' in sentiment_raw:
-                    sentiment = 'Positive'
-                elif 'negative' in sentiment_raw:
-                    sentiment = 'Negative'
-                else:
-                    sentiment = 'Neutral'
-            
-            # Look for SUMMARY line
-            elif line.upper().startswith('SUMMARY:'):
-                summary = line.split(':', 1)[1].strip()
-        
-        # Fallback: if response doesn't follow format, try to infer sentiment
-        if sentiment == 'Neutral' and summary == review_text[:100]:
-            response_lower = response_text.lower()
-            if any(word in response_lower for word in ['positive', 'good', 'great', 'love', 'excellent']):
-                sentiment = 'Positive'
-            elif any(word in response_lower for word in ['negative', 'bad', 'poor', 'terrible', 'disappointed']):
-                sentiment = 'Negative'
+        # Kept next to groq_prompt_tokens_total to check the local estimate
+        metrics.increment('groq_estimated_prompt_tokens_total', estimated_tokens, model=model)
         
-        return {
-            'sentiment': sentiment,
-            'summary': summary
-        }
+        return dict(parse_llm_response(response_text, review_text), version=label_version(model))
     
     except Exception as e:
+        metrics.increment('groq_errors_total', type=type(e).__name__)
+        if raise_errors:
+            raise
         print(f"⚠️  Error calling Groq LLM: {e}")
         # Return neutral sentiment on error
         return {
             'sentiment': 'Neutral',
-            'summary': f'Error processing review'
+            'summary': f'Error processing review',
+            'source': 'error',
+            'error': error_kind(e)
         }
\ No newline at end of file
@@ -0,0 +1,223 @@
+import time
+
+from src import metrics
+from src.checkpoints import fingerprint
+
+
+class RawDataWatcher:
+    """
+    Cheap change detection for the raw_data worksheet. Each poll reads only the
+    first column (for the row count) and the last known row (for its
+    fingerprint), and only fetches rows appended since the previous poll.
+    """
+
+    def __init__(self, spreadsheet, worksheet_name='raw_data'):
+        self.worksheet = spreadsheet.worksheet(worksheet_name)
+        self.headers = None
+        self.row_count = None
+        self.last_row = None
+        self._pending = None
+
+    def _row_fingerprint(self, row_number):
+        metrics.increment('sheets_calls_total', method='row_values')
+        return fingerprint(*self.worksheet.row_values(row_number))
+
+    def _data_rows(self):
+        metrics.increment('sheets_calls_total', method='col_values')
+        # Header row included; rows are appended, so column A length tracks the data
+        return len(self.worksheet.col_values(1)) - 1
+
+    def reset(self, row_count=None):
+        """
+        Takes the sheet's current state as the baseline (everything up to now is
+        processed). row_count pins the baseline to the rows a run actually read,
+        so rows appended after that are still picked up by the next poll.
+        """
+        metrics.increment('sheets_calls_total', method='row_values')
+        self.headers = self.worksheet.row_values(1)
+        self.row_count = self._data_rows() if row_count is None else row_count
+        self.last_row = self._row_fingerprint(self.row_count + 1) if self.row_count else None
+
+    def poll(self):
+        """
+        Returns ('unchanged', None), ('appended', new_rows_df) or ('changed', None).
+        'changed' means rows were edited or removed, so only a full run is safe.
+        """
+        import pandas as pd
+
+        count = self._data_rows()
+        known_row = self._row_fingerprint(self.row_count + 1) if self.row_count else None
+
+        if count < self.row_count or known_row != self.last_row:
+            metrics.increment('watch_polls_total', result='changed')
+            return 'changed', None
+
+        if count == self.row_count:
+            metrics.increment('watch_polls_total', result='unchanged')
+            return 'unchanged', None
+
+        first, last = self.row_count + 2, count + 1
+        metrics.increment('sheets_calls_total', method='get_values')
+        values = self.worksheet.get_values(f'{first}:{last}')
+
+        width = len(self.headers)
+        rows = [(list(row) + [''] * width)[:width] for row in values]
+        new_rows = pd.DataFrame(rows, columns=self.headers)
+
+        self._pending = (count, fingerprint(*values[-1]) if values else self._row_fingerprint(last))
+        metrics.increment('watch_polls_total', result='appended')
+        return 'appended', new_rows
+
+    def advance(self):
+        """  Marks the rows returned by the last 'appended' poll as processed.  """
+        self.row_count, self.last_row = self._pending
+
+
+class IncrementalAnalysis:
+    """
+    Keeps the processed rows seen so far and a RunningBreakdown, so each new
+    batch only adds its own rows before the report is rewritten.
+    """
+
+    def __init__(self, processed_df):
+        from src.main import find_class_column
+        from src.streaming import RunningBreakdown
+
+        self.class_column = find_class_column(processed_df)
+        self.processed = processed_df.reset_index(drop=True)
+        self.running = RunningBreakdown(self.class_column) if self.class_column else None
+        self._add_counts(self.processed)
+
+    def _add_counts(self, df):
+        if self.running is None or 'AI Sentiment' not in df.columns:
+            return
+        for class_value, sentiment in zip(df[self.class_column], df['AI Sentiment']):
+            self.running.add(class_value, sentiment)
+
+    def add(self, new_processed):
+        import pandas as pd
+
+        self.processed = pd.concat([self.processed, new_processed], ignore_index=True)
+        self._add_counts(new_processed)
+
+    def write_report(self):
+        """  Rewrites the breakdown CSV and insights report (charts are left to full runs).  """
+        from src.analysis import generate_insights_report, identify_top_classes, save_breakdown
+
+        if self.running is None:
+            return False
+        breakdown, breakdown_pct = self.running.to_frames()
+        if breakdown is None:
+            return False
+
+        save_breakdown(breakdown, breakdown_pct)
+        top_classes = identify_top_classes(self.processed, breakdown_pct, self.class_column)
+        generate_insights_report(self.processed, breakdown, breakdown_pct, top_classes, self.class_column)
+        return True
+
+
+def append_rows(spreadsheet, worksheet_name, df):
+    """  Appends df's rows (no header) to a worksheet. Returns True on success.  """
+    try:
+        worksheet = spreadsheet.worksheet(worksheet_name)
+        metrics.increment('sheets_calls_total', method='append_rows')
+        worksheet.append_rows(df.values.tolist())
+        print(f"✅ Appended {len(df)} rows to {worksheet_name}")
+        return True
+
+    except Exception as e:
+        print(f"❌ Error appending to {worksheet_name}: {e}")
+        return False
+
+
+def _with_fresh_deadline(llm_options):
+    """  llm_options with the deadline (if any) restarted, so every run or batch gets the full budget.  """
+    llm_options = dict(llm_options or {})
+    if llm_options.get('deadline') is not None:
+        llm_options['deadline'] = llm_options['deadline'].restarted()
+    return llm_options
+
+
+def process_new_rows(spreadsheet, new_rows, analysis, llm_options=None, results_db=None):
+    """  Runs clean -> LLM -> append (staging, processed) -> report for newly appended raw rows.  """
+    from src.etl import clean_data, process_reviews_with_llm
+
+    cleaned = clean_data(new_rows)
+    processed = process_reviews_with_llm(cleaned, **_with_fresh_deadline(llm_options))
+
+    # Nothing is written until the LLM step is done, so a failed batch can be retried as a whole
+    if not append_rows(spreadsheet, 'staging', cleaned):
+        return False
+    if not append_rows(spreadsheet, 'processed', processed):
+        return False
+
+    metrics.increment('watch_rows_total', len(processed))
+    if results_db:
+        from src.results_store import ResultsStore
+
+        ResultsStore(results_db).append(processed)
+    analysis.add(processed)
+    analysis.write_report()
+    return True
+
+
+def watch(spreadsheet=None, min_interval=5.0, max_interval=30.0, max_polls=None, llm_options=None,
+          results_db=None):
+    """
+    Runs the full pipeline once, then polls raw_data and pushes only newly
+    appended rows through clean, LLM, load and the report. The poll interval
+    doubles while the sheet is idle (up to max_interval) and drops back to
+    min_interval as soon as rows arrive. Edits or deletions trigger a full run.
+    Returns False if the initial run or connection fails.
+    """
+    from src.main import connect, read_worksheet, run_full_pipeline
+
+    def full_run():
+        # The baseline is the data the run extracted, not the sheet once the run is over
+        extracted = []
+        if not run_full_pipeline(llm_options=_with_fresh_deadline(llm_options), results_db=results_db,
+                                 on_extract=lambda raw: extracted.append(len(raw))):
+            return None
+        watcher.reset(extracted[0] if extracted else None)
+        processed = read_worksheet(spreadsheet, 'processed')
+        return IncrementalAnalysis(processed) if processed is not None else None
+
+    spreadsheet = spreadsheet or connect()
+    if not spreadsheet:
+        return False
+
+    watcher = RawDataWatcher(spreadsheet)
+    analysis = full_run()
+    if analysis is None:
+        print(" Watch mode stopped: initial run failed")
+        return False
+
+    print(f"\n👀 Watching raw_data ({watcher.row_count} rows)...")
+    interval = min_interval
+    polls = 0
+
+    while max_polls is None or polls < max_polls:
+        time.sleep(interval)
+        polls += 1
+
+        try:
+            status, new_rows = watcher.poll()
+        except Exception as e:
+            print(f"⚠️  Poll failed: {e}")
+            interval = min(interval * 2, max_interval)
+            continue
+
+        if status == 'unchanged':
+            interval = min(interval * 2, max_interval)
+            continue
+
+        interval = min_interval
+        if status == 'appended':
+            print(f"\n🆕 {len(new_rows)} new reviews in raw_data")
+            if process_new_rows(spreadsheet, new_rows, analysis, llm_options, results_db):
+                watcher.advance()
+        else:
+            print("\n🔄 raw_data was edited - running the full pipeline")
+            analysis = full_run() or analysis
+
+    return True
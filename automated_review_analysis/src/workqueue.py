@@ -0,0 +1,304 @@
+import io
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+from src import metrics
+
+QUEUE_DB = 'review_queue.db'
+
+# llm_options holding a per-process request budget; each has split(parts)
+BUDGET_OPTIONS = ('key_pool', 'rate_limiter', 'concurrency')
+
+
+class Lease:
+    """  A worker's claim on one chunk: commit() is only accepted while the token is still current.  """
+
+    def __init__(self, chunk_id, token, rows):
+        self.chunk_id = chunk_id
+        self.token = token
+        self.rows = rows
+
+
+class WorkQueue:
+    """
+    Durable SQLite work queue for the LLM stage. The cleaned frame is split
+    into chunks; workers (processes on this host, or on any host that shares
+    the file) lease a chunk, renew the lease with heartbeats while they work,
+    and commit its results. A lease that is not renewed expires and the chunk
+    goes back to the queue. A commit only succeeds for the lease that currently
+    holds the chunk, so every chunk's result is committed exactly once.
+    """
+
+    def __init__(self, path=QUEUE_DB, lease_seconds=120.0):
+        self.path = path
+        self.lease_seconds = lease_seconds
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+            conn.execute("CREATE TABLE IF NOT EXISTS chunks (chunk_id INTEGER PRIMARY KEY, rows_json TEXT, "
+                         "status TEXT, lease_token TEXT, lease_owner TEXT, lease_expires REAL, "
+                         "attempts INTEGER DEFAULT 0, result_json TEXT, committed_at REAL)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_chunks_status ON chunks (status, lease_expires)")
+            conn.execute("CREATE TABLE IF NOT EXISTS worker_metrics (owner TEXT, snapshot_json TEXT)")
+
+    @contextmanager
+    def _connect(self, immediate=False):
+        """  One connection per operation; immediate=True takes the write lock up front (lease / commit).  """
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        try:
+            conn.execute("BEGIN IMMEDIATE" if immediate else "BEGIN")
+            try:
+                yield conn
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        finally:
+            conn.close()
+
+    def enqueue(self, df, chunk_size=100):
+        """
+        Splits df into chunks for the workers. Re-enqueueing the same frame keeps
+        the progress already made (a restarted coordinator resumes); a different
+        frame replaces the queue. Returns the number of chunks.
+        """
+        from src.checkpoints import frame_fingerprint
+
+        key = frame_fingerprint(df)
+        with self._connect(immediate=True) as conn:
+            row = conn.execute("SELECT value FROM meta WHERE key = 'frame'").fetchone()
+            if row is not None and row[0] == key:
+                count = conn.execute("SELECT COUNT(*) FROM chunks").fetchone()[0]
+                print(f"♻️  Resuming queue {self.path} ({count} chunks)")
+                return count
+
+            conn.execute("DELETE FROM chunks")
+            conn.execute("DELETE FROM worker_metrics")
+            conn.execute("INSERT OR REPLACE INTO meta VALUES ('frame', ?)", (key,))
+            chunks = [
+                (chunk_id, df.iloc[start:start + chunk_size].to_json(orient='split'), 'pending')
+                for chunk_id, start in enumerate(range(0, len(df), chunk_size))
+            ]
+            conn.executemany("INSERT INTO chunks (chunk_id, rows_json, status) VALUES (?, ?, ?)", chunks)
+
+        metrics.increment('workqueue_chunks_total', len(chunks), outcome='enqueued')
+        print(f"📥 Queued {len(df)} reviews in {len(chunks)} chunks of up to {chunk_size} ({self.path})")
+        return len(chunks)
+
+    def lease(self, owner):
+        """  Claims the next pending (or expired) chunk for owner. Returns a Lease, or None if nothing is free.  """
+        import pandas as pd
+
+        now = time.time()
+        with self._connect(immediate=True) as conn:
+            row = conn.execute(
+                "SELECT chunk_id, rows_json, status FROM chunks WHERE status = 'pending' "
+                "OR (status = 'leased' AND lease_expires < ?) ORDER BY chunk_id LIMIT 1", (now,)
+            ).fetchone()
+            if row is None:
+                return None
+
+            chunk_id, rows_json, status = row
+            token = uuid.uuid4().hex
+            conn.execute("UPDATE chunks SET status = 'leased', lease_token = ?, lease_owner = ?, "
+                         "lease_expires = ?, attempts = attempts + 1 WHERE chunk_id = ?",
+                         (token, owner, now + self.lease_seconds, chunk_id))
+
+        metrics.increment('workqueue_leases_total', kind='expired' if status == 'leased' else 'new')
+        return Lease(chunk_id, token, pd.read_json(io.StringIO(rows_json), orient='split', dtype=False))
+
+    def heartbeat(self, lease):
+        """  Extends the lease. False means it was lost (expired and taken over, or already committed).  """
+        with self._connect(immediate=True) as conn:
+            cursor = conn.execute("UPDATE chunks SET lease_expires = ? WHERE chunk_id = ? AND lease_token = ? "
+                                  "AND status = 'leased'", (time.time() + self.lease_seconds, lease.chunk_id,
+                                                            lease.token))
+            return cursor.rowcount == 1
+
+    def commit(self, lease, results):
+        """  Stores the chunk's results if lease still holds it. Returns False if another worker owns it now.  """
+        with self._connect(immediate=True) as conn:
+            cursor = conn.execute("UPDATE chunks SET status = 'done', result_json = ?, committed_at = ? "
+                                  "WHERE chunk_id = ? AND lease_token = ? AND status = 'leased'",
+                                  (results.to_json(orient='split'), time.time(), lease.chunk_id, lease.token))
+            committed = cursor.rowcount == 1
+
+        metrics.increment('workqueue_chunks_total', outcome='committed' if committed else 'lost')
+        return committed
+
+    def release(self, lease):
+        """  Hands an unfinished chunk straight back to the queue.  """
+        with self._connect(immediate=True) as conn:
+            conn.execute("UPDATE chunks SET status = 'pending', lease_token = NULL, lease_expires = NULL "
+                         "WHERE chunk_id = ? AND lease_token = ? AND status = 'leased'",
+                         (lease.chunk_id, lease.token))
+        metrics.increment('workqueue_chunks_total', outcome='released')
+
+    def save_metrics(self, owner, snapshot):
+        """  Stores a worker's metrics.snapshot() for the coordinator to merge.  """
+        with self._connect(immediate=True) as conn:
+            conn.execute("INSERT INTO worker_metrics VALUES (?, ?)", (owner, json.dumps(snapshot)))
+
+    def collect_metrics(self):
+        """  Takes every stored worker snapshot off the queue.  """
+        with self._connect(immediate=True) as conn:
+            rows = conn.execute("SELECT snapshot_json FROM worker_metrics").fetchall()
+            conn.execute("DELETE FROM worker_metrics")
+        return [json.loads(row[0]) for row in rows]
+
+    def progress(self):
+        """  Chunk counts by status: pending, leased and done.  """
+        with self._connect() as conn:
+            counts = dict(conn.execute("SELECT status, COUNT(*) FROM chunks GROUP BY status").fetchall())
+        return {status: counts.get(status, 0) for status in ('pending', 'leased', 'done')}
+
+    def assemble(self, df=None):
+        """
+        The processed frame once every chunk is done, else None. With df (the
+        enqueued frame) the results are written onto a copy of it; otherwise
+        the frame is rebuilt from the queued rows.
+        """
+        import pandas as pd
+
+        with self._connect() as conn:
+            rows = conn.execute("SELECT rows_json, result_json, status FROM chunks ORDER BY chunk_id").fetchall()
+        if not rows or any(status != 'done' for _, _, status in rows):
+            return None
+
+        results = pd.concat([pd.read_json(io.StringIO(result), orient='split', dtype=False)
+                             for _, result, _ in rows])
+        if df is None:
+            df = pd.concat([pd.read_json(io.StringIO(chunk), orient='split', dtype=False)
+                            for chunk, _, _ in rows])
+
+        processed = df.copy()
+        for col in results.columns:
+            processed[col] = results[col].reindex(processed.index).fillna('')
+        return processed
+
+
+def _heartbeat_loop(queue, lease, interval, stop, lost):
+    while not stop.wait(interval):
+        if not queue.heartbeat(lease):
+            lost.set()
+            return
+
+
+def share_budgets(llm_options, parts):
+    """  llm_options with every request budget split into `parts` equal shares (one per worker process).  """
+    llm_options = dict(llm_options or {})
+    for name in BUDGET_OPTIONS:
+        if llm_options.get(name) is not None and parts > 1:
+            llm_options[name] = llm_options[name].split(parts)
+    return llm_options
+
+
+def run_worker(path=QUEUE_DB, llm_options=None, lease_seconds=120.0, heartbeat_seconds=None,
+               poll_seconds=5.0, owner=None, report_metrics=False, wait_seconds=0.0):
+    """
+    Leases chunks from the queue at path and runs them through the LLM stage
+    until every chunk is done (waiting out other workers' leases, in case they
+    die and their chunks come back). A worker started before anything was
+    queued polls for up to wait_seconds for the coordinator to enqueue.
+    report_metrics=True leaves this process's metrics in the queue for the
+    coordinator. Returns the number of chunks this worker committed.
+    """
+    from src.etl import llm_columns, process_reviews_with_llm
+
+    llm_options = llm_options or {}
+    queue = WorkQueue(path, lease_seconds=lease_seconds)
+    owner = owner or f"{socket.gethostname()}-{os.getpid()}-{threading.get_ident()}"
+    heartbeat_seconds = heartbeat_seconds or lease_seconds / 3
+    columns = llm_columns(llm_options.get('deadline'))
+    wait_until = time.monotonic() + wait_seconds
+    waiting = False
+    committed = 0
+
+    while True:
+        lease = queue.lease(owner)
+        if lease is None:
+            progress = queue.progress()
+            if progress['pending'] == 0 and progress['leased'] == 0:
+                if progress['done'] > 0 or time.monotonic() >= wait_until:
+                    break
+                if not waiting:
+                    print(f"⏳ Waiting up to {wait_seconds:.0f}s for work in {path}...")
+                    waiting = True
+            time.sleep(poll_seconds)
+            continue
+
+        stop, lost = threading.Event(), threading.Event()
+        beat = threading.Thread(target=_heartbeat_loop, args=(queue, lease, heartbeat_seconds, stop, lost),
+                                name=f'lease-{lease.chunk_id}', daemon=True)
+        beat.start()
+        started = time.perf_counter()
+        try:
+            processed = process_reviews_with_llm(lease.rows, **llm_options)
+            # On error the LLM stage hands back its input frame, without the output columns
+            missing = [col for col in columns if col not in processed.columns]
+            if missing:
+                raise RuntimeError(f"LLM stage failed on chunk {lease.chunk_id} (no {', '.join(missing)})")
+        except BaseException:
+            queue.release(lease)
+            raise
+        finally:
+            stop.set()
+            beat.join()
+
+        metrics.observe('workqueue_chunk_seconds', time.perf_counter() - started)
+        if lost.is_set():
+            print(f"⚠️  Lease on chunk {lease.chunk_id} expired; its results are left to the new owner")
+            metrics.increment('workqueue_chunks_total', outcome='lost')
+            continue
+        if queue.commit(lease, processed[columns]):
+            committed += 1
+
+    print(f"✅ Worker {owner} committed {committed} chunks")
+    if report_metrics:
+        queue.save_metrics(owner, metrics.snapshot())
+    return committed
+
+
+def _forked_worker(path, llm_options, lease_seconds):
+    # Counters inherited from the coordinator at fork time are already counted there
+    metrics.reset()
+    run_worker(path, llm_options=llm_options, lease_seconds=lease_seconds, report_metrics=True)
+
+
+def run_coordinator(df, path=QUEUE_DB, chunk_size=100, workers=1, llm_options=None, lease_seconds=120.0):
+    """
+    Queues df and works through it with `workers` local processes (this one
+    included); workers started elsewhere against the same file join in. The
+    request budgets in llm_options are shared out between the local processes,
+    and their metrics (and those of finished remote workers) are merged into
+    this process's. Returns the assembled processed frame.
+    """
+    import multiprocessing
+
+    queue = WorkQueue(path, lease_seconds=lease_seconds)
+    queue.enqueue(df, chunk_size=chunk_size)
+    llm_options = share_budgets(llm_options, workers)
+
+    context = multiprocessing.get_context('fork' if 'fork' in multiprocessing.get_all_start_methods() else None)
+    helpers = [
+        context.Process(target=_forked_worker, args=(path, llm_options, lease_seconds),
+                        name=f'queue-worker-{n}')
+        for n in range(max(workers - 1, 0))
+    ]
+    for helper in helpers:
+        helper.start()
+    try:
+        run_worker(path, llm_options=llm_options, lease_seconds=lease_seconds)
+    finally:
+        for helper in helpers:
+            helper.join()
+
+    for snapshot in queue.collect_metrics():
+        metrics.merge(snapshot)
+    return queue.assemble(df)
@@ -1,12 +1,14 @@
 import pytest
 import pandas as pd
 import os
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch
 from src.analysis import (
     calculate_sentiment_breakdown,
     identify_top_classes,
     create_visualizations,
-    generate_insights_report
+    generate_insights_report,
+    limit_classes,
+    save_breakdown
 )
 
 
@@ -83,11 +85,78 @@ class TestIdentifyTopClasses:
         assert isinstance(results, dict)
 
 
+class TestLimitClasses:
+    """Tests for limit_classes function."""
+    
+    def test_limit_classes_buckets_tail_into_other(self):
+        """Test classes beyond top_n are summed into an 'Other' row."""
+        breakdown = pd.DataFrame({
+            'Positive': [10, 5, 1, 1],
+            'Negative': [0, 5, 1, 0],
+            'Neutral': [0, 0, 0, 1],
+            'Total': [10, 10, 2, 2]
+        }, index=['Dresses', 'Tops', 'Swim', 'Trend'])
+        
+        limited, limited_pct = limit_classes(breakdown, top_n=2)
+        
+        assert list(limited.index) == ['Dresses', 'Tops', 'Other']
+        assert limited.loc['Other', 'Positive'] == 2
+        assert limited.loc['Other', 'Negative'] == 1
+        assert limited_pct.loc['Other'].sum() == pytest.approx(100.0)
+        assert 'Total' not in limited.columns
+    
+    def test_limit_classes_no_other_when_under_limit(self):
+        """Test no 'Other' row is added when all classes fit."""
+        breakdown = pd.DataFrame({
+            'Positive': [1, 2],
+            'Negative': [1, 0]
+        }, index=['Dresses', 'Tops'])
+        
+        limited, _ = limit_classes(breakdown, top_n=5)
+        
+        assert 'Other' not in limited.index
+        assert len(limited) == 2
+    
+    def test_limit_classes_adds_tail_to_existing_other(self):
+        """Test a top class named 'Other' keeps its own counts when the tail is folded in."""
+        breakdown = pd.DataFrame({
+            'Positive': [10, 8, 1, 2],
+            'Negative': [5, 4, 1, 0]
+        }, index=['Dresses', 'Other', 'Swim', 'Trend'])
+        
+        limited, _ = limit_classes(breakdown, top_n=2)
+        
+        assert list(limited.index) == ['Dresses', 'Other']
+        assert limited.loc['Other'].tolist() == [11, 5]
+
+
+class TestSaveBreakdown:
+    """Tests for save_breakdown function."""
+    
+    def test_save_breakdown_keeps_all_classes(self, tmp_path):
+        """Test full breakdown is written without bucketing."""
+        breakdown = pd.DataFrame({
+            'Positive': [1] * 30,
+            'Negative': [1] * 30,
+            'Total': [2] * 30
+        }, index=[f'Class {i}' for i in range(30)])
+        breakdown_pct = pd.DataFrame({
+            'Positive': [50.0] * 30,
+            'Negative': [50.0] * 30
+        }, index=breakdown.index)
+        
+        path = save_breakdown(breakdown, breakdown_pct, path=str(tmp_path / 'breakdown.csv'))
+        
+        saved = pd.read_csv(path, index_col=0)
+        assert len(saved) == 30
+        assert 'Positive %' in saved.columns
+
+
 class TestCreateVisualizations:
     """Tests for create_visualizations function."""
     
-    @patch('src.analysis.plt.savefig')
-    @patch('src.analysis.plt.close')
+    @patch('matplotlib.pyplot.savefig')
+    @patch('matplotlib.pyplot.close')
     def test_create_visualizations_success(self, mock_close, mock_savefig):
         """Test successful visualization creation."""
         df = pd.DataFrame({
@@ -114,6 +183,35 @@ class TestCreateVisualizations:
         # Should create 4 charts
         assert mock_savefig.call_count == 4
     
+    @patch('matplotlib.pyplot.savefig')
+    @patch('matplotlib.pyplot.close')
+    def test_create_visualizations_many_classes(self, mock_close, mock_savefig):
+        """Test high-cardinality class columns are capped before plotting."""
+        classes = [f'SKU {i}' for i in range(200)]
+        df = pd.DataFrame({
+            'Class Name': classes,
+            'AI Sentiment': ['Positive'] * 200
+        })
+        
+        breakdown = pd.DataFrame({
+            'Positive': [1] * 200,
+            'Negative': [0] * 200,
+            'Neutral': [0] * 200,
+            'Total': [1] * 200
+        }, index=classes)
+        breakdown_pct = pd.DataFrame({
+            'Positive': [100.0] * 200,
+            'Negative': [0.0] * 200,
+            'Neutral': [0.0] * 200
+        }, index=classes)
+        
+        with patch('src.analysis.limit_classes', wraps=limit_classes) as mock_limit:
+            charts = create_visualizations(df, breakdown, breakdown_pct, top_n=10)
+        
+        assert mock_savefig.call_count == 4
+        assert len(charts) == 4
+        mock_limit.assert_called_once_with(breakdown, 10)
+    
     def test_create_visualizations_creates_directory(self):
         """Test visualizations creates charts directory."""
         df = pd.DataFrame({
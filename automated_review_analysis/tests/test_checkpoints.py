@@ -0,0 +1,67 @@
+import pandas as pd
+from src.checkpoints import (
+    fingerprint,
+    frame_fingerprint,
+    save_stage,
+    load_stage,
+    load_latest
+)
+
+
+class TestFingerprints:
+    """Tests for fingerprint helpers."""
+    
+    def test_frame_fingerprint_is_stable(self):
+        """Test identical frames produce the same fingerprint."""
+        df1 = pd.DataFrame({'ID': [1, 2], 'Review Text': ['Good', 'Bad']})
+        df2 = pd.DataFrame({'ID': [1, 2], 'Review Text': ['Good', 'Bad']})
+        
+        assert frame_fingerprint(df1) == frame_fingerprint(df2)
+    
+    def test_frame_fingerprint_changes_with_content(self):
+        """Test a changed cell changes the fingerprint."""
+        df1 = pd.DataFrame({'ID': [1, 2], 'Review Text': ['Good', 'Bad']})
+        df2 = pd.DataFrame({'ID': [1, 2], 'Review Text': ['Good', 'Great']})
+        
+        assert frame_fingerprint(df1) != frame_fingerprint(df2)
+    
+    def test_fingerprint_depends_on_every_part(self):
+        """Test stage fingerprints differ by stage and upstream key."""
+        assert fingerprint('clean', 'abc') != fingerprint('llm', 'abc')
+        assert fingerprint('clean', 'abc') != fingerprint('clean', 'abd')
+
+
+class TestStageCheckpoints:
+    """Tests for saving and loading stage outputs."""
+    
+    def test_save_and_load_round_trip(self, tmp_path):
+        """Test a saved stage output loads back with the same values and types."""
+        df = pd.DataFrame({
+            'Rating': [5, 1],
+            'Review Text': ['Love it', 'Hate it'],
+            'AI Sentiment': ['Positive', 'Negative']
+        })
+        
+        path = save_stage('llm', 'abc123', df, cache_dir=str(tmp_path))
+        loaded = load_stage('llm', 'abc123', cache_dir=str(tmp_path))
+        
+        assert path is not None
+        pd.testing.assert_frame_equal(loaded, df)
+    
+    def test_load_stage_missing_key(self, tmp_path):
+        """Test loading an unknown key returns None."""
+        assert load_stage('clean', 'missing', cache_dir=str(tmp_path)) is None
+    
+    def test_load_latest_returns_last_saved(self, tmp_path):
+        """Test load_latest returns the most recent output and its key."""
+        save_stage('clean', 'first', pd.DataFrame({'ID': [1]}), cache_dir=str(tmp_path))
+        save_stage('clean', 'second', pd.DataFrame({'ID': [2]}), cache_dir=str(tmp_path))
+        
+        df, key = load_latest('clean', cache_dir=str(tmp_path))
+        
+        assert key == 'second'
+        assert df['ID'].tolist() == [2]
+    
+    def test_load_latest_without_saved_output(self, tmp_path):
+        """Test load_latest handles a stage that was never saved."""
+        assert load_latest('extract', cache_dir=str(tmp_path)) == (None, None)
@@ -0,0 +1,125 @@
+import threading
+import time
+import pandas as pd
+import pytest
+from unittest.mock import patch
+from src import metrics
+from src.concurrency import ConcurrencyController
+from src.etl import process_reviews_with_llm
+
+
+class RateLimitError(Exception):
+    """Stands in for groq.RateLimitError (matched by name)."""
+
+
+def _run_round(controller, latency, outcome='success'):
+    """Fills every slot, then finishes all calls with the same latency and outcome."""
+    tickets = [controller.acquire() for _ in range(controller.limit)]
+    for ticket in tickets:
+        controller.release(ticket, latency, outcome)
+
+
+class TestConcurrencyController:
+    """Tests for the AIMD concurrency limit."""
+    
+    def setup_method(self):
+        metrics.reset()
+    
+    def test_limit_grows_while_latency_is_flat(self):
+        """Test the limit rises by one per saturated round."""
+        controller = ConcurrencyController(initial_limit=2, max_limit=8)
+        
+        for _ in range(3):
+            _run_round(controller, 0.2)
+        
+        assert controller.limit == 5
+        assert metrics.get_gauge('groq_concurrency_limit') == 5
+        assert metrics.get_counter('groq_concurrency_changes_total', direction='up', reason='latency') == 3
+    
+    def test_limit_does_not_grow_when_unused(self):
+        """Test an idle limit is not raised by calls that never filled it."""
+        controller = ConcurrencyController(initial_limit=4)
+        
+        for _ in range(20):
+            controller.release(controller.acquire(), 0.2)
+        
+        assert controller.limit == 4
+    
+    def test_limit_stays_within_bounds(self):
+        """Test the limit never passes max_limit or drops below min_limit."""
+        controller = ConcurrencyController(initial_limit=3, min_limit=2, max_limit=4)
+        for _ in range(10):
+            _run_round(controller, 0.2)
+        assert controller.limit == 4
+        
+        for _ in range(10):
+            _run_round(controller, 0.2, 'throttled')
+        assert controller.limit == 2
+    
+    def test_throttling_halves_the_limit_once_per_round(self):
+        """Test a burst of 429s in one round is a single cut."""
+        controller = ConcurrencyController(initial_limit=8)
+        
+        _run_round(controller, 0.2, 'throttled')
+        
+        assert controller.limit == 4
+        assert metrics.get_counter('groq_concurrency_changes_total', direction='down', reason='throttled') == 1
+    
+    def test_rising_latency_cuts_the_limit(self):
+        """Test latency well above its recent floor backs the limit off."""
+        controller = ConcurrencyController(initial_limit=8, max_limit=8, min_samples=8)
+        _run_round(controller, 0.2)
+        
+        _run_round(controller, 2.0)
+        
+        assert controller.limit == 4
+        assert metrics.get_counter('groq_concurrency_changes_total', direction='down', reason='latency') == 1
+    
+    def test_call_reads_error_results_and_exceptions(self):
+        """Test 429s are seen both as raised errors and as error results."""
+        controller = ConcurrencyController(initial_limit=4, max_limit=4)
+        
+        def raises(text):
+            raise RateLimitError("429")
+        
+        with pytest.raises(RateLimitError):
+            controller.call(raises, 'review')
+        assert controller.limit == 2
+        
+        for _ in range(2):
+            controller.call(lambda text: {'sentiment': 'Neutral', 'source': 'error', 'error': 'throttled'}, 'review')
+        assert controller.limit == 1
+    
+    def test_history_is_kept_in_metrics(self):
+        """Test every limit change is recorded with the gauge's history."""
+        controller = ConcurrencyController(initial_limit=2, max_limit=8)
+        _run_round(controller, 0.2)
+        _run_round(controller, 0.2, 'timeout')
+        
+        history = metrics.get_gauge_history('groq_concurrency_limit')
+        
+        assert [limit for _, limit in history] == [2, 3, 1]
+        assert [limit for _, limit in controller.history] == [2, 3, 1]
+        assert metrics.summary()['gauges']['groq_concurrency_limit']['all']['value'] == 1
+    
+    def test_process_reviews_stays_under_the_limit(self):
+        """Test the LLM stage runs calls in parallel without passing the limit."""
+        df = pd.DataFrame({'Review Text': [f'Review {i}' for i in range(12)]})
+        controller = ConcurrencyController(initial_limit=3, max_limit=3)
+        lock = threading.Lock()
+        state = {'inflight': 0, 'peak': 0}
+        
+        def label(review_text, *args, **kwargs):
+            with lock:
+                state['inflight'] += 1
+                state['peak'] = max(state['peak'], state['inflight'])
+            time.sleep(0.01)
+            with lock:
+                state['inflight'] -= 1
+            return {'sentiment': 'Negative', 'summary': review_text.upper()}
+        
+        with patch('src.utils.call_groq_llm', side_effect=label):
+            result = process_reviews_with_llm(df, concurrency=controller)
+        
+        assert result['AI Summary'].tolist() == [text.upper() for text in df['Review Text']]
+        assert 1 < state['peak'] <= 3
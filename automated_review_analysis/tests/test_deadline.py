@@ -0,0 +1,86 @@
+import time
+import pandas as pd
+from unittest.mock import patch
+from src.deadline import RunDeadline, DEGRADED_COLUMN, degraded_outputs
+from src.etl import process_reviews_with_llm
+from src.keypool import KeyPool
+
+
+def _positive(text, **kwargs):
+    return {'sentiment': 'Positive', 'summary': 'From the LLM'}
+
+
+class TestRunDeadline:
+    """Tests for the run deadline projection."""
+    
+    def test_not_at_risk_with_time_to_spare(self):
+        """Test a run projected to finish in time is left alone."""
+        deadline = RunDeadline(600, reserve_seconds=0)
+        assert deadline.at_risk(done=10, remaining=10, elapsed=1.0) is False
+    
+    def test_at_risk_when_projection_overruns(self):
+        """Test a slow run is flagged once enough rows have been timed."""
+        deadline = RunDeadline(60, reserve_seconds=0)
+        assert deadline.at_risk(done=2, remaining=1000, elapsed=10.0) is False
+        assert deadline.at_risk(done=10, remaining=1000, elapsed=10.0) is True
+    
+    def test_reserve_counts_against_llm_budget(self):
+        """Test the reserve for loading/analysis is taken out of the LLM budget."""
+        deadline = RunDeadline(30, reserve_seconds=30)
+        assert deadline.at_risk(done=0, remaining=5, elapsed=0.0) is True
+    
+    def test_degraded_outputs_use_local_classifier(self):
+        """Test degraded rows get a local label and are marked."""
+        outputs, status = degraded_outputs("Poor quality, returned it")
+        
+        assert status == 'degraded'
+        assert outputs['AI Sentiment'] == 'Negative'
+        assert outputs['Action Needed?'] == 'Yes'
+        assert outputs[DEGRADED_COLUMN] == 'Yes'
+
+
+class TestDeadlineProcessing:
+    """Tests for LLM processing under a deadline."""
+    
+    @patch('time.sleep')
+    @patch('src.utils.call_groq_llm', side_effect=_positive)
+    def test_no_degradation_within_budget(self, mock_llm, mock_sleep):
+        """Test every row goes to the LLM when there is time."""
+        df = pd.DataFrame({'Review Text': ['Nice', 'Lovely', '']})
+        
+        result = process_reviews_with_llm(df, deadline=RunDeadline(600, reserve_seconds=0))
+        
+        assert result[DEGRADED_COLUMN].tolist() == ['No', 'No', 'No']
+        assert mock_llm.call_count == 2
+    
+    @patch('time.sleep')
+    @patch('src.utils.call_groq_llm', side_effect=_positive)
+    def test_remaining_rows_degraded_when_out_of_time(self, mock_llm, mock_sleep):
+        """Test rows after the budget runs out are labelled locally and marked."""
+        df = pd.DataFrame({'Review Text': ['Nice', 'Poor quality, returned it', 'Lovely', '']})
+        deadline = RunDeadline(1, reserve_seconds=0, min_samples=1)
+        
+        def slow_llm(text, **kwargs):
+            deadline.ends_at = time.monotonic()
+            return _positive(text)
+        mock_llm.side_effect = slow_llm
+        
+        result = process_reviews_with_llm(df, deadline=deadline)
+        
+        assert mock_llm.call_count == 1
+        assert result[DEGRADED_COLUMN].tolist() == ['No', 'Yes', 'Yes', 'No']
+        assert result.loc[1, 'Action Needed?'] == 'Yes'
+        assert result.loc[3, 'AI Summary'] == 'No review text provided'
+    
+    @patch('src.utils.call_groq_llm', side_effect=_positive)
+    def test_key_pool_stops_when_out_of_time(self, mock_llm):
+        """Test the key pool workers stop and the rest is labelled locally."""
+        df = pd.DataFrame({'Review Text': [f'Nice {i}' for i in range(50)]})
+        pool = KeyPool(['key-one'], requests_per_minute=600, workers_per_key=1)
+        deadline = RunDeadline(0.3, reserve_seconds=0, min_samples=1)
+        
+        result = process_reviews_with_llm(df, key_pool=pool, deadline=deadline)
+        
+        assert len(result) == 50
+        assert (result[DEGRADED_COLUMN] == 'Yes').any()
+        assert mock_llm.call_count < 50
@@ -1,4 +1,3 @@
-import pytest
 import pandas as pd
 from unittest.mock import MagicMock, patch
 from src.etl import (
@@ -42,6 +41,59 @@ class TestExtractRawData:
         df = extract_raw_data(mock_spreadsheet)
         
         assert df is None
+    
+    def test_extract_typed_builds_numeric_columns(self):
+        """Test typed extraction builds int/float columns from unformatted values."""
+        mock_spreadsheet = MagicMock()
+        mock_worksheet = MagicMock()
+        
+        # Column-major response; trailing empty cells are omitted by the API
+        mock_worksheet.get.return_value = [
+            ['ID', 1, 2, 3],
+            ['Rating', 5, 4.5, 3],
+            ['Age', 25, '', 40],
+            ['Review Text', 'Great product', 'Not bad']
+        ]
+        mock_spreadsheet.worksheet.return_value = mock_worksheet
+        
+        df = extract_raw_data(mock_spreadsheet, typed=True)
+        
+        mock_worksheet.get_all_values.assert_not_called()
+        assert list(df.columns) == ['ID', 'Rating', 'Age', 'Review Text']
+        assert df['ID'].dtype == 'int64'
+        assert df['Rating'].dtype == 'float64'
+        # A blank cell keeps the column in string form, as get_all_values() would give it
+        assert df['Age'].tolist() == ['25', '', '40']
+        assert df['Review Text'].tolist() == ['Great product', 'Not bad', '']
+    
+    def test_extract_typed_cleans_like_formatted(self):
+        """Test typed and formatted extraction give the same cleaned data."""
+        formatted = MagicMock()
+        formatted.worksheet.return_value.get_all_values.return_value = [
+            ['ID', 'Rating', 'Recommended IND', 'Review Text'],
+            ['1', '5', 'TRUE', 'Great product'],
+            ['2', '2.5', 'FALSE', ''],
+            ['3', '4', 'TRUE', 'Fine']
+        ]
+        typed = MagicMock()
+        typed.worksheet.return_value.get.return_value = [
+            ['ID', 1, 2, 3],
+            ['Rating', 5, 2.5, 4],
+            ['Recommended IND', True, False, True],
+            ['Review Text', 'Great product', '', 'Fine']
+        ]
+        
+        expected = clean_data(extract_raw_data(formatted))
+        result = clean_data(extract_raw_data(typed, typed=True))
+        
+        pd.testing.assert_frame_equal(result, expected)
+    
+    def test_extract_typed_empty_worksheet(self):
+        """Test typed extraction of an empty worksheet fails cleanly."""
+        mock_spreadsheet = MagicMock()
+        mock_spreadsheet.worksheet.return_value.get.return_value = []
+        
+        assert extract_raw_data(mock_spreadsheet, typed=True) is None
 
 
 class TestCleanData:
@@ -95,6 +147,29 @@ class TestCleanData:
         cleaned_df = clean_data(df)
         
         assert cleaned_df is not None
+    
+    def test_clean_data_parallel_matches_serial(self):
+        """Test multi-process cleaning gives exactly the serial result."""
+        from src.synthetic import generate_reviews
+        
+        raw = generate_reviews(500, seed=1)
+        raw.loc[3, 'Review Text'] = 'None'
+        raw.loc[4, 'Title'] = '  nan '
+        
+        with patch('src.etl.MIN_SHARD_ROWS', 1):
+            parallel = clean_data(raw, workers=3)
+        
+        pd.testing.assert_frame_equal(parallel, clean_data(raw))
+    
+    def test_clean_data_small_input_stays_serial(self):
+        """Test small frames are not sent to a process pool."""
+        df = pd.DataFrame({'Review Text': [' Good ', ''], 'Rating': ['5', '1']})
+        
+        with patch('src.etl._normalize_text_parallel') as mock_parallel:
+            cleaned_df = clean_data(df, workers=4)
+        
+        mock_parallel.assert_not_called()
+        assert cleaned_df['Review Text'].iloc[0] == 'Good'
 
 
 class TestLoadToStaging:
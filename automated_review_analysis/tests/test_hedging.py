@@ -0,0 +1,191 @@
+import threading
+import time
+import pandas as pd
+import pytest
+from unittest.mock import patch
+from src import metrics
+from src.concurrency import ConcurrencyController
+from src.hedging import RequestHedger
+from src.etl import process_reviews_with_llm
+
+
+def _warmed_up(**kwargs):
+    """A hedger that has already seen enough fast calls to hedge."""
+    hedger = RequestHedger(min_samples=5, min_delay=0.05, **kwargs)
+    for _ in range(5):
+        hedger._record(0.01)
+    return hedger
+
+
+def _slow_then_fast(release):
+    """First call blocks until release is set; later calls return at once."""
+    calls = []
+    lock = threading.Lock()
+
+    def call(text):
+        with lock:
+            calls.append(text)
+            first = len(calls) == 1
+        if first:
+            release.wait(timeout=5)
+            return 'slow'
+        return 'fast'
+
+    return call, calls
+
+
+class TestRequestHedger:
+    """Tests for hedged LLM requests."""
+    
+    def setup_method(self):
+        metrics.reset()
+    
+    def test_no_hedging_without_latency_samples(self):
+        """Test calls are not hedged until there is a latency history."""
+        hedger = RequestHedger(min_samples=5)
+        
+        assert hedger.delay() is None
+        assert hedger.call(lambda text: text.upper(), 'ok') == 'OK'
+        assert metrics.get_counter('hedged_requests_total', outcome='issued') == 0
+    
+    def test_delay_follows_percentile(self):
+        """Test the hedge delay is the configured percentile of recent latencies."""
+        hedger = RequestHedger(percentile=90, min_samples=10, min_delay=0.0)
+        for latency in range(1, 11):
+            hedger._record(latency / 10)
+        
+        assert hedger.delay() == pytest.approx(1.0)
+    
+    def test_slow_request_is_hedged_and_hedge_wins(self):
+        """Test a request past the hedge delay is duplicated and the faster answer is used."""
+        release = threading.Event()
+        hedger = _warmed_up(max_extra_rate=1.0)
+        call, calls = _slow_then_fast(release)
+        
+        try:
+            assert hedger.call(call, 'review') == 'fast'
+        finally:
+            release.set()
+        
+        assert calls == ['review', 'review']
+        assert metrics.get_counter('hedged_requests_total', outcome='issued') == 1
+        assert metrics.get_counter('hedged_requests_total', outcome='hedge_won') == 1
+    
+    def test_extra_rate_cap(self):
+        """Test no hedge is issued once hedges would exceed max_extra_rate of calls."""
+        release = threading.Event()
+        hedger = _warmed_up(max_extra_rate=0.05)
+        call, calls = _slow_then_fast(release)
+        threading.Timer(0.2, release.set).start()
+        
+        assert hedger.call(call, 'review') == 'slow'
+        
+        assert calls == ['review']
+        assert metrics.get_counter('hedged_requests_total', outcome='capped') == 1
+    
+    def test_failed_attempt_waits_for_the_other(self):
+        """Test an error from one attempt does not win over a later success."""
+        hedger = _warmed_up(max_extra_rate=1.0)
+        release = threading.Event()
+        attempts = []
+        
+        def call(text):
+            attempts.append(text)
+            if len(attempts) == 1:
+                release.wait(timeout=5)
+                raise RuntimeError("upstream error")
+            release.set()
+            return 'ok'
+        
+        assert hedger.call(call, 'review') == 'ok'
+    
+    def test_raises_when_every_attempt_fails(self):
+        """Test the error is re-raised when no attempt succeeds."""
+        hedger = RequestHedger()
+        
+        def call(text):
+            raise RuntimeError("down")
+        
+        with pytest.raises(RuntimeError):
+            hedger.call(call, 'review')
+    
+    def test_process_reviews_with_hedger(self):
+        """Test the LLM stage labels reviews through the hedger."""
+        df = pd.DataFrame({'Review Text': ['Love it', 'Too tight']})
+        hedger = RequestHedger()
+        
+        with patch('src.utils.call_groq_llm', return_value={'sentiment': 'Positive', 'summary': 'Nice'}), \
+                patch('time.sleep'):
+            result = process_reviews_with_llm(df, hedger=hedger)
+        
+        assert result['AI Sentiment'].tolist() == ['Positive', 'Positive']
+        assert hedger.calls == 2
+    
+    def test_error_result_does_not_beat_a_later_answer(self):
+        """Test a fast error result (e.g. a 429) loses to a slower successful hedge."""
+        hedger = _warmed_up(max_extra_rate=1.0)
+        release = threading.Event()
+        attempts = []
+        
+        def call(text):
+            attempts.append(text)
+            if len(attempts) == 1:
+                release.wait(timeout=5)
+                return {'sentiment': 'Neutral', 'source': 'error', 'error': 'throttled'}
+            release.set()
+            time.sleep(0.05)
+            return {'sentiment': 'Positive'}
+        
+        assert hedger.call(call, 'review') == {'sentiment': 'Positive'}
+    
+    def test_error_result_returned_when_every_attempt_fails(self):
+        """Test an error result is passed through when no attempt succeeds."""
+        hedger = RequestHedger()
+        
+        assert hedger.call(lambda text: {'source': 'error', 'error': 'error'}, 'review')['error'] == 'error'
+    
+    def test_hedge_is_charged_to_the_rate_budget(self):
+        """Test before_hedge runs once for each hedge that is sent."""
+        release = threading.Event()
+        hedger = _warmed_up(max_extra_rate=1.0)
+        call, calls = _slow_then_fast(release)
+        charged = []
+        
+        try:
+            result = hedger.wrap(call, before_hedge=lambda text: charged.append(text))('review')
+        finally:
+            release.set()
+        
+        assert result == 'fast'
+        assert charged == ['review']
+    
+    def test_only_successful_latencies_feed_the_percentile(self):
+        """Test fast errors and error results do not pull the hedge delay down."""
+        hedger = RequestHedger(min_samples=2)
+        
+        def refused(text):
+            raise RuntimeError("refused")
+        
+        for _ in range(3):
+            hedger.call(lambda text: {'source': 'error', 'error': 'throttled'}, 'review')
+        with pytest.raises(RuntimeError):
+            hedger.call(refused, 'review')
+        
+        assert hedger.delay() is None
+    
+    def test_loser_frees_its_concurrency_slot(self):
+        """Test the losing attempt's concurrency slot is freed when the winner returns, and it is counted."""
+        release = threading.Event()
+        hedger = _warmed_up(max_extra_rate=1.0)
+        controller = ConcurrencyController(initial_limit=4)
+        call, calls = _slow_then_fast(release)
+        
+        try:
+            result = hedger.wrap(call, concurrency=controller)('review')
+            inflight = controller._inflight
+        finally:
+            release.set()
+        
+        assert result == 'fast'
+        assert inflight == 0
+        assert metrics.get_counter('hedged_requests_total', outcome='abandoned') == 1
@@ -0,0 +1,144 @@
+import os
+import time
+import pytest
+import pandas as pd
+from unittest.mock import patch
+from src.keypool import KeyPool
+from src.etl import process_reviews_with_llm
+
+
+class FakeRateLimitError(Exception):
+    status_code = 429
+
+
+def _ok(text, api_key=None, raise_errors=False, model=None):
+    return {'sentiment': 'Positive', 'summary': f'{api_key}: {text}'}
+
+
+class TestKeyPoolSetup:
+    """Tests for building a KeyPool."""
+    
+    @patch.dict(os.environ, {'GROQ_API_KEYS': 'gsk_aaaa1111, gsk_bbbb2222,', 'GROQ_API_KEY': 'gsk_single'})
+    def test_from_env_reads_key_list(self):
+        """Test GROQ_API_KEYS is split into separate keys."""
+        pool = KeyPool.from_env()
+        
+        assert [key.api_key for key in pool.keys] == ['gsk_aaaa1111', 'gsk_bbbb2222']
+        assert pool.keys[0].label == '...1111'
+    
+    @patch.dict(os.environ, {'GROQ_API_KEYS': '', 'GROQ_API_KEY': 'gsk_single'})
+    def test_from_env_falls_back_to_single_key(self):
+        """Test a single GROQ_API_KEY still works."""
+        assert len(KeyPool.from_env().keys) == 1
+    
+    def test_requires_a_key(self):
+        """Test an empty pool is rejected."""
+        with pytest.raises(ValueError):
+            KeyPool([])
+
+
+class TestKeyPoolProcessing:
+    """Tests for sharded processing across keys."""
+    
+    @patch('src.utils.call_groq_llm', side_effect=_ok)
+    def test_every_review_processed_across_keys(self, mock_llm):
+        """Test all rows get results and every key does some work."""
+        pool = KeyPool(['key-one', 'key-two'], requests_per_minute=6000, workers_per_key=1)
+        df = pd.DataFrame({'Review Text': [f'Review {i}' for i in range(20)] + ['']})
+        
+        result = process_reviews_with_llm(df, key_pool=pool)
+        
+        assert (result['AI Sentiment'] == 'Positive').sum() == 20
+        assert result.loc[20, 'AI Summary'] == 'No review text provided'
+        assert all(row['successes'] > 0 for row in pool.stats())
+        assert sum(row['requests'] for row in pool.stats()) == 20
+    
+    @patch('src.utils.call_groq_llm')
+    def test_throttled_key_work_is_rebalanced(self, mock_llm):
+        """Test reviews from a throttled key are completed by the other key."""
+        def llm(text, api_key=None, raise_errors=False, model=None):
+            if api_key == 'bad-key':
+                raise FakeRateLimitError("429 Too Many Requests")
+            return _ok(text, api_key)
+        mock_llm.side_effect = llm
+        
+        pool = KeyPool(['bad-key', 'good-key'], requests_per_minute=6000,
+                       workers_per_key=1, cooldown_seconds=60)
+        df = pd.DataFrame({'Review Text': [f'Review {i}' for i in range(10)]})
+        
+        result = process_reviews_with_llm(df, key_pool=pool)
+        
+        assert (result['AI Sentiment'] == 'Positive').all()
+        assert result['AI Summary'].str.startswith('good-key').all()
+        assert pool.keys[0].throttled >= 1
+        assert pool.keys[1].successes == 10
+    
+    @patch('src.utils.call_groq_llm', side_effect=RuntimeError("boom"))
+    def test_error_after_max_attempts(self, mock_llm):
+        """Test a review failing on every attempt gets the error result."""
+        pool = KeyPool(['key-one'], requests_per_minute=6000, workers_per_key=1, max_attempts=2)
+        df = pd.DataFrame({'Review Text': ['Review']})
+        
+        result = process_reviews_with_llm(df, key_pool=pool)
+        
+        assert result.loc[0, 'AI Summary'] == 'Error processing review'
+        assert mock_llm.call_count == 2
+    
+    @patch('src.utils.call_groq_llm', side_effect=_ok)
+    def test_failing_cache_still_yields_every_result(self, mock_llm):
+        """Test a review whose preparation raises gets an error result instead of hanging the pool."""
+        class BrokenCache:
+            def get(self, text, model):
+                if text == 'Review 1':
+                    raise OSError("cache unavailable")
+                return None
+            
+            def put(self, text, model, result):
+                pass
+        
+        pool = KeyPool(['key-one'], requests_per_minute=6000, workers_per_key=1)
+        df = pd.DataFrame({'Review Text': ['Review 0', 'Review 1', 'Review 2']})
+        
+        results = {idx: status for idx, _, status in pool.iter_results(df, cache=BrokenCache())}
+        
+        assert results == {0: 'processed', 1: 'error', 2: 'processed'}
+    
+    @patch('src.utils.call_groq_llm', side_effect=_ok)
+    def test_close_does_not_wait_out_the_budget(self, mock_llm):
+        """Test closing the results stops workers that are waiting for their key's next slot."""
+        pool = KeyPool(['key-one'], requests_per_minute=1, workers_per_key=2)
+        df = pd.DataFrame({'Review Text': ['Review 0', 'Review 1', 'Review 2']})
+        
+        results = pool.iter_results(df)
+        next(results)
+        start = time.perf_counter()
+        results.close()
+        
+        assert time.perf_counter() - start < 5
+    
+    def test_token_budget_spaces_long_requests(self):
+        """Test a request's token estimate holds the key for its share of the TPM budget."""
+        pool = KeyPool(['key-one'], requests_per_minute=6000, tokens_per_minute=60000)
+        key = pool.keys[0]
+        
+        key.reserve(tokens=1000)
+        wait = key.reserve(tokens=10)
+        
+        assert 0.9 < wait <= 1.0
+    
+    @patch('src.utils.call_groq_llm', side_effect=_ok)
+    def test_throughput_scales_with_keys(self, mock_llm):
+        """Test more keys (each with its own budget) finish proportionally faster."""
+        df = pd.DataFrame({'Review Text': [f'Review {i}' for i in range(24)]})
+        
+        def timed(n_keys):
+            pool = KeyPool([f'key-{i}' for i in range(n_keys)], requests_per_minute=1200,
+                           workers_per_key=1)
+            start = time.perf_counter()
+            list(pool.iter_results(df))
+            return time.perf_counter() - start
+        
+        one_key = timed(1)
+        three_keys = timed(3)
+        
+        assert three_keys < one_key * 0.6
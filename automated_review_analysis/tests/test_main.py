@@ -0,0 +1,293 @@
+import json
+import os
+import subprocess
+import sys
+import pytest
+import pandas as pd
+from unittest.mock import MagicMock, patch
+from src.main import main, build_parser, llm_stage_version, run_stage, run_full_pipeline
+from src.checkpoints import fingerprint, save_stage, load_stage
+
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HEAVY_MODULES = ['pandas', 'matplotlib', 'seaborn', 'groq', 'gspread', 'oauth2client', 'dotenv']
+
+# Generous ceiling so the guard catches regressions (an eager pandas/matplotlib
+# import costs well over this) without flaking on slow CI machines.
+IMPORT_TIME_BUDGET_SECONDS = 0.25
+
+
+class TestImportTime:
+    """Import-time benchmark for the CLI entry point."""
+
+    def _run(self, code):
+        result = subprocess.run(
+            [sys.executable, '-c', code],
+            cwd=PROJECT_ROOT,
+            capture_output=True,
+            text=True,
+            timeout=60
+        )
+        assert result.returncode == 0, result.stderr
+        return result.stdout.strip()
+
+    def test_import_main_does_not_load_heavy_dependencies(self):
+        """Test importing src.main leaves stage dependencies unloaded."""
+        code = (
+            "import sys, src.main\n"
+            f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+        )
+
+        loaded = self._run(code)
+
+        assert loaded == ''
+
+    def test_import_main_within_budget(self):
+        """Test importing src.main stays within the start-up budget."""
+        code = (
+            "import time\n"
+            "start = time.perf_counter()\n"
+            "import src.main\n"
+            "print(time.perf_counter() - start)"
+        )
+
+        elapsed = float(self._run(code))
+
+        assert elapsed < IMPORT_TIME_BUDGET_SECONDS
+
+
+class TestCommandLine:
+    """Tests for the command-line entry point."""
+
+    def test_parser_accepts_stage_subcommands(self):
+        """Test every stage is exposed as a subcommand."""
+        parser = build_parser()
+
+        for command in ['extract', 'clean', 'llm', 'analyze', 'full']:
+            assert parser.parse_args([command]).command == command
+
+    def test_llm_flags_only_on_subcommands_that_use_them(self):
+        """Test --overlap and --deadline are rejected where they would be ignored."""
+        parser = build_parser()
+
+        assert parser.parse_args(['llm', '--overlap', '--deadline', '60']).deadline == 60
+        assert parser.parse_args(['queue', '--key-pool']).key_pool
+        for argv in (['preview', '--overlap'], ['queue', '--deadline', '60'], ['sheets', '--prioritize']):
+            with pytest.raises(SystemExit):
+                parser.parse_args(argv)
+
+    @patch('src.main.run_full_pipeline')
+    def test_main_defaults_to_full_pipeline(self, mock_full):
+        """Test running without a subcommand runs the full pipeline."""
+        mock_full.return_value = True
+
+        assert main([]) == 0
+        mock_full.assert_called_once()
+
+    @patch('src.main.run_stage')
+    def test_main_returns_nonzero_on_failure(self, mock_stage):
+        """Test a failing stage maps to a non-zero exit code."""
+        mock_stage.return_value = False
+
+        assert main(['llm']) == 1
+        mock_stage.assert_called_once_with('llm', output=None, overlap=False, llm_options={},
+                                           results_db='results.db', clean_workers=None)
+
+    @patch('src.main.run_analysis_pipeline')
+    @patch('src.main.read_worksheet')
+    @patch('src.main.connect')
+    def test_analyze_stage_reads_processed_worksheet(self, mock_connect, mock_read, mock_analysis):
+        """Test the analyze stage runs from the processed worksheet only."""
+        mock_connect.return_value = MagicMock()
+        mock_read.return_value = pd.DataFrame({'AI Sentiment': ['Positive']})
+        mock_analysis.return_value = True
+
+        assert run_stage('analyze') is True
+        mock_read.assert_called_once_with(mock_connect.return_value, 'processed')
+
+    def test_run_stage_rejects_unknown_stage(self):
+        """Test an unknown stage name raises ValueError."""
+        with pytest.raises(ValueError):
+            run_stage('deploy')
+
+
+class TestPartialRuns:
+    """Tests for --from-stage / --to-stage runs backed by saved stage outputs."""
+
+    @patch('src.main.run_analysis_pipeline')
+    @patch('src.main.connect')
+    def test_from_analyze_uses_saved_llm_output(self, mock_connect, mock_analysis, tmp_path):
+        """Test starting at analyze needs no Google Sheets connection."""
+        processed = pd.DataFrame({'Class Name': ['Dresses'], 'AI Sentiment': ['Positive']})
+        save_stage('llm', 'key1', processed, cache_dir=str(tmp_path))
+        mock_analysis.return_value = True
+
+        result = run_full_pipeline(from_stage='analyze', cache_dir=str(tmp_path),
+                                   metrics_dir=str(tmp_path / 'metrics'))
+
+        assert result is True
+        mock_connect.assert_not_called()
+        pd.testing.assert_frame_equal(mock_analysis.call_args[0][0], processed)
+
+    @patch('src.main.run_analysis_pipeline')
+    def test_profile_mode_writes_stage_profiles(self, mock_analysis, tmp_path):
+        """Test --profile writes a per-stage profile and a summary."""
+        save_stage('llm', 'key1', pd.DataFrame({'AI Sentiment': ['Positive']}), cache_dir=str(tmp_path))
+        mock_analysis.return_value = True
+
+        run_full_pipeline(from_stage='analyze', cache_dir=str(tmp_path),
+                          metrics_dir=str(tmp_path / 'metrics'),
+                          profile=True, profile_dir=str(tmp_path / 'profiles'))
+
+        assert os.path.exists(tmp_path / 'profiles' / 'analyze.prof')
+        assert os.path.exists(tmp_path / 'profiles' / 'summary.txt')
+
+    def test_from_stage_without_saved_output_fails(self, tmp_path):
+        """Test a partial run fails cleanly when the previous stage was never saved."""
+        assert run_full_pipeline(from_stage='llm', cache_dir=str(tmp_path)) is False
+
+    @patch('src.main.run_llm_pipeline')
+    @patch('src.main.connect')
+    def test_llm_reused_when_input_unchanged(self, mock_connect, mock_llm, tmp_path):
+        """Test the llm stage is skipped when its cleaned input is unchanged."""
+        cleaned = pd.DataFrame({'Review Text': ['Nice']})
+        processed = cleaned.assign(**{'AI Sentiment': ['Positive']})
+        save_stage('clean', 'cleankey', cleaned, cache_dir=str(tmp_path))
+        save_stage('llm', fingerprint('llm', 'cleankey', llm_stage_version()), processed, cache_dir=str(tmp_path))
+
+        result = run_full_pipeline(from_stage='llm', to_stage='llm', cache_dir=str(tmp_path),
+                                   metrics_dir=str(tmp_path / 'metrics'))
+
+        assert result is True
+        mock_llm.assert_not_called()
+        mock_connect.assert_not_called()
+
+        with open(tmp_path / 'metrics' / 'run_summary.json') as f:
+            summary = json.load(f)
+        assert summary['stages']['llm']['rows'] == 1
+        assert summary['counters']['stage_cache_hits_total'] == {'stage=llm': 1}
+
+    @patch('src.main.run_llm_pipeline')
+    @patch('src.main.connect')
+    def test_llm_rerun_after_prompt_or_model_change(self, mock_connect, mock_llm, tmp_path):
+        """Test a new prompt version or routed models miss the saved llm output."""
+        from src.routing import ModelRouter
+
+        cleaned = pd.DataFrame({'Review Text': ['Nice']})
+        processed = cleaned.assign(**{'AI Sentiment': ['Positive']})
+        save_stage('clean', 'cleankey', cleaned, cache_dir=str(tmp_path))
+        save_stage('llm', fingerprint('llm', 'cleankey', llm_stage_version()), processed, cache_dir=str(tmp_path))
+        mock_connect.return_value = MagicMock()
+        mock_llm.return_value = processed
+
+        with patch('src.utils.PROMPT_VERSION', 'changed'):
+            run_full_pipeline(from_stage='llm', to_stage='llm', cache_dir=str(tmp_path),
+                              metrics_dir=str(tmp_path / 'metrics'))
+        run_full_pipeline(from_stage='llm', to_stage='llm', cache_dir=str(tmp_path),
+                          metrics_dir=str(tmp_path / 'metrics'),
+                          llm_options={'router': ModelRouter(small_model='other-small')})
+
+        assert mock_llm.call_count == 2
+
+    @patch('src.main.run_llm_pipeline')
+    @patch('src.main.connect')
+    def test_no_cache_forces_rerun(self, mock_connect, mock_llm, tmp_path):
+        """Test use_cache=False re-runs a stage even with a matching saved output."""
+        cleaned = pd.DataFrame({'Review Text': ['Nice']})
+        processed = cleaned.assign(**{'AI Sentiment': ['Positive']})
+        save_stage('clean', 'cleankey', cleaned, cache_dir=str(tmp_path))
+        save_stage('llm', fingerprint('llm', 'cleankey', llm_stage_version()), processed, cache_dir=str(tmp_path))
+        mock_connect.return_value = MagicMock()
+        mock_llm.return_value = processed
+
+        result = run_full_pipeline(from_stage='llm', to_stage='llm', use_cache=False,
+                                   cache_dir=str(tmp_path), metrics_dir=str(tmp_path / 'metrics'))
+
+        assert result is True
+        mock_llm.assert_called_once()
+
+    @patch('src.main.run_llm_pipeline')
+    @patch('src.main.connect')
+    def test_degraded_llm_output_not_checkpointed(self, mock_connect, mock_llm, tmp_path):
+        """Test an llm output with deadline-degraded rows is not saved for reuse."""
+        cleaned = pd.DataFrame({'Review Text': ['Nice']})
+        save_stage('clean', 'cleankey', cleaned, cache_dir=str(tmp_path))
+        mock_connect.return_value = MagicMock()
+        mock_llm.return_value = cleaned.assign(**{'AI Sentiment': ['Positive'], 'AI Degraded': ['Yes']})
+
+        result = run_full_pipeline(from_stage='llm', to_stage='llm', cache_dir=str(tmp_path),
+                                   metrics_dir=str(tmp_path / 'metrics'))
+
+        assert result is True
+        assert load_stage('llm', fingerprint('llm', 'cleankey', llm_stage_version()), cache_dir=str(tmp_path)) is None
+
+    @patch('src.main.run_llm_pipeline')
+    @patch('src.main.connect')
+    def test_staging_load_runs_alongside_llm(self, mock_connect, mock_llm, tmp_path):
+        """Test the LLM stage starts while the staging write is still running."""
+        import threading
+
+        raw = pd.DataFrame({'Review Text': ['Nice']})
+        save_stage('extract', 'rawkey', raw, cache_dir=str(tmp_path))
+        mock_connect.return_value = MagicMock()
+        llm_started = threading.Event()
+
+        def slow_staging(spreadsheet, df):
+            # Only finishes once the LLM stage has begun
+            return llm_started.wait(timeout=5)
+
+        def llm(spreadsheet, cleaned, **kwargs):
+            llm_started.set()
+            return cleaned.assign(**{'AI Sentiment': ['Positive']})
+
+        mock_llm.side_effect = llm
+        with patch('src.etl.load_to_staging', side_effect=slow_staging):
+            result = run_full_pipeline(from_stage='clean', to_stage='llm', cache_dir=str(tmp_path),
+                                       metrics_dir=str(tmp_path / 'metrics'))
+
+        assert result is True
+        assert load_stage('clean', fingerprint('clean', 'rawkey'), cache_dir=str(tmp_path)) is not None
+
+    @patch('src.main.run_llm_pipeline')
+    @patch('src.main.connect')
+    def test_failed_staging_load_fails_run(self, mock_connect, mock_llm, tmp_path, capsys):
+        """Test a background staging failure is reported and the clean output is not reused."""
+        raw = pd.DataFrame({'Review Text': ['Nice']})
+        save_stage('extract', 'rawkey', raw, cache_dir=str(tmp_path))
+        mock_connect.return_value = MagicMock()
+        mock_llm.side_effect = lambda spreadsheet, cleaned, **kwargs: cleaned
+
+        with patch('src.etl.load_to_staging', return_value=False):
+            result = run_full_pipeline(from_stage='clean', to_stage='llm', cache_dir=str(tmp_path),
+                                       metrics_dir=str(tmp_path / 'metrics'))
+
+        assert result is False
+        assert 'load_to_staging encountered errors' in capsys.readouterr().out
+        assert load_stage('clean', fingerprint('clean', 'rawkey'), cache_dir=str(tmp_path)) is None
+
+    def test_parser_accepts_stage_range(self):
+        """Test the full subcommand accepts --from-stage / --to-stage."""
+        args = build_parser().parse_args(['full', '--from-stage', 'llm', '--to-stage', 'analyze'])
+
+        assert args.from_stage == 'llm'
+        assert args.to_stage == 'analyze'
+
+
+class TestOverlappedLLMPipeline:
+    """Tests for run_llm_pipeline(overlap=True)."""
+
+    @patch('src.etl.load_to_processed')
+    @patch('src.streaming.stream_reviews_to_processed')
+    def test_overlap_streams_instead_of_bulk_load(self, mock_stream, mock_load):
+        """Test overlap mode writes through the streaming writer only."""
+        from src.main import run_llm_pipeline
+
+        cleaned = pd.DataFrame({'Review Text': ['Nice']})
+        mock_stream.return_value = cleaned.assign(**{'AI Sentiment': ['Positive']})
+
+        result = run_llm_pipeline(MagicMock(), cleaned, overlap=True)
+
+        assert result is not None
+        mock_stream.assert_called_once()
+        mock_load.assert_not_called()
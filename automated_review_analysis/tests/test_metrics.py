@@ -0,0 +1,183 @@
+import json
+import pytest
+from unittest.mock import MagicMock, patch
+from src import metrics
+from src.utils import call_groq_llm
+
+
+@pytest.fixture(autouse=True)
+def clean_metrics():
+    metrics.reset()
+    yield
+    metrics.reset()
+
+
+class TestCountersAndHistograms:
+    """Tests for counters and latency histograms."""
+    
+    def test_counters_are_labelled(self):
+        """Test counters accumulate separately per label set."""
+        metrics.increment('sheets_calls_total', method='update')
+        metrics.increment('sheets_calls_total', method='update')
+        metrics.increment('sheets_calls_total', method='clear')
+        
+        assert metrics.get_counter('sheets_calls_total', method='update') == 2
+        assert metrics.get_counter('sheets_calls_total', method='clear') == 1
+    
+    def test_histogram_buckets_and_quantiles(self):
+        """Test observations land in buckets and quantiles are estimated."""
+        for latency in [0.05, 0.2, 0.3, 0.4, 12.0]:
+            metrics.observe('groq_latency_seconds', latency, model='m')
+        
+        hist = metrics.get_histogram('groq_latency_seconds', model='m')
+        stats = metrics.summary()['histograms']['groq_latency_seconds']['model=m']
+        
+        assert hist['count'] == 5
+        assert sum(hist['buckets']) == 5
+        assert stats['p50'] == 0.5
+        assert stats['p99'] == 12.0
+    
+    def test_stage_timer_reports_rows_per_second(self):
+        """Test stage timings include throughput when rows are given."""
+        with metrics.stage_timer('clean') as timing:
+            timing['rows'] = 100
+        
+        stage = metrics.summary()['stages']['clean']
+        
+        assert stage['rows'] == 100
+        assert stage['rows_per_second'] > 0
+    
+    def test_merge_adds_another_process_snapshot(self):
+        """Test a snapshot from another process adds to counters and histograms."""
+        metrics.increment('reviews_total', 2, status='processed')
+        metrics.observe('groq_latency_seconds', 0.3, model='m')
+        snapshot = metrics.snapshot()
+        
+        metrics.merge(json.loads(json.dumps(snapshot)))
+        
+        assert metrics.get_counter('reviews_total', status='processed') == 4
+        assert metrics.get_histogram('groq_latency_seconds', model='m')['count'] == 2
+    
+    def test_gauge_keeps_value_and_history(self):
+        """Test a gauge reports its latest value and each change."""
+        for value in [4, 4, 5, 2]:
+            metrics.set_gauge('groq_concurrency_limit', value)
+        
+        assert metrics.get_gauge('groq_concurrency_limit') == 2
+        assert [value for _, value in metrics.get_gauge_history('groq_concurrency_limit')] == [4, 5, 2]
+        assert 'review_pipeline_groq_concurrency_limit 2' in metrics.to_prometheus()
+
+
+class TestExport:
+    """Tests for JSON and Prometheus export."""
+    
+    def test_prometheus_format(self):
+        """Test counters and histograms render as Prometheus text."""
+        metrics.increment('groq_errors_total', type='RateLimitError')
+        metrics.observe('groq_latency_seconds', 0.3, model='m')
+        
+        text = metrics.to_prometheus()
+        
+        assert 'review_pipeline_groq_errors_total{type="RateLimitError"} 1' in text
+        assert 'review_pipeline_groq_latency_seconds_bucket{model="m",le="0.5"} 1' in text
+        assert 'review_pipeline_groq_latency_seconds_bucket{model="m",le="+Inf"} 1' in text
+        assert 'review_pipeline_groq_latency_seconds_count{model="m"} 1' in text
+        assert '# TYPE review_pipeline_groq_errors_total counter' in text
+        assert '# TYPE review_pipeline_groq_latency_seconds histogram' in text
+        assert text.count('# TYPE review_pipeline_groq_latency_seconds ') == 1
+    
+    def test_prometheus_label_values_are_escaped(self):
+        """Test backslashes, quotes and newlines in label values cannot break the format."""
+        metrics.increment('groq_errors_total', type='Bad"Error\\x\ny')
+        
+        text = metrics.to_prometheus()
+        
+        assert 'review_pipeline_groq_errors_total{type="Bad\\"Error\\\\x\\ny"} 1' in text
+        assert all(line.startswith(('#', 'review_pipeline_')) for line in text.splitlines())
+    
+    def test_write_metrics_creates_both_files(self, tmp_path):
+        """Test the run summary and textfile are written."""
+        metrics.increment('reviews_total', status='processed')
+        
+        summary_path, prom_path = metrics.write_metrics(str(tmp_path))
+        
+        with open(summary_path) as f:
+            summary = json.load(f)
+        assert summary['counters']['reviews_total'] == {'status=processed': 1}
+        assert 'review_pipeline_reviews_total' in open(prom_path).read()
+
+
+class TestGroqInstrumentation:
+    """Tests for call_groq_llm metrics."""
+    
+    @patch.dict('os.environ', {'GROQ_API_KEY': 'test-key'})
+    @patch('groq.Groq')
+    def test_records_latency_and_tokens(self, mock_groq):
+        """Test a completion records latency and token counts."""
+        mock_response = MagicMock()
+        mock_response.choices = [MagicMock()]
+        mock_response.choices[0].message.content = "SENTIMENT: Positive\nSUMMARY: Nice."
+        mock_response.usage.prompt_tokens = 120
+        mock_response.usage.completion_tokens = 15
+        mock_groq.return_value.chat.completions.create.return_value = mock_response
+        
+        call_groq_llm("Lovely dress")
+        
+        assert metrics.get_histogram('groq_latency_seconds', model='openai/gpt-oss-20b')['count'] == 1
+        assert metrics.get_counter('groq_prompt_tokens_total', model='openai/gpt-oss-20b') == 120
+        assert metrics.get_counter('groq_completion_tokens_total', model='openai/gpt-oss-20b') == 15
+    
+    @patch.dict('os.environ', {'GROQ_API_KEY': 'test-key'})
+    @patch('groq.Groq')
+    def test_streamed_completion_records_prompt_tokens(self, mock_groq):
+        """Test streams ask for usage, and an early-stopped stream counts the estimated prompt tokens."""
+        chunk = MagicMock()
+        chunk.usage = None
+        chunk.choices[0].delta.content = "SENTIMENT: Positive\nSUMMARY: Nice.\n"
+        create = mock_groq.return_value.chat.completions.create
+        create.return_value = iter([chunk])
+        
+        call_groq_llm("Lovely dress", stream=True)
+        
+        assert create.call_args.kwargs['stream_options'] == {'include_usage': True}
+        estimated = metrics.get_counter('groq_estimated_prompt_tokens_total', model='openai/gpt-oss-20b')
+        assert estimated > 0
+        assert metrics.get_counter('groq_prompt_tokens_total', model='openai/gpt-oss-20b') == estimated
+        
+        usage_chunk = MagicMock(choices=[])
+        usage_chunk.usage.prompt_tokens = 120
+        usage_chunk.usage.completion_tokens = 15
+        partial_chunk = MagicMock()
+        partial_chunk.usage = None
+        partial_chunk.choices[0].delta.content = "SENTIMENT: Positive"
+        create.return_value = iter([partial_chunk, usage_chunk])
+        
+        call_groq_llm("Lovely dress", stream=True)
+        
+        assert metrics.get_counter('groq_prompt_tokens_total', model='openai/gpt-oss-20b') == estimated + 120
+        assert metrics.get_counter('groq_completion_tokens_total', model='openai/gpt-oss-20b') == 15
+    
+    @patch.dict('os.environ', {'GROQ_API_KEY': 'test-key'})
+    @patch('groq.Groq')
+    def test_counts_errors_by_type(self, mock_groq):
+        """Test API errors are counted by exception type."""
+        mock_groq.return_value.chat.completions.create.side_effect = TimeoutError("slow")
+        
+        call_groq_llm("Lovely dress")
+        
+        assert metrics.get_counter('groq_errors_total', type='TimeoutError') == 1
+
+
+class TestProgressReporter:
+    """Tests for ProgressReporter."""
+    
+    def test_reports_are_throttled(self, capsys):
+        """Test progress prints at most once per interval, plus the final row."""
+        progress = metrics.ProgressReporter(total=1000, interval=3600)
+        
+        for _ in range(1000):
+            progress.update()
+        
+        lines = [line for line in capsys.readouterr().out.splitlines() if 'Processed' in line]
+        assert len(lines) == 1
+        assert '1000/1000' in lines[0]
@@ -0,0 +1,149 @@
+import threading
+import time
+import pandas as pd
+from unittest.mock import MagicMock, patch
+from src import metrics
+from src.llm_cache import ResultCache
+from src.multisheet import FairRateLimiter, run_sheet, run_sheets
+from src.etl import process_reviews_with_llm
+
+
+def _sheet(rows):
+    spreadsheet = MagicMock()
+    raw = MagicMock()
+    raw.get_all_values.return_value = [['Review Text', 'Class Name']] + rows
+    raw.get.return_value = [list(column) for column in zip(['Review Text', 'Class Name'], *rows)]
+    other = MagicMock()
+    other.get_all_values.return_value = []
+    spreadsheet.worksheet.side_effect = lambda name: raw if name == 'raw_data' else other
+    return spreadsheet
+
+
+class TestResultCache:
+    """Tests for the shared LLM result cache."""
+    
+    def setup_method(self):
+        metrics.reset()
+    
+    def test_repeated_review_served_from_cache(self):
+        """Test a review seen before (ignoring case/whitespace) is not sent again."""
+        cache = ResultCache()
+        df = pd.DataFrame({'Review Text': ['Love it', '  love   IT ', 'Too tight']})
+        
+        with patch('src.utils.call_groq_llm', return_value={'sentiment': 'Positive', 'summary': 'Nice'}) as mock_llm, \
+                patch('time.sleep'):
+            process_reviews_with_llm(df, cache=cache)
+        
+        assert mock_llm.call_count == 2
+        assert metrics.get_counter('llm_cache_total', result='hit') == 1
+    
+    def test_cache_keys_include_model(self):
+        """Test the same text under another model is a miss."""
+        cache = ResultCache()
+        cache.put('Love it', 'model-a', {'sentiment': 'Positive', 'summary': 'Nice'})
+        
+        assert cache.get('Love it', 'model-a')['sentiment'] == 'Positive'
+        assert cache.get('Love it', 'model-b') is None
+    
+    def test_cache_is_bounded(self):
+        """Test the oldest entries are evicted past max_entries."""
+        cache = ResultCache(max_entries=2)
+        for text in ('a', 'b', 'c'):
+            cache.put(text, None, {'sentiment': 'Neutral', 'summary': text})
+        
+        assert len(cache) == 2
+        assert cache.get('a') is None
+
+
+class TestFairRateLimiter:
+    """Tests for the shared round-robin rate limiter."""
+    
+    def test_tenants_take_turns(self):
+        """Test a sheet arriving later is served before a busy sheet's backlog."""
+        limiter = FairRateLimiter(requests_per_minute=600)
+        order = []
+        
+        def requests(tenant, n):
+            for _ in range(n):
+                limiter.acquire(tenant)
+                order.append(tenant)
+        
+        busy = threading.Thread(target=requests, args=('big', 6))
+        busy.start()
+        time.sleep(0.15)
+        small = threading.Thread(target=requests, args=('small', 2))
+        small.start()
+        busy.join()
+        small.join()
+        
+        assert order.index('small') <= 3
+        assert order[-1] == 'big'
+    
+    def test_budget_is_shared(self):
+        """Test requests from different sheets are spaced by the one shared interval."""
+        limiter = FairRateLimiter(requests_per_minute=600)
+        start = time.monotonic()
+        for tenant in ('a', 'b', 'a', 'b'):
+            limiter.acquire(tenant)
+        
+        assert time.monotonic() - start >= 0.29
+
+
+class TestRunSheets:
+    """Tests for the multi-spreadsheet runner."""
+    
+    @patch('src.main.run_analysis_pipeline', return_value=True)
+    @patch('src.utils.call_groq_llm', return_value={'sentiment': 'Negative', 'summary': 'Bad'})
+    @patch('src.utils.connect_to_google_sheets')
+    def test_sheets_processed_with_shared_cache(self, mock_connect, mock_llm, mock_analysis, tmp_path):
+        """Test each sheet is processed and a review shared by brands is labelled once."""
+        sheets = {
+            'sheet-aaaaaaaa': _sheet([['Poor fit', 'Dresses'], ['Ripped seam', 'Pants']]),
+            'sheet-bbbbbbbb': _sheet([['Poor fit', 'Knits']]),
+        }
+        mock_connect.side_effect = lambda sheet_id: sheets[sheet_id]
+        
+        statuses = run_sheets(list(sheets), requests_per_minute=6000, output_dir=str(tmp_path))
+        
+        assert [s['status'] for s in statuses] == ['ok', 'ok']
+        assert [s['rows'] for s in statuses] == [2, 1]
+        assert statuses[0]['action_needed'] == 2
+        assert mock_llm.call_count == 2
+        assert mock_analysis.call_args_list[1].kwargs['output_dir'] == str(tmp_path / 'bbbbbbbb')
+    
+    @patch('src.main.run_analysis_pipeline', return_value=True)
+    @patch('src.utils.connect_to_google_sheets', return_value=None)
+    def test_failed_sheet_reported(self, mock_connect, mock_analysis, tmp_path):
+        """Test a sheet that cannot be opened is reported without stopping the others."""
+        statuses = run_sheets(['sheet-cccccccc'], output_dir=str(tmp_path))
+        
+        assert statuses[0]['status'] == 'failed: connect'
+        mock_analysis.assert_not_called()
+    
+    @patch('src.utils.call_groq_llm', return_value={'sentiment': 'Negative', 'summary': 'Bad'})
+    @patch('src.utils.connect_to_google_sheets')
+    def test_sheets_calls_wait_for_sheets_limiter(self, mock_connect, mock_llm):
+        """Test opening, extracting and both loads each take a slot from the Sheets limiter."""
+        metrics.reset()
+        mock_connect.return_value = _sheet([['Poor fit', 'Dresses']])
+        sheets_limiter = MagicMock()
+        
+        status, _ = run_sheet('sheet-dddddddd', sheets_limiter=sheets_limiter)
+        
+        assert status['status'] == 'ok'
+        sheet_calls = sum(metrics.get_counter('sheets_calls_total', method=method)
+                          for method in ('get', 'get_all_values', 'clear', 'update'))
+        assert sheet_calls == 5
+        assert sheets_limiter.acquire.call_count == sheet_calls + 1
+    
+    @patch('src.main.run_analysis_pipeline', return_value=True)
+    @patch('src.multisheet.run_sheet', return_value=({'sheet': 'x', 'status': 'ok', 'rows': 0,
+                                                      'action_needed': 0, 'seconds': 0.0}, None))
+    def test_sheets_share_one_sheets_limiter(self, mock_run_sheet, mock_analysis, tmp_path):
+        """Test every sheet gets its own handle on one shared Sheets budget."""
+        run_sheets(['sheet-aaaaaaaa', 'sheet-bbbbbbbb'], sheets_requests_per_minute=120, output_dir=str(tmp_path))
+        
+        handles = [call.kwargs['sheets_limiter'] for call in mock_run_sheet.call_args_list]
+        assert handles[0].limiter is handles[1].limiter
+        assert handles[0].limiter.requests_per_minute == 120
+        assert {handle.tenant for handle in handles} == {'aaaaaaaa', 'bbbbbbbb'}
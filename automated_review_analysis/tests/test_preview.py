@@ -0,0 +1,94 @@
+import pandas as pd
+import pytest
+from unittest.mock import MagicMock, patch
+from src.preview import (
+    estimate_breakdown,
+    estimate_overall,
+    run_preview,
+    stratified_sample,
+    top_classes_estimate,
+)
+
+
+def _reviews():
+    return pd.DataFrame({
+        'Class Name': ['Dresses'] * 50 + ['Knits'] * 10,
+        'Review Text': [f'Lovely dress number {i}' for i in range(50)] + [f'Itchy knit {i}' for i in range(10)]
+    })
+
+
+class TestStratifiedSample:
+    """Tests for the per-class preview sample."""
+    
+    def test_caps_each_class(self):
+        """Test large classes are capped and small classes kept whole."""
+        sample = stratified_sample(_reviews(), 'Class Name', per_class=20)
+        
+        assert sample['Class Name'].value_counts().to_dict() == {'Dresses': 20, 'Knits': 10}
+        assert sample.index.is_monotonic_increasing
+    
+    def test_sample_is_reproducible(self):
+        """Test the same seed draws the same rows."""
+        first = stratified_sample(_reviews(), 'Class Name', per_class=5, seed=3)
+        second = stratified_sample(_reviews(), 'Class Name', per_class=5, seed=3)
+        
+        assert first.index.tolist() == second.index.tolist()
+
+
+class TestEstimates:
+    """Tests for the estimated breakdown and its confidence intervals."""
+    
+    def test_partial_sample_has_interval(self):
+        """Test a partly sampled class gets an interval around its estimate."""
+        sample = pd.DataFrame({'Class Name': ['Dresses'] * 20,
+                               'AI Sentiment': ['Positive'] * 15 + ['Negative'] * 5})
+        
+        estimates = estimate_breakdown(sample, pd.Series({'Dresses': 500}))
+        row = estimates.loc['Dresses']
+        
+        assert row['Positive %'] == pytest.approx(75.0)
+        assert row['Positive low %'] < 75.0 < row['Positive high %']
+        assert row['Neutral %'] == 0
+    
+    def test_fully_sampled_class_is_exact(self):
+        """Test a class sampled in full has no uncertainty."""
+        sample = pd.DataFrame({'Class Name': ['Knits'] * 4,
+                               'AI Sentiment': ['Negative', 'Negative', 'Positive', 'Neutral']})
+        
+        row = estimate_breakdown(sample, pd.Series({'Knits': 4})).loc['Knits']
+        
+        assert row['Negative low %'] == pytest.approx(50.0)
+        assert row['Negative high %'] == pytest.approx(50.0)
+    
+    def test_overall_is_weighted_by_class_size(self):
+        """Test the overall estimate weights each class by its number of reviews."""
+        sample = pd.DataFrame({'Class Name': ['Dresses'] * 10 + ['Knits'] * 10,
+                               'AI Sentiment': ['Positive'] * 10 + ['Negative'] * 10})
+        estimates = estimate_breakdown(sample, pd.Series({'Dresses': 900, 'Knits': 100}))
+        
+        overall = estimate_overall(estimates)
+        
+        assert overall['Positive'][0] == pytest.approx(90.0)
+        assert overall['Negative'][0] == pytest.approx(10.0)
+        assert top_classes_estimate(estimates)['Negative']['class'] == 'Knits'
+
+
+class TestRunPreview:
+    """Tests for the end-to-end preview run."""
+    
+    def test_preview_labels_only_the_sample(self, tmp_path):
+        """Test only sampled reviews reach the LLM and the report is labelled as estimates."""
+        def fake_llm(text):
+            return {'sentiment': 'Negative' if 'Itchy' in text else 'Positive', 'summary': 'ok'}
+        
+        with patch('src.etl.extract_raw_data', return_value=_reviews()), \
+                patch('src.utils.call_groq_llm', side_effect=fake_llm) as mock_llm, \
+                patch('time.sleep'):
+            estimates = run_preview(MagicMock(), per_class=5, output_dir=str(tmp_path))
+        
+        assert mock_llm.call_count == 10
+        assert estimates.loc['Knits', 'Negative %'] == 100
+        report = (tmp_path / 'insights_report_preview.txt').read_text(encoding='utf-8')
+        assert 'ESTIMATES' in report
+        assert '95% CI' in report
+        assert (tmp_path / 'charts' / 'sentiment_breakdown_preview.csv').exists()
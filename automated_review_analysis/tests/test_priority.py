@@ -0,0 +1,76 @@
+import json
+import pandas as pd
+from unittest.mock import patch
+from src.priority import urgency_scores, priority_order, ActionAlertWriter
+from src.etl import process_reviews_with_llm
+
+
+def _reviews():
+    return pd.DataFrame({
+        'Review Text': ['Love it', 'Fits as expected', 'Poor quality, returned it', 'Nice color'],
+        'Rating': ['5', '3', '1', '4'],
+        'Recommended IND': ['1', '1', '0', '1'],
+        'Class Name': ['Dresses', 'Knits', 'Pants', 'Blouses']
+    })
+
+
+def _echo(text, **kwargs):
+    sentiment = 'Negative' if 'Poor' in text else 'Positive'
+    return {'sentiment': sentiment, 'summary': text}
+
+
+class TestUrgencyScores:
+    """Tests for the urgency score and ordering."""
+    
+    def test_low_rating_not_recommended_negative_scores_highest(self):
+        """Test rating, recommendation and lexicon hits all raise urgency."""
+        scores = urgency_scores(_reviews())
+        
+        assert scores.idxmax() == 2
+        assert scores[2] == 2 + 1 + 1.0
+        assert scores[0] == 0
+    
+    def test_order_is_stable_for_ties(self):
+        """Test equally urgent rows keep sheet order."""
+        df = pd.DataFrame({'Review Text': ['a', 'b', 'c'], 'Rating': ['5', '5', '5']})
+        assert list(priority_order(df)) == [0, 1, 2]
+    
+    def test_missing_columns_score_zero(self):
+        """Test a frame without rating/recommendation columns still scores."""
+        scores = urgency_scores(pd.DataFrame({'Other': [1, 2]}))
+        assert scores.tolist() == [0.0, 0.0]
+
+
+class TestPrioritizedProcessing:
+    """Tests for prioritized LLM processing with early alerts."""
+    
+    @patch('time.sleep')
+    @patch('src.utils.call_groq_llm', side_effect=_echo)
+    def test_urgent_reviews_processed_first(self, mock_llm, mock_sleep):
+        """Test the most urgent review is sent to the LLM first and results keep row order."""
+        result = process_reviews_with_llm(_reviews(), prioritize=True)
+        
+        assert mock_llm.call_args_list[0].args[0] == 'Poor quality, returned it'
+        assert result['Action Needed?'].tolist() == ['No', 'No', 'Yes', 'No']
+    
+    @patch('time.sleep')
+    @patch('src.utils.call_groq_llm', side_effect=_echo)
+    def test_alert_written_as_soon_as_known(self, mock_llm, mock_sleep, tmp_path):
+        """Test action-needed reviews are appended to the alerts file during the stage."""
+        path = tmp_path / 'alerts.jsonl'
+        alerts = ActionAlertWriter(str(path))
+        seen_at_call = []
+        
+        def llm(text, **kwargs):
+            seen_at_call.append(path.exists())
+            return _echo(text)
+        mock_llm.side_effect = llm
+        
+        process_reviews_with_llm(_reviews(), prioritize=True, on_action_needed=alerts)
+        
+        records = [json.loads(line) for line in path.read_text().splitlines()]
+        assert alerts.count == 1
+        assert records[0]['Class Name'] == 'Pants'
+        assert records[0]['Action Needed?'] == 'Yes'
+        # Written right after the first (most urgent) review, before the rest were classified
+        assert seen_at_call[1:] == [True, True, True]
@@ -0,0 +1,43 @@
+import os
+import pytest
+from src import profiling
+
+
+@pytest.fixture(autouse=True)
+def profiling_off():
+    profiling.disable()
+    yield
+    profiling.disable()
+
+
+class TestProfilingDisabled:
+    """Tests for the default (off) mode."""
+    
+    def test_hooks_are_no_ops_when_disabled(self, tmp_path):
+        """Test nothing is collected or written while profiling is off."""
+        with profiling.profile_stage('clean'):
+            with profiling.track_memory('clean_data'):
+                sum(range(1000))
+        
+        assert profiling.write_summary() is None
+        assert not profiling.is_enabled()
+
+
+class TestProfilingEnabled:
+    """Tests for --profile mode."""
+    
+    def test_stage_profile_and_summary(self, tmp_path):
+        """Test a stage profile, memory peak and summary are written."""
+        profiling.enable(str(tmp_path))
+        
+        with profiling.profile_stage('clean'):
+            with profiling.track_memory('clean_data'):
+                data = [str(i) * 10 for i in range(50000)]
+        
+        path = profiling.write_summary()
+        summary = open(path).read()
+        
+        assert os.path.exists(tmp_path / 'clean.prof')
+        assert 'clean_data' in summary
+        assert 'Hot functions - clean' in summary
+        assert len(data) == 50000
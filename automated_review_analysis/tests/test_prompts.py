@@ -0,0 +1,74 @@
+import pandas as pd
+from unittest.mock import patch
+from src.etl import process_reviews_with_llm
+from src.main import build_llm_options, build_parser
+from src.prompts import (estimate_tokens, truncate_review, build_messages, request_tokens,
+                         TRUNCATION_MARKER, MAX_COMPLETION_TOKENS)
+
+
+class TestTokenEstimates:
+    """Tests for local token estimation."""
+    
+    def test_estimate_tokens(self):
+        """Test the estimate is about four characters per token."""
+        assert estimate_tokens('') == 0
+        assert estimate_tokens('abcd') == 1
+        assert estimate_tokens('a' * 401) == 101
+    
+    def test_request_tokens_capped_by_review_budget(self):
+        """Test a very long review costs no more than the trimmed prompt."""
+        short = request_tokens('Nice dress')
+        long = request_tokens('word ' * 10000, max_review_tokens=100)
+        
+        assert short > MAX_COMPLETION_TOKENS
+        assert long - short <= 100
+    
+    def test_zero_budget_means_no_review_text(self):
+        """Test a budget of 0 leaves only the marker, in the prompt and in the estimate alike."""
+        text = 'word ' * 100
+        
+        assert truncate_review(text, max_tokens=0) == TRUNCATION_MARKER
+        assert truncate_review(text, max_tokens=1) == TRUNCATION_MARKER
+        assert request_tokens(text, max_review_tokens=0) == request_tokens('', max_review_tokens=0) + \
+            estimate_tokens(TRUNCATION_MARKER)
+        assert request_tokens(text, max_review_tokens=None) > request_tokens(text, max_review_tokens=50)
+
+
+class TestPromptBuilder:
+    """Tests for prompt construction and truncation."""
+    
+    def test_short_review_unchanged(self):
+        """Test reviews within budget are not trimmed."""
+        assert truncate_review('Lovely fit', max_tokens=50) == 'Lovely fit'
+    
+    def test_long_review_keeps_start_and_end(self):
+        """Test a long review is trimmed to its start and end."""
+        text = 'START ' + 'middle ' * 500 + 'END'
+        trimmed = truncate_review(text, max_tokens=50)
+        
+        assert trimmed.startswith('START')
+        assert trimmed.endswith('END')
+        assert TRUNCATION_MARKER in trimmed
+        assert estimate_tokens(trimmed) <= 50
+    
+    def test_build_messages_includes_review_and_format(self):
+        """Test the prompt contains the review and the expected reply format."""
+        messages, tokens = build_messages('Great jeans')
+        prompt = messages[1]['content']
+        
+        assert messages[0]['role'] == 'system'
+        assert 'Great jeans' in prompt
+        assert 'SENTIMENT:' in prompt and 'SUMMARY:' in prompt
+        assert tokens == request_tokens('Great jeans') - MAX_COMPLETION_TOKENS
+    
+    @patch('time.sleep')
+    @patch('src.utils.call_groq_llm', return_value={'sentiment': 'Positive', 'summary': 'Nice'})
+    def test_max_review_tokens_reaches_llm_call(self, mock_llm, mock_sleep):
+        """Test --max-review-tokens is passed through llm_options to every Groq call."""
+        args = build_parser().parse_args(['llm', '--max-review-tokens', '120'])
+        llm_options = build_llm_options(args)
+        
+        process_reviews_with_llm(pd.DataFrame({'Review Text': ['Nice dress']}), **llm_options)
+        
+        assert llm_options == {'max_review_tokens': 120}
+        assert mock_llm.call_args.kwargs['max_review_tokens'] == 120
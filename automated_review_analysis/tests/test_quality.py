@@ -0,0 +1,83 @@
+import numpy as np
+import pandas as pd
+from unittest.mock import patch
+from src import metrics
+from src.quality import review_quality, quality_gate
+from src.etl import clean_data, process_reviews_with_llm
+
+
+class TestReviewQuality:
+    """Tests for the vectorised review quality gate."""
+    
+    def test_reasons(self):
+        """Test each heuristic flags its kind of junk and real reviews pass."""
+        texts = pd.Series([
+            'Love it, fits perfectly and the fabric is soft.',
+            '',
+            np.nan,
+            'NaN',
+            'ok',
+            'abc 123456789 !!!! ????',
+            'Это платье очень красивое и удобное',
+            'Sooooooooooooo goood',
+            'buy buy buy buy buy buy buy buy buy buy',
+            'Great deals at www.example.com',
+            'Meh.',
+        ], index=range(10, 21))
+        
+        gate = review_quality(texts)
+        
+        assert gate.index.tolist() == list(range(10, 21))
+        assert gate['reason'].tolist() == [
+            '', 'empty', 'empty', 'empty', 'too_short', 'non_text', 'non_english',
+            'repeated_chars', 'repetitive', 'contains_link', ''
+        ]
+        assert gate['valid'].tolist() == [r == '' for r in gate['reason']]
+    
+    def test_accented_text_is_valid(self):
+        """Test Latin text with a few accents is not treated as non-English."""
+        gate = review_quality(pd.Series(['Très jolie robe, parfait pour un café']))
+        assert gate['valid'].all()
+    
+    def test_gate_counts_rejections(self):
+        """Test rejected rows are counted by reason and dropped from the LLM frame."""
+        metrics.reset()
+        df = pd.DataFrame({'Review Text': ['Lovely top', '', 'ok', 'Nice fit']})
+        
+        valid, gate = quality_gate(df)
+        
+        assert valid.index.tolist() == [0, 3]
+        assert metrics.get_counter('quality_rejected_total', reason='too_short') == 1
+        assert metrics.get_counter('quality_rejected_total', reason='empty') == 1
+
+
+class TestGatedProcessing:
+    """Tests for the gate in front of the LLM stage."""
+    
+    @patch('time.sleep')
+    @patch('src.utils.call_groq_llm', return_value={'sentiment': 'Positive', 'summary': 'Nice'})
+    def test_rejected_rows_never_reach_llm(self, mock_llm, mock_sleep):
+        """Test junk rows get outputs directly and only real reviews are sent."""
+        df = pd.DataFrame({'Review Text': ['Lovely top', '???', 'buy ' * 12, '', 'Nice fit']})
+        
+        result = process_reviews_with_llm(df)
+        
+        assert [call.args[0] for call in mock_llm.call_args_list] == ['Lovely top', 'Nice fit']
+        assert result.loc[1, 'AI Summary'] == 'Not analyzed (too short)'
+        assert result.loc[2, 'AI Summary'] == 'Not analyzed (repetitive)'
+        assert result.loc[3, 'AI Summary'] == 'No review text provided'
+        assert (result.loc[[1, 2, 3], 'Action Needed?'] == 'No').all()
+    
+    def test_missing_reviews_after_clean_data_are_empty(self):
+        """Test reviews clean_data found missing reach the gate as empty, not too short."""
+        raw = pd.DataFrame({'Review Text': ['Lovely top', None, 'nan', np.nan], 'Rating': [5, 4, 3, 2]})
+        
+        cleaned = clean_data(raw)
+        gate = review_quality(cleaned['Review Text'])
+        
+        assert cleaned['Review Text'].tolist()[1:] == ['', '', '']
+        assert gate['reason'].tolist() == ['', 'empty', 'empty', 'empty']
+    
+    def test_na_text_from_older_staging_is_empty(self):
+        """Test the '<NA>' text older staging sheets hold for missing reviews counts as empty."""
+        assert review_quality(pd.Series(['<NA>']))['reason'].tolist() == ['empty']
@@ -0,0 +1,104 @@
+import pandas as pd
+from unittest.mock import patch
+from src.etl import process_reviews_with_llm
+from src.relabel import LABEL_SOURCE_COLUMN, LABEL_VERSION_COLUMN, plan_relabel, run_relabel
+from src.utils import label_version
+
+OLD = 'old-model@00000000'
+
+
+def _processed():
+    """Processed rows labelled by an older model, one per re-labelling case."""
+    rows = [
+        # text, rating, sentiment, version, source
+        ('Great fit, love it', 5, 'Negative', OLD, 'llm'),           # disagrees with rating
+        ('It is a dress', 3, 'Neutral', OLD, 'keyword_fallback'),
+        ('Shipping was slow', 2, 'Neutral', '', 'error'),
+        ('', 3, 'Neutral', '', 'empty'),
+        ('asdf', 3, 'Neutral', '', 'quality_gate'),
+        ('Lovely colour', 5, 'Positive', label_version(), 'llm'),    # already current
+    ]
+    rows += [(f'Nice top number {i}', 4, 'Positive', OLD, 'llm') for i in range(20)]
+    return pd.DataFrame(rows, columns=['Review Text', 'Rating', 'AI Sentiment', LABEL_VERSION_COLUMN,
+                                       LABEL_SOURCE_COLUMN])
+
+
+class TestLabelProvenance:
+    """Tests for the label version and source recorded with each row."""
+    
+    def test_rows_record_version_and_source(self):
+        """Test each processed row records where its label came from."""
+        df = pd.DataFrame({'Review Text': ['Love this top', '']})
+        result = {'sentiment': 'Positive', 'summary': 'Nice', 'source': 'llm', 'version': 'm@p'}
+        
+        with patch('src.utils.call_groq_llm', return_value=result), patch('time.sleep'):
+            processed = process_reviews_with_llm(df)
+        
+        assert processed[LABEL_VERSION_COLUMN].tolist() == ['m@p', '']
+        assert processed[LABEL_SOURCE_COLUMN].tolist() == ['llm', 'empty']
+
+
+class TestPlanRelabel:
+    """Tests for choosing which rows to re-label."""
+    
+    def test_targets_and_audit_sample(self):
+        """Test suspect rows are targeted, fixed and current rows skipped, and the rest audited."""
+        plan = plan_relabel(_processed(), label_version(), audit_fraction=0.1)
+        
+        assert plan[0] == 'disagrees'
+        assert plan[1] == 'keyword_fallback'
+        assert plan[2] == 'failed'
+        assert not {3, 4, 5} & set(plan.index)
+        assert (plan == 'audit').sum() == 2
+        assert plan.attrs['stale'] == 23
+    
+    def test_routed_rows_are_current_at_their_model_version(self):
+        """Test a small-model label the router would still produce is not stale."""
+        from src.relabel import expected_versions
+        from src.routing import ModelRouter
+        
+        router = ModelRouter()
+        df = pd.DataFrame({'Review Text': ['Love it, so comfortable!', 'It arrived on Tuesday.'],
+                           'Rating': [5, 3], 'AI Sentiment': ['Positive', 'Neutral'],
+                           LABEL_SOURCE_COLUMN: ['llm', 'llm']})
+        df[LABEL_VERSION_COLUMN] = [label_version(router.small_model), label_version(router.small_model)]
+        
+        plan = plan_relabel(df, expected_versions(df, router), audit_fraction=1.0)
+        
+        assert plan.to_dict() == {1: 'audit'}
+
+
+class TestRunRelabel:
+    """Tests for the selective re-labelling run."""
+    
+    def test_only_planned_rows_are_relabelled(self, tmp_path):
+        """Test untouched rows keep their labels and the report estimates the drift."""
+        df = _processed()
+        result = {'sentiment': 'Positive', 'summary': 'Fine', 'source': 'llm', 'version': label_version()}
+        report_path = tmp_path / 'relabel_report.txt'
+        
+        with patch('src.utils.call_groq_llm', return_value=result) as mock_llm, patch('time.sleep'):
+            updated, summary = run_relabel(df, audit_fraction=0.1, report_path=str(report_path))
+        
+        assert mock_llm.call_count == 5
+        assert updated.loc[0, 'AI Sentiment'] == 'Positive'
+        assert updated.loc[0, LABEL_VERSION_COLUMN] == label_version()
+        planned = plan_relabel(df, label_version(), audit_fraction=0.1).index
+        untouched = df.index[(df[LABEL_VERSION_COLUMN] == OLD) & ~df.index.isin(planned)]
+        assert len(untouched) == 18
+        assert (updated.loc[untouched, LABEL_VERSION_COLUMN] == OLD).all()
+        assert summary['by_reason']['disagrees'] == {'rows': 1, 'changed': 1}
+        assert summary['remaining'] == 18
+        assert summary['estimate']['rows'] == 0
+        assert 'would change' in report_path.read_text(encoding='utf-8')
+    
+    def test_dry_run_changes_nothing(self):
+        """Test a dry run only reports the plan."""
+        df = _processed()
+        
+        with patch('src.utils.call_groq_llm') as mock_llm:
+            updated, summary = run_relabel(df, dry_run=True)
+        
+        mock_llm.assert_not_called()
+        assert summary is None
+        assert updated is df
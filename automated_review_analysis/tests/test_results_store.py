@@ -0,0 +1,110 @@
+import time
+import pytest
+import pandas as pd
+from unittest.mock import patch
+from src.results_store import ResultsStore
+from src.main import main
+
+
+def _processed():
+    return pd.DataFrame({
+        'Clothing ID': [1, 2, 3, 4],
+        'Review Text': ['Love it', 'Poor fit', 'Ripped seam', 'Fine'],
+        'Rating': [5, 2, 1, 3],
+        'Department Name': ['Dresses', 'Dresses', 'Bottoms', 'Tops'],
+        'Class Name': ['Dresses', 'Dresses', 'Pants', 'Knits'],
+        'AI Sentiment': ['Positive', 'Negative', 'Negative', 'Neutral'],
+        'AI Summary': ['Loves it', 'Bad fit', 'Broke', 'Okay'],
+        'Action Needed?': ['No', 'Yes', 'Yes', 'No'],
+    })
+
+
+class TestResultsStore:
+    """Tests for the local SQLite results store."""
+    
+    def test_query_filters(self, tmp_path):
+        """Test filters on class, sentiment, action flag and rating."""
+        store = ResultsStore(str(tmp_path / 'results.db'))
+        store.replace(_processed())
+        
+        negative_dresses = store.query(class_name='Dresses', sentiment='Negative')
+        assert negative_dresses['review_text'].tolist() == ['Poor fit']
+        
+        assert len(store.query(action_needed=True)) == 2
+        assert store.query(max_rating=2)['clothing_id'].tolist() == [2, 3]
+        assert store.query(department='Tops')['action_needed'].tolist() == [0]
+    
+    def test_replace_is_idempotent(self, tmp_path):
+        """Test replace() mirrors the processed sheet rather than accumulating."""
+        store = ResultsStore(str(tmp_path / 'results.db'))
+        store.replace(_processed())
+        store.replace(_processed())
+        
+        assert len(store.query()) == 4
+    
+    def test_append_and_since(self, tmp_path):
+        """Test appended rows are added and 'since' filters by load time."""
+        store = ResultsStore(str(tmp_path / 'results.db'))
+        store.replace(_processed())
+        cutoff = time.time()
+        store.append(_processed().head(1))
+        
+        assert len(store.query()) == 5
+        assert store.query(since=cutoff)['row_id'].tolist() == [4]
+    
+    def test_replace_keeps_load_time_of_known_reviews(self, tmp_path):
+        """Test a full reload only makes new reviews match 'since', even after relabelling."""
+        store = ResultsStore(str(tmp_path / 'results.db'))
+        store.replace(_processed())
+        cutoff = time.time()
+        reloaded = pd.concat([_processed(), _processed().head(1)], ignore_index=True)
+        reloaded.loc[1, 'AI Sentiment'] = 'Neutral'
+        reloaded.loc[4, 'Review Text'] = 'New review'
+        store.replace(reloaded)
+        
+        assert len(store.query()) == 5
+        assert store.query(since=cutoff)['review_text'].tolist() == ['New review']
+    
+    def test_counts(self, tmp_path):
+        """Test grouped counts with filters."""
+        store = ResultsStore(str(tmp_path / 'results.db'))
+        store.replace(_processed())
+        
+        counts = store.counts(by='class_name', sentiment='Negative')
+        
+        assert dict(zip(counts['class_name'], counts['reviews'])) == {'Dresses': 1, 'Pants': 1}
+        with pytest.raises(ValueError):
+            store.counts(by='row_json')
+    
+    def test_indexes_used(self, tmp_path):
+        """Test the common filters are served by an index."""
+        store = ResultsStore(str(tmp_path / 'results.db'))
+        with store._connect() as conn:
+            plan = conn.execute("EXPLAIN QUERY PLAN SELECT * FROM results "
+                                "WHERE class_name = 'Dresses' AND sentiment = 'Negative'").fetchall()
+        
+        assert 'idx_results_class_sentiment' in str(plan)
+    
+    def test_query_command(self, tmp_path, capsys):
+        """Test the query subcommand prints counts without connecting to Sheets."""
+        path = str(tmp_path / 'results.db')
+        ResultsStore(path).replace(_processed())
+        
+        with patch('src.main.connect') as mock_connect:
+            code = main(['query', '--db', path, '--action-needed', '--count-by', 'class_name'])
+        
+        assert code == 0
+        mock_connect.assert_not_called()
+        assert 'Pants' in capsys.readouterr().out
+    
+    def test_query_command_rejects_unknown_column(self, tmp_path, capsys):
+        """Test an unknown --count-by column exits non-zero with the valid columns listed."""
+        path = str(tmp_path / 'results.db')
+        ResultsStore(path).replace(_processed())
+        
+        code = main(['query', '--db', path, '--count-by', 'colour'])
+        
+        out = capsys.readouterr().out
+        assert code == 1
+        assert 'Cannot group by colour' in out
+        assert 'class_name' in out
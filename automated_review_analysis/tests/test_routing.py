@@ -0,0 +1,64 @@
+import pandas as pd
+from unittest.mock import patch
+from src import metrics
+from src.routing import ModelRouter, SMALL_MODEL, LARGE_MODEL, rating_sentiment
+from src.etl import process_reviews_with_llm
+
+
+class TestModelRouter:
+    """Tests for per-review model routing."""
+    
+    def setup_method(self):
+        metrics.reset()
+    
+    def test_rating_sentiment(self):
+        """Test star ratings map to the sentiment they imply."""
+        assert rating_sentiment('5') == 'Positive'
+        assert rating_sentiment(3) == 'Neutral'
+        assert rating_sentiment('1') == 'Negative'
+        assert rating_sentiment('') is None
+    
+    def test_short_confident_review_goes_to_small_model(self):
+        """Test an easy review agreeing with its rating is routed to the small model."""
+        assert ModelRouter().decide("Love it, so comfortable!", rating='5') == (SMALL_MODEL, 'easy')
+    
+    def test_long_review_goes_to_large_model(self):
+        """Test a long review is routed to the large model."""
+        text = "Love it. " + "The fit is fine and the fabric is okay. " * 10
+        assert ModelRouter().decide(text, rating='5') == (LARGE_MODEL, 'long')
+    
+    def test_rating_disagreement_goes_to_large_model(self):
+        """Test a review contradicting its star rating is routed to the large model."""
+        assert ModelRouter().decide("Love it, so comfortable!", rating='1') == (LARGE_MODEL, 'rating_disagrees')
+    
+    def test_ambiguous_review_goes_to_large_model(self):
+        """Test a review with no clear lexicon signal is routed to the large model."""
+        assert ModelRouter().decide("It arrived on Tuesday.", rating=None) == (LARGE_MODEL, 'low_confidence')
+    
+    def test_route_records_decisions(self):
+        """Test route() picks a model for every gated review and counts each decision."""
+        df = pd.DataFrame({
+            'Review Text': ['Love it, so comfortable!', 'It arrived on Tuesday.'],
+            'Rating': ['5', '3']
+        }, index=[0, 2])
+        
+        models = ModelRouter().route(df)
+        
+        assert models.to_dict() == {0: SMALL_MODEL, 2: LARGE_MODEL}
+        assert metrics.get_counter('routing_decisions_total', model=SMALL_MODEL, reason='easy') == 1
+        assert metrics.get_counter('routing_decisions_total', model=LARGE_MODEL, reason='low_confidence') == 1
+    
+    @patch('time.sleep')
+    @patch('src.utils.call_groq_llm')
+    def test_process_reviews_uses_routed_model(self, mock_llm, mock_sleep):
+        """Test process_reviews_with_llm passes each review's model to the LLM call."""
+        mock_llm.return_value = {'sentiment': 'Positive', 'summary': 'Fine'}
+        df = pd.DataFrame({
+            'Review Text': ['Love it, so comfortable!', 'It arrived on Tuesday.'],
+            'Rating': ['5', '3']
+        })
+        
+        process_reviews_with_llm(df, router=ModelRouter())
+        
+        models = [call.kwargs['model'] for call in mock_llm.call_args_list]
+        assert models == [SMALL_MODEL, LARGE_MODEL]
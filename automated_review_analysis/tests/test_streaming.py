@@ -0,0 +1,194 @@
+import threading
+import pandas as pd
+from unittest.mock import MagicMock, patch
+from src.analysis import calculate_sentiment_breakdown
+from src.streaming import RunningBreakdown, _DONE, _writer_loop, stream_reviews_to_processed
+
+
+def _mock_spreadsheet():
+    """Spreadsheet whose rows stream to one worksheet; the processed worksheet is reachable by name."""
+    mock_spreadsheet = MagicMock()
+    mock_worksheet = MagicMock()
+    processed_worksheet = MagicMock()
+    processed_worksheet.get_all_values.return_value = []
+    mock_spreadsheet.worksheet.side_effect = (
+        lambda name: processed_worksheet if name == 'processed' else mock_worksheet)
+    return mock_spreadsheet, mock_worksheet
+
+
+class TestRunningBreakdown:
+    """Tests for RunningBreakdown."""
+    
+    def test_matches_batch_breakdown(self):
+        """Test incremental counts match calculate_sentiment_breakdown."""
+        df = pd.DataFrame({
+            'Class Name': ['Dresses', 'Tops', 'Dresses', 'Pants', 'Tops'],
+            'AI Sentiment': ['Positive', 'Negative', 'Neutral', 'Positive', 'Negative']
+        })
+        running = RunningBreakdown('Class Name')
+        for _, row in df.iterrows():
+            running.add(row['Class Name'], row['AI Sentiment'])
+        
+        breakdown, breakdown_pct = running.to_frames()
+        expected, expected_pct = calculate_sentiment_breakdown(df)
+        
+        pd.testing.assert_frame_equal(breakdown, expected, check_names=False)
+        pd.testing.assert_frame_equal(breakdown_pct, expected_pct, check_names=False)
+    
+    def test_empty_breakdown(self):
+        """Test an empty tally returns (None, None)."""
+        assert RunningBreakdown('Class Name').to_frames() == (None, None)
+
+
+class TestStreamReviewsToProcessed:
+    """Tests for stream_reviews_to_processed function."""
+    
+    @patch('time.sleep')
+    @patch('src.utils.call_groq_llm')
+    def test_writes_header_and_every_row_in_place(self, mock_llm, mock_sleep):
+        """Test rows are written after the header, each at its own row, in blocks."""
+        mock_llm.return_value = {'sentiment': 'Negative', 'summary': 'Poor'}
+        mock_spreadsheet, mock_worksheet = _mock_spreadsheet()
+        df = pd.DataFrame({
+            'Class Name': ['Dresses'] * 5,
+            'Review Text': ['Bad', 'Worse', '', 'Awful', 'Meh']
+        })
+        
+        result = stream_reviews_to_processed(mock_spreadsheet, df, block_size=2)
+        
+        sheet = {}
+        for c in mock_worksheet.update.call_args_list[1:]:
+            sheet[c.kwargs['range_name']] = c.kwargs['values']
+        for c in mock_worksheet.batch_update.call_args_list:
+            sheet.update({item['range']: item['values'] for item in c.args[0]})
+        written = {int(range_name[1:]) + offset: row for range_name, rows in sheet.items()
+                   for offset, row in enumerate(rows)}
+        assert mock_worksheet.update.call_args_list[0].kwargs['range_name'] == 'A1'
+        assert [written[row] for row in range(2, 7)] == result.values.tolist()
+        assert result.loc[0, 'Action Needed?'] == 'Yes'
+        assert result.loc[2, 'AI Summary'] == 'No review text provided'
+        mock_worksheet.clear.assert_called_once()
+        processed = mock_spreadsheet.worksheet('processed').update.call_args.kwargs['values']
+        assert processed == [result.columns.tolist()] + result.values.tolist()
+    
+    @patch('time.sleep')
+    @patch('src.utils.call_groq_llm')
+    def test_writes_overlap_llm_processing(self, mock_llm, mock_sleep):
+        """Test the first block is written while later reviews are still being processed."""
+        first_block_written = threading.Event()
+        mock_spreadsheet, mock_worksheet = _mock_spreadsheet()
+        
+        def update(range_name, values):
+            if range_name == 'A2':
+                first_block_written.set()
+        mock_worksheet.update.side_effect = update
+        
+        def llm(text):
+            if text == 'last':
+                # Only returns once the writer has flushed earlier rows
+                assert first_block_written.wait(timeout=5)
+            return {'sentiment': 'Positive', 'summary': 'Nice'}
+        mock_llm.side_effect = llm
+        
+        df = pd.DataFrame({'Review Text': ['first', 'second', 'last']})
+        
+        result = stream_reviews_to_processed(mock_spreadsheet, df, block_size=1)
+        
+        assert result is not None
+        assert first_block_written.is_set()
+    
+    @patch('time.sleep')
+    @patch('src.utils.call_groq_llm')
+    def test_updates_running_breakdown(self, mock_llm, mock_sleep):
+        """Test the running breakdown sees every result."""
+        mock_llm.return_value = {'sentiment': 'Positive', 'summary': 'Nice'}
+        mock_spreadsheet, _ = _mock_spreadsheet()
+        df = pd.DataFrame({
+            'Class Name': ['Dresses', 'Tops', 'Tops'],
+            'Review Text': ['Lovely', 'Great', 'Fine']
+        })
+        running = RunningBreakdown('Class Name')
+        
+        stream_reviews_to_processed(mock_spreadsheet, df, running=running)
+        
+        assert running.total == 3
+        assert running.counts[('Tops', 'Positive')] == 2
+    
+    @patch('time.sleep')
+    @patch('src.utils.call_groq_llm')
+    def test_writer_failure_returns_none(self, mock_llm, mock_sleep):
+        """Test a failing write is reported instead of hanging the producer."""
+        mock_llm.return_value = {'sentiment': 'Positive', 'summary': 'Nice'}
+        mock_spreadsheet, mock_worksheet = _mock_spreadsheet()
+        mock_worksheet.update.side_effect = [None, Exception("quota exceeded")]
+        df = pd.DataFrame({'Review Text': ['Good'] * 10})
+        
+        result = stream_reviews_to_processed(mock_spreadsheet, df, block_size=1, queue_size=1)
+        
+        assert result is None
+    
+    @patch('time.sleep')
+    @patch('src.utils.call_groq_llm')
+    def test_writer_failure_stops_llm_and_keeps_processed(self, mock_llm, mock_sleep):
+        """Test a failed write stops further LLM calls and leaves the processed worksheet untouched."""
+        write_failed = threading.Event()
+        mock_spreadsheet, mock_worksheet = _mock_spreadsheet()
+        
+        def update(range_name, values):
+            if range_name != 'A1':
+                write_failed.set()
+                raise Exception("quota exceeded")
+        mock_worksheet.update.side_effect = update
+        
+        def llm(text):
+            if text == 'Review 1':
+                assert write_failed.wait(timeout=5)
+            return {'sentiment': 'Positive', 'summary': 'Nice'}
+        mock_llm.side_effect = llm
+        df = pd.DataFrame({'Review Text': [f'Review {i}' for i in range(10)]})
+        
+        result = stream_reviews_to_processed(mock_spreadsheet, df, block_size=1)
+        
+        assert result is None
+        assert mock_llm.call_count <= 3
+        processed_worksheet = mock_spreadsheet.worksheet('processed')
+        processed_worksheet.clear.assert_not_called()
+        processed_worksheet.update.assert_not_called()
+    
+    @patch('time.sleep')
+    @patch('src.utils.call_groq_llm', return_value={'sentiment': 'Positive', 'summary': 'Nice'})
+    def test_stream_worksheet_created_when_missing(self, mock_llm, mock_sleep):
+        """Test the stream worksheet is added on first use."""
+        import gspread
+        
+        mock_spreadsheet, _ = _mock_spreadsheet()
+        processed_worksheet = mock_spreadsheet.worksheet('processed')
+        processed_worksheet.get_all_values.return_value = []
+        
+        def worksheet(name):
+            if name == 'processed':
+                return processed_worksheet
+            raise gspread.exceptions.WorksheetNotFound(name)
+        mock_spreadsheet.worksheet.side_effect = worksheet
+        
+        result = stream_reviews_to_processed(mock_spreadsheet, pd.DataFrame({'Review Text': ['Good']}))
+        
+        assert result is not None
+        assert mock_spreadsheet.add_worksheet.call_args.kwargs['title'] == 'processed_stream'
+    
+    def test_out_of_order_rows_are_written_without_waiting(self):
+        """Test a block of scattered rows is written at once with one range per run."""
+        import queue
+        worksheet = MagicMock()
+        results = queue.Queue()
+        state = {'rows_written': 0, 'blocks_written': 0, 'error': None}
+        for position in (3, 1, 4):
+            results.put((position, [f'row {position}']))
+        results.put(_DONE)
+        
+        _writer_loop(worksheet, results, 2, state)
+        
+        worksheet.batch_update.assert_called_once_with([{'range': 'A3', 'values': [['row 1']]},
+                                                        {'range': 'A5', 'values': [['row 3']]}])
+        worksheet.update.assert_called_once_with(range_name='A6', values=[['row 4']])
+        assert state['rows_written'] == 3
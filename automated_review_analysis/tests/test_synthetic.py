@@ -0,0 +1,82 @@
+import pandas as pd
+from src.etl import clean_data
+from src.synthetic import RAW_COLUMNS, generate_reviews, zipf_class_weights
+from benchmarks.run_benchmarks import compare_runs
+
+
+class TestGenerateReviews:
+    """Tests for generate_reviews function."""
+    
+    def test_matches_raw_schema(self):
+        """Test generated rows follow the raw_data schema as strings."""
+        df = generate_reviews(500)
+        
+        assert list(df.columns) == RAW_COLUMNS
+        assert len(df) == 500
+        assert all(isinstance(v, str) for v in df.iloc[0])
+    
+    def test_is_deterministic_per_seed(self):
+        """Test the same seed gives the same data."""
+        pd.testing.assert_frame_equal(generate_reviews(200, seed=7), generate_reviews(200, seed=7))
+    
+    def test_class_weights_are_respected(self):
+        """Test a custom class distribution is followed."""
+        df = generate_reviews(5000, class_weights={'Dresses': 0.9, 'Swim': 0.1})
+        
+        share = (df['Class Name'] == 'Dresses').mean()
+        
+        assert set(df['Class Name']) == {'Dresses', 'Swim'}
+        assert 0.85 < share < 0.95
+    
+    def test_high_cardinality_classes(self):
+        """Test zipf weights produce many long-tailed classes."""
+        df = generate_reviews(20000, class_weights=zipf_class_weights(1000))
+        
+        counts = df['Class Name'].value_counts()
+        
+        assert len(counts) > 300
+        assert counts.iloc[0] > counts.iloc[-1] * 10
+    
+    def test_mean_words_controls_length(self):
+        """Test longer mean_words yields longer reviews."""
+        short = generate_reviews(2000, mean_words=10, empty_fraction=0)
+        long = generate_reviews(2000, mean_words=200, empty_fraction=0)
+        
+        assert long['Review Text'].str.split().str.len().mean() > \
+            short['Review Text'].str.split().str.len().mean() * 5
+    
+    def test_labels_for_analysis(self):
+        """Test with_labels adds the LLM output columns."""
+        df = generate_reviews(300, with_labels=True, as_strings=False)
+        
+        assert set(df['AI Sentiment']) <= {'Positive', 'Neutral', 'Negative'}
+        assert (df.loc[df['AI Sentiment'] == 'Negative', 'Action Needed?'] == 'Yes').all()
+    
+    def test_output_cleans_like_real_extract(self):
+        """Test clean_data handles generated data like a sheet extract."""
+        cleaned = clean_data(generate_reviews(300))
+        
+        assert cleaned['Rating'].dtype == 'int64'
+        assert len(cleaned) == 300
+
+
+class TestCompareRuns:
+    """Tests for benchmark regression detection."""
+    
+    def test_flags_slower_stage(self):
+        """Test a stage beyond tolerance is reported."""
+        baseline = {'sizes': {'1000': {'clean_data': {'seconds': 1.0}}}}
+        current = {'sizes': {'1000': {'clean_data': {'seconds': 1.5}}}}
+        
+        regressions = compare_runs(baseline, current, tolerance=0.2)
+        
+        assert len(regressions) == 1
+        assert 'clean_data' in regressions[0]
+    
+    def test_ignores_noise_and_new_stages(self):
+        """Test tiny absolute differences and stages without baseline are ignored."""
+        baseline = {'sizes': {'1000': {'clean_data': {'seconds': 0.01}}}}
+        current = {'sizes': {'1000': {'clean_data': {'seconds': 0.03},
+                                      'create_visualizations': {'seconds': 9.0}}}}
+        
+        assert compare_runs(baseline, current) == []
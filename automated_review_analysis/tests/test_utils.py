@@ -1,7 +1,27 @@
 import pytest
 import os
 from unittest.mock import patch, MagicMock
-from src.utils import connect_to_google_sheets, call_groq_llm
+from src.utils import connect_to_google_sheets, call_groq_llm, local_sentiment
+
+
+class FakeStream:
+    """Streamed completion that records how many chunks were read."""
+    
+    def __init__(self, pieces):
+        self.pieces = pieces
+        self.read = 0
+        self.closed = False
+    
+    def __iter__(self):
+        for piece in self.pieces:
+            self.read += 1
+            chunk = MagicMock()
+            chunk.choices = [MagicMock()]
+            chunk.choices[0].delta.content = piece
+            yield chunk
+    
+    def close(self):
+        self.closed = True
 
 
 class TestGoogleSheetsConnection:
@@ -22,7 +42,7 @@ class TestGoogleSheetsConnection:
         result = connect_to_google_sheets()
         assert result is None
     
-    @patch('src.utils.ServiceAccountCredentials.from_json_keyfile_name')
+    @patch('oauth2client.service_account.ServiceAccountCredentials.from_json_keyfile_name')
     def test_connect_missing_credentials_file(self, mock_creds):
         """Test connection fails with missing credentials file."""
         mock_creds.side_effect = FileNotFoundError("service_account.json not found")
@@ -34,31 +54,33 @@ class TestGoogleSheetsConnection:
 class TestGroqLLM:
     """Tests for Groq LLM integration."""
     
-    def test_call_groq_llm_empty_review(self):
-        """Test LLM handles empty review text."""
+    @patch('groq.Groq')
+    def test_call_groq_llm_empty_review(self, mock_groq):
+        """Test an empty review gets the quality gate's label without an API call."""
         result = call_groq_llm("")
         
-        assert result is not None
         assert result['sentiment'] == 'Neutral'
         assert result['summary'] == 'No review text provided'
+        assert result['source'] == 'empty'
+        mock_groq.assert_not_called()
     
-    def test_call_groq_llm_none_review(self):
-        """Test LLM handles None review text."""
+    @patch('groq.Groq')
+    def test_call_groq_llm_none_review(self, mock_groq):
+        """Test None review text gets the empty label, not the error result."""
         result = call_groq_llm(None)
         
-        assert result is not None
-        assert result['sentiment'] == 'Neutral'
         assert result['summary'] == 'No review text provided'
+        assert result['source'] == 'empty'
+        mock_groq.assert_not_called()
     
-    def test_call_groq_llm_nan_review(self):
-        """Test LLM handles 'nan' string."""
-        result = call_groq_llm('nan')
-        
-        assert result is not None
-        assert result['sentiment'] == 'Neutral'
-        assert result['summary'] == 'No review text provided'
+    @patch('groq.Groq')
+    def test_call_groq_llm_nan_review(self, mock_groq):
+        """Test a missing (NaN) review gets the empty label."""
+        for review in ('nan', float('nan')):
+            assert call_groq_llm(review)['summary'] == 'No review text provided'
+        mock_groq.assert_not_called()
     
-    @patch('src.utils.Groq')
+    @patch('groq.Groq')
     def test_call_groq_llm_positive_sentiment(self, mock_groq):
         """Test LLM correctly identifies positive sentiment."""
         # Mock the Groq API response
@@ -77,7 +99,7 @@ SUMMARY: Customer loves the product and highly recommends it."""
         assert result['sentiment'] == 'Positive'
         assert len(result['summary']) > 0
     
-    @patch('src.utils.Groq')
+    @patch('groq.Groq')
     def test_call_groq_llm_negative_sentiment(self, mock_groq):
         """Test LLM correctly identifies negative sentiment."""
         mock_client = MagicMock()
@@ -95,7 +117,52 @@ SUMMARY: Customer is disappointed with poor quality."""
         assert result['sentiment'] == 'Negative'
         assert len(result['summary']) > 0
     
-    @patch('src.utils.Groq')
+    @patch('groq.Groq')
+    def test_call_groq_llm_uses_requested_model(self, mock_groq):
+        """Test the model argument overrides the default model."""
+        mock_client = MagicMock()
+        mock_response = MagicMock()
+        mock_response.choices = [MagicMock()]
+        mock_response.choices[0].message.content = "SENTIMENT: Positive\nSUMMARY: Nice."
+        mock_client.chat.completions.create.return_value = mock_response
+        mock_groq.return_value = mock_client
+        
+        call_groq_llm("Nice top", model="llama-3.1-8b-instant")
+        
+        assert mock_client.chat.completions.create.call_args.kwargs['model'] == "llama-3.1-8b-instant"
+    
+    @patch('groq.Groq')
+    def test_streaming_stops_after_summary_line(self, mock_groq):
+        """Test a streamed completion is closed once SENTIMENT and SUMMARY are complete."""
+        stream = FakeStream(['SENTIMENT: Neg', 'ative\nSUMMARY: Runs', ' small.\n', 'Extra notes', ' nobody reads'])
+        mock_client = MagicMock()
+        mock_client.chat.completions.create.return_value = stream
+        mock_groq.return_value = mock_client
+        
+        result = call_groq_llm("Way too small", stream=True)
+        
+        assert result['sentiment'] == 'Negative'
+        assert result['summary'] == 'Runs small.'
+        assert result['source'] == 'llm'
+        assert mock_client.chat.completions.create.call_args.kwargs['stream'] is True
+        assert stream.read == 3
+        assert stream.closed
+    
+    @patch('groq.Groq')
+    def test_streaming_keeps_fallback_parsing(self, mock_groq):
+        """Test malformed streamed output still gets the keyword fallback."""
+        stream = FakeStream(['The customer is ', 'disappointed with', ' the fit'])
+        mock_client = MagicMock()
+        mock_client.chat.completions.create.return_value = stream
+        mock_groq.return_value = mock_client
+        
+        result = call_groq_llm("It did not fit", stream=True)
+        
+        assert result['sentiment'] == 'Negative'
+        assert result['source'] == 'keyword_fallback'
+        assert stream.read == 3
+    
+    @patch('groq.Groq')
     def test_call_groq_llm_api_error(self, mock_groq):
         """Test LLM handles API errors gracefully."""
         mock_client = MagicMock()
@@ -107,6 +174,7 @@ SUMMARY: Customer is disappointed with poor quality."""
         assert result is not None
         assert result['sentiment'] == 'Neutral'
         assert 'Error' in result['summary']
+        assert result['error'] == 'error'
     
     @patch.dict(os.environ, {'GROQ_API_KEY': ''})
     def test_call_groq_llm_missing_api_key(self):
@@ -116,3 +184,26 @@ SUMMARY: Customer is disappointed with poor quality."""
         assert result is not None
         assert result['sentiment'] == 'Neutral'
 
+
+class TestLocalSentiment:
+    """Tests for the lexicon-based local classifier."""
+    
+    def test_local_sentiment_positive(self):
+        """Test clearly positive text."""
+        result = local_sentiment("I love it, so comfortable and beautiful!")
+        
+        assert result['sentiment'] == 'Positive'
+        assert result['confidence'] > 0.5
+    
+    def test_local_sentiment_negative(self):
+        """Test clearly negative text."""
+        result = local_sentiment("Cheap fabric, very disappointed. Returned it.")
+        
+        assert result['sentiment'] == 'Negative'
+    
+    def test_local_sentiment_no_signal(self):
+        """Test text without lexicon hits is Neutral with zero confidence."""
+        result = local_sentiment("I ordered a medium.")
+        
+        assert result['sentiment'] == 'Neutral'
+        assert result['confidence'] == 0.0
@@ -0,0 +1,173 @@
+import pandas as pd
+from unittest.mock import MagicMock, patch
+from src.watch import RawDataWatcher, IncrementalAnalysis, watch
+
+HEADERS = ['Review Text', 'Rating', 'Class Name']
+
+
+class FakeWorksheet:
+    """In-memory stand-in for a gspread worksheet."""
+    
+    def __init__(self, rows):
+        self.rows = [list(row) for row in rows]
+        self.appended = []
+    
+    def col_values(self, col):
+        return [row[col - 1] for row in self.rows]
+    
+    def row_values(self, row):
+        return list(self.rows[row - 1]) if row <= len(self.rows) else []
+    
+    def get_values(self, range_name):
+        first, last = (int(part) for part in range_name.split(':'))
+        return [list(row) for row in self.rows[first - 1:last]]
+    
+    def append_rows(self, values):
+        self.appended.extend(values)
+
+
+def _spreadsheet(raw):
+    sheets = {'raw_data': raw, 'staging': FakeWorksheet([]), 'processed': FakeWorksheet([])}
+    spreadsheet = MagicMock()
+    spreadsheet.worksheet.side_effect = lambda name: sheets[name]
+    return spreadsheet, sheets
+
+
+class TestRawDataWatcher:
+    """Tests for raw_data change detection."""
+    
+    def _watcher(self):
+        raw = FakeWorksheet([HEADERS, ['Nice', '5', 'Dresses'], ['Bad', '1', 'Pants']])
+        spreadsheet, _ = _spreadsheet(raw)
+        watcher = RawDataWatcher(spreadsheet)
+        watcher.reset()
+        return watcher, raw
+    
+    def test_unchanged(self):
+        """Test an untouched sheet reports no work."""
+        watcher, _ = self._watcher()
+        assert watcher.poll() == ('unchanged', None)
+    
+    def test_appended_rows_only(self):
+        """Test only rows appended since the last poll are returned."""
+        watcher, raw = self._watcher()
+        raw.rows.append(['Lovely', '4', 'Knits'])
+        
+        status, new_rows = watcher.poll()
+        
+        assert status == 'appended'
+        assert new_rows.columns.tolist() == HEADERS
+        assert new_rows['Review Text'].tolist() == ['Lovely']
+        
+        watcher.advance()
+        assert watcher.poll() == ('unchanged', None)
+    
+    def test_rows_returned_again_until_advanced(self):
+        """Test a batch that was not processed is offered again on the next poll."""
+        watcher, raw = self._watcher()
+        raw.rows.append(['Lovely', '4', 'Knits'])
+        
+        watcher.poll()
+        status, new_rows = watcher.poll()
+        
+        assert status == 'appended'
+        assert len(new_rows) == 1
+    
+    def test_edited_last_row_is_a_change(self):
+        """Test editing the last processed row forces a full run."""
+        watcher, raw = self._watcher()
+        raw.rows[-1][1] = '2'
+        
+        assert watcher.poll() == ('changed', None)
+    
+    def test_removed_rows_are_a_change(self):
+        """Test deleting rows forces a full run."""
+        watcher, raw = self._watcher()
+        raw.rows.pop()
+        
+        assert watcher.poll() == ('changed', None)
+
+
+class TestIncrementalAnalysis:
+    """Tests for incremental report updates."""
+    
+    def test_counts_include_new_batches(self):
+        """Test added batches update the running breakdown."""
+        base = pd.DataFrame({'Class Name': ['Dresses'], 'AI Sentiment': ['Positive'],
+                             'Action Needed?': ['No']})
+        analysis = IncrementalAnalysis(base)
+        analysis.add(pd.DataFrame({'Class Name': ['Dresses'], 'AI Sentiment': ['Negative'],
+                                   'Action Needed?': ['Yes']}))
+        
+        breakdown, _ = analysis.running.to_frames()
+        
+        assert len(analysis.processed) == 2
+        assert breakdown.loc['Dresses', 'Total'] == 2
+
+
+class TestWatchLoop:
+    """Tests for the watch loop."""
+    
+    @patch('src.watch.IncrementalAnalysis.write_report')
+    @patch('src.utils.call_groq_llm', return_value={'sentiment': 'Positive', 'summary': 'Nice'})
+    @patch('src.main.read_worksheet')
+    @patch('src.main.run_full_pipeline', return_value=True)
+    def test_new_rows_processed_and_idle_backs_off(self, mock_full, mock_read, mock_llm,
+                                                   mock_report):
+        """Test appended rows are processed once and idle polls back off."""
+        raw = FakeWorksheet([HEADERS, ['Nice', '5', 'Dresses']])
+        spreadsheet, sheets = _spreadsheet(raw)
+        mock_read.return_value = pd.DataFrame({'Review Text': ['Nice'], 'Class Name': ['Dresses'],
+                                               'AI Sentiment': ['Positive']})
+        sleeps = []
+        
+        def sleep(seconds):
+            if seconds == 0.5:
+                # Pause between LLM calls, not a poll
+                return
+            sleeps.append(seconds)
+            if len(sleeps) == 2:
+                raw.rows.append(['Lovely', '4', 'Knits'])
+        
+        with patch('time.sleep', side_effect=sleep):
+            result = watch(spreadsheet, min_interval=1, max_interval=4, max_polls=5)
+        
+        assert result is True
+        mock_full.assert_called_once()
+        assert sheets['processed'].appended[0][0] == 'Lovely'
+        assert len(sheets['staging'].appended) == 1
+        assert sleeps == [1, 2, 1, 2, 4]
+    
+    @patch('src.watch.IncrementalAnalysis.write_report')
+    @patch('src.utils.call_groq_llm', return_value={'sentiment': 'Positive', 'summary': 'Nice'})
+    @patch('src.main.read_worksheet')
+    def test_rows_appended_during_full_run_are_processed(self, mock_read, mock_llm, mock_report):
+        """Test the baseline is what the full run extracted, not the sheet after it."""
+        raw = FakeWorksheet([HEADERS, ['Nice', '5', 'Dresses']])
+        spreadsheet, sheets = _spreadsheet(raw)
+        mock_read.return_value = pd.DataFrame({'Review Text': ['Nice'], 'Class Name': ['Dresses'],
+                                               'AI Sentiment': ['Positive']})
+        
+        def full_run(llm_options=None, results_db=None, on_extract=None):
+            on_extract(pd.DataFrame({'Review Text': ['Nice']}))
+            raw.rows.append(['Arrived mid-run', '4', 'Knits'])
+            return True
+        
+        with patch('src.main.run_full_pipeline', side_effect=full_run), patch('time.sleep'):
+            watch(spreadsheet, max_polls=1)
+        
+        assert [row[0] for row in sheets['processed'].appended] == ['Arrived mid-run']
+    
+    def test_each_batch_gets_a_fresh_deadline(self):
+        """Test the configured deadline restarts for every batch instead of expiring once."""
+        from src.deadline import RunDeadline
+        from src.watch import _with_fresh_deadline
+        
+        deadline = RunDeadline(300, reserve_seconds=10)
+        deadline.ends_at -= 1000
+        
+        options = _with_fresh_deadline({'deadline': deadline, 'prioritize': True})
+        
+        assert options['deadline'] is not deadline
+        assert options['deadline'].llm_time_left() > 280
+        assert options['prioritize'] is True
@@ -0,0 +1,189 @@
+import threading
+import time
+import pytest
+import pandas as pd
+from unittest.mock import patch
+from src import metrics
+from src.concurrency import ConcurrencyController
+from src.keypool import KeyPool
+from src.workqueue import WorkQueue, run_coordinator, run_worker, share_budgets
+
+
+def _reviews(n=5):
+    return pd.DataFrame({'Review Text': [f'Review {i}' for i in range(n)], 'Rating': list(range(n))})
+
+
+def _labels(rows):
+    return pd.DataFrame({'AI Sentiment': ['Positive'] * len(rows), 'AI Summary': list(rows['Review Text'])},
+                        index=rows.index)
+
+
+class TestWorkQueue:
+    """Tests for the lease-based work queue."""
+    
+    def setup_method(self):
+        metrics.reset()
+    
+    def test_chunks_are_leased_once(self, tmp_path):
+        """Test each chunk goes to one worker until it is committed."""
+        queue = WorkQueue(str(tmp_path / 'queue.db'))
+        assert queue.enqueue(_reviews(5), chunk_size=2) == 3
+        
+        leases = [queue.lease('a'), queue.lease('b'), queue.lease('c')]
+        
+        assert [lease.chunk_id for lease in leases] == [0, 1, 2]
+        assert leases[2].rows['Review Text'].tolist() == ['Review 4']
+        assert queue.lease('d') is None
+        assert queue.progress() == {'pending': 0, 'leased': 3, 'done': 0}
+    
+    def test_expired_lease_is_taken_over_and_old_commit_rejected(self, tmp_path):
+        """Test a silent worker loses its chunk and cannot commit over the new owner."""
+        queue = WorkQueue(str(tmp_path / 'queue.db'), lease_seconds=0.0)
+        queue.enqueue(_reviews(2), chunk_size=2)
+        stale = queue.lease('slow')
+        
+        fresh = queue.lease('fast')
+        
+        assert fresh.chunk_id == stale.chunk_id
+        assert queue.heartbeat(stale) is False
+        assert queue.commit(stale, _labels(stale.rows)) is False
+        assert queue.commit(fresh, _labels(fresh.rows)) is True
+        assert queue.commit(fresh, _labels(fresh.rows)) is False
+        assert metrics.get_counter('workqueue_leases_total', kind='expired') == 1
+        assert metrics.get_counter('workqueue_chunks_total', outcome='committed') == 1
+    
+    def test_heartbeat_keeps_the_lease(self, tmp_path):
+        """Test a renewed lease is not handed to another worker."""
+        queue = WorkQueue(str(tmp_path / 'queue.db'), lease_seconds=60.0)
+        queue.enqueue(_reviews(2), chunk_size=2)
+        lease = queue.lease('a')
+        
+        assert queue.heartbeat(lease) is True
+        assert queue.lease('b') is None
+    
+    def test_released_chunk_returns_to_queue(self, tmp_path):
+        """Test a released chunk can be leased again straight away."""
+        queue = WorkQueue(str(tmp_path / 'queue.db'))
+        queue.enqueue(_reviews(2), chunk_size=2)
+        queue.release(queue.lease('a'))
+        
+        assert queue.lease('b').chunk_id == 0
+    
+    def test_enqueue_same_frame_resumes(self, tmp_path):
+        """Test re-enqueueing the same frame keeps committed chunks."""
+        path = str(tmp_path / 'queue.db')
+        queue = WorkQueue(path)
+        queue.enqueue(_reviews(4), chunk_size=2)
+        lease = queue.lease('a')
+        queue.commit(lease, _labels(lease.rows))
+        
+        WorkQueue(path).enqueue(_reviews(4), chunk_size=2)
+        
+        assert queue.progress() == {'pending': 1, 'leased': 0, 'done': 1}
+        queue.enqueue(_reviews(6), chunk_size=2)
+        assert queue.progress() == {'pending': 3, 'leased': 0, 'done': 0}
+    
+    def test_assemble_waits_for_every_chunk(self, tmp_path):
+        """Test the processed frame is only assembled once all chunks are done."""
+        queue = WorkQueue(str(tmp_path / 'queue.db'))
+        df = _reviews(3)
+        queue.enqueue(df, chunk_size=2)
+        first = queue.lease('a')
+        queue.commit(first, _labels(first.rows))
+        assert queue.assemble(df) is None
+        
+        second = queue.lease('a')
+        queue.commit(second, _labels(second.rows))
+        processed = queue.assemble()
+        
+        assert processed['AI Summary'].tolist() == ['Review 0', 'Review 1', 'Review 2']
+        assert processed['Rating'].tolist() == [0, 1, 2]
+    
+    def test_workers_share_the_queue(self, tmp_path):
+        """Test concurrent workers label every review exactly once."""
+        path = str(tmp_path / 'queue.db')
+        df = _reviews(12)
+        WorkQueue(path).enqueue(df, chunk_size=2)
+        calls = []
+        
+        def label(review_text, *args, **kwargs):
+            calls.append(review_text)
+            return {'sentiment': 'Negative', 'summary': review_text.upper()}
+        
+        with patch('src.utils.call_groq_llm', side_effect=label), patch('time.sleep'):
+            workers = [threading.Thread(target=run_worker, args=(path,), kwargs={'poll_seconds': 0.01})
+                       for _ in range(3)]
+            for worker in workers:
+                worker.start()
+            for worker in workers:
+                worker.join()
+        
+        processed = WorkQueue(path).assemble(df)
+        assert sorted(calls) == sorted(df['Review Text'])
+        assert processed['AI Summary'].tolist() == [text.upper() for text in df['Review Text']]
+        assert metrics.get_counter('workqueue_chunks_total', outcome='committed') == 6
+    
+    def test_failed_chunk_is_released(self, tmp_path):
+        """Test a chunk whose LLM stage failed goes back to the queue instead of crashing with the lease held."""
+        path = str(tmp_path / 'queue.db')
+        WorkQueue(path).enqueue(_reviews(2), chunk_size=2)
+        
+        with patch('src.etl.process_reviews_with_llm', side_effect=lambda rows, **kwargs: rows):
+            with pytest.raises(RuntimeError):
+                run_worker(path, poll_seconds=0.01)
+        
+        assert WorkQueue(path).progress() == {'pending': 1, 'leased': 0, 'done': 0}
+    
+    def test_worker_waits_for_work(self, tmp_path):
+        """Test a worker started before the coordinator picks up chunks queued later."""
+        path = str(tmp_path / 'queue.db')
+        df = _reviews(2)
+        WorkQueue(path)
+        
+        with patch('src.utils.call_groq_llm', return_value={'sentiment': 'Neutral', 'summary': 'Ok'}):
+            worker = threading.Thread(target=run_worker, args=(path,),
+                                      kwargs={'poll_seconds': 0.01, 'wait_seconds': 30})
+            worker.start()
+            time.sleep(0.1)
+            WorkQueue(path).enqueue(df, chunk_size=1)
+            worker.join(timeout=30)
+        
+        assert not worker.is_alive()
+        assert WorkQueue(path).progress()['done'] == 2
+    
+    def test_coordinator_returns_processed_frame(self, tmp_path):
+        """Test the coordinator queues, works and assembles the frame."""
+        df = _reviews(3)
+        
+        with patch('src.utils.call_groq_llm', return_value={'sentiment': 'Neutral', 'summary': 'Ok'}), \
+                patch('time.sleep'):
+            processed = run_coordinator(df, path=str(tmp_path / 'queue.db'), chunk_size=2)
+        
+        assert processed['AI Sentiment'].tolist() == ['Neutral'] * 3
+        assert processed['Review Text'].tolist() == df['Review Text'].tolist()
+    
+    def test_budgets_are_shared_between_processes(self):
+        """Test each local worker process gets an equal share of every request budget."""
+        pool = KeyPool(['key-one', 'key-two'], requests_per_minute=60, tokens_per_minute=6000)
+        options = {'key_pool': pool, 'concurrency': ConcurrencyController(initial_limit=4, max_limit=16),
+                   'prioritize': True}
+        
+        shared = share_budgets(options, 4)
+        
+        assert [key.interval for key in shared['key_pool'].keys] == [4.0, 4.0]
+        assert shared['key_pool'].keys[0].seconds_per_token == 0.04
+        assert (shared['concurrency'].limit, shared['concurrency'].max_limit) == (1, 4)
+        assert shared['prioritize'] is True
+        assert options['key_pool'] is pool
+    
+    def test_forked_workers_metrics_are_merged(self, tmp_path):
+        """Test the coordinator's metrics count the reviews its worker processes labelled."""
+        df = _reviews(8)
+        
+        with patch('src.utils.call_groq_llm', return_value={'sentiment': 'Neutral', 'summary': 'Ok'}), \
+                patch('time.sleep'):
+            processed = run_coordinator(df, path=str(tmp_path / 'queue.db'), chunk_size=1, workers=2)
+        
+        assert processed['AI Sentiment'].tolist() == ['Neutral'] * 8
+        assert metrics.get_counter('reviews_total', status='processed') == 8
+        assert metrics.get_counter('workqueue_chunks_total', outcome='committed') == 8